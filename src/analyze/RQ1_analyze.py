@@ -9,6 +9,7 @@ from datetime import datetime, timedelta
 # src ディレクトリをパスに追加
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 from components.mannwhitneyu import perform_mannwhitneyu
+from components.results_store import load_results
 
 def analyze_rq1():
     # パス設定
@@ -19,8 +20,10 @@ def analyze_rq1():
 
     os.makedirs(output_dir, exist_ok=True)
 
-    # CSVファイルを読み込む
-    df = pd.read_csv(input_dir)
+    # 結果を読み込む（Parquetのストアがあればそこから、なければCSV）
+    columns = ['repository_name', 'file_name', 'file_created_by', 'file_creation_date', 'file_line_count',
+               'commit_date', 'file_specific_changed_lines']
+    df = load_results('results_v7_released_commits_restriction', columns=columns, categorical=False)
     print(f"読み込み完了: {input_dir}")
     print(f"データ数: {len(df)}")
 
@@ -1,8 +1,13 @@
 import pandas as pd
 import matplotlib.pyplot as plt
 import os
+import sys
 from datetime import datetime
 
+# src ディレクトリをパスに追加
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from components.results_store import load_results
+
 def analyze_rq2():
     """
     RQ2: AI作成ファイルの保守は誰が行っているのかを分析
@@ -27,7 +32,10 @@ def run_analysis(end_date=None, suffix=""):
     
     output_txt_path = os.path.join(output_dir, f"RQ2_results{suffix}.txt")
 
-    df = pd.read_csv(input_dir)
+    # Parquetのストアがあればそこから読む（なければCSV）
+    columns = ['repository_name', 'file_name', 'file_created_by', 'file_creation_date',
+               'commit_date', 'commit_created_by']
+    df = load_results('results_v7_released_commits_restriction', columns=columns, categorical=False)
 
     # 日付フィルタリング
     df['commit_date'] = pd.to_datetime(df['commit_date']).dt.tz_localize(None)
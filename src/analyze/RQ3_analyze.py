@@ -2,6 +2,11 @@ import pandas as pd
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_pdf import PdfPages
 import os
+import sys
+
+# src ディレクトリをパスに追加
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from components.results_store import load_results
 
 def analyze_commit_classification(end_date=None, suffix=""):
     # ファイルパスの定義
@@ -10,7 +15,10 @@ def analyze_commit_classification(end_date=None, suffix=""):
     output_dir = os.path.join(script_dir, "../../results/EASE-results/summary")
     output_txt = os.path.join(output_dir, f'RQ3_results{suffix}.txt')
 
-    df = pd.read_csv(input_dir)
+    # Parquetのストアがあればそこから読む（なければCSV）
+    columns = ['repository_name', 'file_name', 'file_created_by', 'file_creation_date',
+               'commit_date', 'commit_classification']
+    df = load_results('results_v7_released_commits_restriction', columns=columns, categorical=False)
 
     # 日付比較のためにdatetime型に変換
     df['commit_date'] = pd.to_datetime(df['commit_date']).dt.tz_localize(None)
@@ -0,0 +1,219 @@
+"""
+コミット分類の速度・精度ベンチマーク
+
+保存済みのラベル付きコーパス（benchmark/labelled_sample.py、結果CSVのラベル + メッセージ・patch）を
+設定ごとに分類し、以下を表示してJSONに保存する。
+- 入力トークン/秒（バッチ分類）、1件ずつ分類した場合のレイテンシ（p50 / p95）
+- ピークRSS（設定ごとに別プロセスで実行して計測）
+- 期待ラベル（CSVのラベル）との一致率（全体・ラベル別）
+  n-gram分類器はコーパスのコミットを除いて学習する（train_ngram_classifier.py）。重複があれば件数を表示する
+
+2つの結果JSONを比較する場合:
+    python classifier_benchmark.py --compare old.json new.json
+コーパスをGitHub APIから取得し直す場合（結果のsha256が変わるため、以前の結果とは比較できなくなる）:
+    python classifier_benchmark.py --refetch
+"""
+
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from components.ccs_prompt import MODEL_ID, LABELS
+from components.lazy_classifier import LazyClassifier
+from components.rule_classifier import RuleClassifier
+from benchmark.labelled_sample import load_labelled_sample, DEFAULT_SAMPLE
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+RESULTS_DIR = os.path.join(script_dir, '../data_list/benchmark/results')
+
+
+def run_config(config, samples):
+    """1設定分の計測（別プロセスで実行される）"""
+    classifier = LazyClassifier(MODEL_ID, cache=None, backend=config['backend'],
+                                rules=RuleClassifier() if config.get('rules') else None,
+                                mode=config['mode'], batch_size=config['batch_size'],
+                                use_prefix_cache=config.get('use_prefix_cache', False))
+    context_window = config['context_window']
+    pairs = [(sample['message'], sample['patch']) for sample in samples]
+    # patchにはヘッダがないため、ルール分類・n-gram分類器にはファイル名を渡す（classify_pending.pyと同じ）
+    paths = [[sample['file_name']] for sample in samples]
+
+    start = time.perf_counter()
+    model = classifier.get()
+    load_time = time.perf_counter() - start
+
+    # 学習に使ったコミットとコーパスの重複（n-gram分類器のみ、重複があればその分の一致率は学習データ上の値）
+    train_overlap = None
+    if hasattr(model, 'train_shas'):
+        train_overlap = sum(sample['commit_hash'] in model.train_shas for sample in samples)
+
+    # 入力トークン数（トークナイザを持たない分類器は計測しない）
+    tokens = None
+    if hasattr(model, 'prepare_input_ids'):
+        tokens = sum(len(model.prepare_input_ids(message, diff, context_window)) for message, diff in pairs)
+
+    # ウォームアップ
+    classifier.classify_batch(pairs[:config['batch_size']], context_window, paths=paths[:config['batch_size']])
+
+    # バッチ分類（スループット）
+    start = time.perf_counter()
+    labels = classifier.classify_batch(pairs, context_window, paths=paths)
+    batch_time = time.perf_counter() - start
+
+    # 1件ずつ分類（レイテンシ）
+    latencies = []
+    for pair, file_paths in list(zip(pairs, paths))[:config.get('latency_samples', len(pairs))]:
+        start = time.perf_counter()
+        classifier.classify_batch([pair], context_window, paths=[file_paths])
+        latencies.append(time.perf_counter() - start)
+
+    expected = [sample['label'] for sample in samples]
+    per_label = {}
+    for label in LABELS:
+        indices = [i for i, e in enumerate(expected) if e == label]
+        if indices:
+            per_label[label] = {'count': len(indices),
+                                'agreement': sum(labels[i] == label for i in indices) / len(indices)}
+
+    return {
+        'config': config,
+        'load_time_sec': load_time,
+        'batch_time_sec': batch_time,
+        'commits_per_sec': len(pairs) / batch_time,
+        'tokens': tokens,
+        'tokens_per_sec': tokens / batch_time if tokens is not None else None,
+        'latency_p50_sec': float(np.percentile(latencies, 50)),
+        'latency_p95_sec': float(np.percentile(latencies, 95)),
+        # Linuxのru_maxrssはKB
+        'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        'agreement': sum(a == b for a, b in zip(labels, expected)) / len(expected),
+        'agreement_by_label': per_label,
+        'train_overlap': train_overlap,
+        'labels': labels
+    }
+
+
+def git_revision():
+    """現在のコミット（結果の比較用、取得できなければNone）"""
+    try:
+        return subprocess.run(['git', '-C', script_dir, 'rev-parse', 'HEAD'],
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def file_digest(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def print_results(results):
+    print("\n" + "=" * 110)
+    print(f"{'設定':<24} {'トークン/秒':>12} {'件/秒':>10} {'p50(秒)':>10} {'p95(秒)':>10} {'ピークRSS(MB)':>14} "
+          f"{'一致率':>8}")
+    for result in results:
+        tokens_per_sec = f"{result['tokens_per_sec']:.1f}" if result['tokens_per_sec'] is not None else '-'
+        print(f"{result['config']['name']:<24} {tokens_per_sec:>12} {result['commits_per_sec']:>10.2f} "
+              f"{result['latency_p50_sec']:>10.3f} {result['latency_p95_sec']:>10.3f} {result['peak_rss_mb']:>14.0f} "
+              f"{result['agreement'] * 100:>7.1f}%")
+    print("=" * 110)
+    for result in results:
+        if result.get('train_overlap'):
+            print(f"注意: {result['config']['name']} はコーパスの{result['train_overlap']}件が学習データに含まれます"
+                  f"（一致率は学習データ上の値を含む。train_ngram_classifier.pyで学習し直すこと）")
+
+
+def compare(old_path, new_path):
+    """2つの結果JSONを設定名ごとに比較"""
+    with open(old_path, encoding='utf-8') as f:
+        old = {r['config']['name']: r for r in json.load(f)['results']}
+    with open(new_path, encoding='utf-8') as f:
+        new = {r['config']['name']: r for r in json.load(f)['results']}
+
+    metrics = ['tokens_per_sec', 'commits_per_sec', 'latency_p50_sec', 'latency_p95_sec', 'peak_rss_mb', 'agreement']
+    for name in [n for n in new if n in old]:
+        print(f"\n{name}")
+        for metric in metrics:
+            before, after = old[name][metric], new[name][metric]
+            if before is None or after is None:
+                continue
+            change = (after - before) / before * 100 if before else float('nan')
+            print(f"  {metric:<18} {before:>12.4f} → {after:>12.4f} ({change:+.1f}%)")
+        changed = sum(a != b for a, b in zip(old[name]['labels'], new[name]['labels']))
+        print(f"  ラベルが変わった件数: {changed}/{len(new[name]['labels'])}")
+
+
+def main():
+    """メイン実行"""
+    parser = argparse.ArgumentParser(description="コミット分類ベンチマーク")
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'), help="2つの結果JSONを比較する")
+    parser.add_argument('--refetch', action='store_true', help="保存済みのコーパスを使わずに取得し直す")
+    args = parser.parse_args()
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    # コーパスのサンプル数
+    num_samples = 200
+    # 比較する設定（nameは結果の比較に使うため変えないこと）
+    configs = [
+        {'name': 'score-cpu-fp32', 'backend': 'cpu-fp32', 'mode': 'score', 'batch_size': 8, 'context_window': 1024,
+         'latency_samples': 50},
+        {'name': 'score-cpu-int8', 'backend': 'cpu-int8', 'mode': 'score', 'batch_size': 8, 'context_window': 1024,
+         'latency_samples': 50},
+        {'name': 'generate-cpu-fp32', 'backend': 'cpu-fp32', 'mode': 'generate', 'batch_size': 8,
+         'context_window': 1024, 'latency_samples': 50},
+        # システムプロンプトのKVキャッシュを再利用（パイプラインの既定、CLASSIFIER_PREFIX_CACHE）
+        {'name': 'score-cpu-fp32-prefix', 'backend': 'cpu-fp32', 'mode': 'score', 'batch_size': 8,
+         'context_window': 1024, 'use_prefix_cache': True, 'latency_samples': 50},
+        {'name': 'generate-cpu-fp32-prefix', 'backend': 'cpu-fp32', 'mode': 'generate', 'batch_size': 8,
+         'context_window': 1024, 'use_prefix_cache': True, 'latency_samples': 50},
+        {'name': 'ngram', 'backend': 'ngram', 'mode': 'score', 'batch_size': 8, 'context_window': 1024},
+        {'name': 'rules+score-cpu-int8', 'backend': 'cpu-int8', 'mode': 'score', 'batch_size': 8,
+         'context_window': 1024, 'rules': True, 'latency_samples': 50},
+    ]
+
+    samples = load_labelled_sample(num_samples, refetch=args.refetch)
+    print(f"コーパス: {DEFAULT_SAMPLE}（{len(samples)}件）")
+
+    # 設定ごとに別プロセスで実行（ピークRSSを分けて計測し、モデルのメモリも確実に解放する）
+    context = multiprocessing.get_context('spawn')
+    results = []
+    for config in configs:
+        print(f"\n計測中: {config['name']}")
+        try:
+            with context.Pool(1) as pool:
+                results.append(pool.apply(run_config, (config, samples)))
+        except Exception as e:
+            print(f"スキップ（{config['name']}）: {type(e).__name__}: {e}")
+
+    print_results(results)
+
+    output = {
+        'timestamp': datetime.now().isoformat(),
+        'git_revision': git_revision(),
+        'environment': {'python': platform.python_version(), 'platform': platform.platform(),
+                        'cpu_count': os.cpu_count()},
+        'corpus': {'path': DEFAULT_SAMPLE, 'size': len(samples), 'sha256': file_digest(DEFAULT_SAMPLE)},
+        'results': results
+    }
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    output_path = os.path.join(RESULTS_DIR, f"classifier_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(output, f, ensure_ascii=False, indent=2)
+    print(f"結果保存: {output_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+ラベル付きサンプル（results_v7_released_commits_restriction.csvの分類結果 + コミットメッセージ・patch）
+
+CSVにはメッセージと差分が含まれないため、初回のみGitHub APIから取得してJSONに保存する。
+選んだ行と取得できなかった行もサンプルと一緒に保存し、取得できなかった行があってもそのまま使う。
+2回目以降は保存したJSONを読み込むだけ（ネットワーク不要、毎回同じサンプル）。
+取得し直すのは refetch=True を指定した場合のみ。
+"""
+
+import json
+import os
+import sys
+
+import pandas as pd
+from dotenv import load_dotenv
+from github import Github
+from tqdm import tqdm
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from components.ccs_prompt import LABELS
+from components.http_cache import install_http_cache
+from components.token_pool import get_token_pool
+from components.commit_store import CommitDetailStore
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CSV = os.path.join(script_dir, '../../results/EASE-results/csv/results_v7_released_commits_restriction.csv')
+DEFAULT_SAMPLE = os.path.join(script_dir, '../data_list/benchmark/labelled_sample.json')
+
+
+def fetch_sample(csv_path, num_samples, seed, exclude_shas=()):
+    """CSVから分類済みの行を選び、メッセージとファイルのpatchを取得（exclude_shasのコミットは選ばない）
+
+    Returns:
+        tuple: (サンプルのリスト, 取得できなかった行（repository_name, file_name, commit_hash）のリスト)
+    """
+    load_dotenv(os.path.join(script_dir, '..', 'get_data', '.env'))
+    token_pool = get_token_pool()
+    install_http_cache(os.path.join(script_dir, '../data_list/http_cache/github_api.sqlite'), token_pool=token_pool)
+    g = Github(token_pool.tokens[0])
+
+    df = pd.read_csv(csv_path)
+    df = df[df['commit_classification'].isin(LABELS)].drop_duplicates(['commit_hash', 'file_name'])
+    df = df[~df['commit_hash'].isin(set(exclude_shas))]
+    df = df.sample(n=min(num_samples, len(df)), random_state=seed)
+
+    stores = {}
+    samples = []
+    failed = []
+    for _, row in tqdm(df.iterrows(), total=len(df), desc="サンプル取得"):
+        try:
+            if row['repository_name'] not in stores:
+                stores[row['repository_name']] = CommitDetailStore(g.get_repo(row['repository_name']))
+            store = stores[row['repository_name']]
+            patch, _ = store.get_file_patch(row['commit_hash'], row['file_name'])
+            samples.append({
+                'repository_name': row['repository_name'],
+                'file_name': row['file_name'],
+                'commit_hash': row['commit_hash'],
+                'label': row['commit_classification'],
+                'message': store.get(row['commit_hash'])['message'],
+                'patch': patch
+            })
+        except Exception as e:
+            tqdm.write(f"取得エラー {row['commit_hash'][:8]}: {e}")
+            failed.append({'repository_name': row['repository_name'], 'file_name': row['file_name'],
+                           'commit_hash': row['commit_hash']})
+    return samples, failed
+
+
+def load_labelled_sample(num_samples=200, seed=0, csv_path=DEFAULT_CSV, sample_path=DEFAULT_SAMPLE, exclude_shas=(),
+                         refetch=False):
+    """ラベル付きサンプルを読み込む（保存済みならそれを使う）
+
+    Args:
+        exclude_shas: 含めないコミット（学習用のサンプルからベンチマーク用のコミットを除く場合等）
+        refetch: Trueなら保存済みのサンプルを使わずに取得し直す
+
+    Returns:
+        list: dict（repository_name, file_name, commit_hash, label, message, patch）のリスト
+    """
+    exclude_shas = set(exclude_shas)
+    if os.path.exists(sample_path) and not refetch:
+        with open(sample_path, encoding='utf-8') as f:
+            saved = json.load(f)
+        # 以前の形式（サンプルのリストのみ）もそのまま使う
+        request = saved if isinstance(saved, dict) else {'samples': saved}
+        samples = [sample for sample in request['samples'] if sample['commit_hash'] not in exclude_shas]
+        if request.get('num_samples', len(request['samples'])) < num_samples:
+            print(f"注意: {sample_path} は{request.get('num_samples', len(request['samples']))}件分のサンプルです"
+                  f"（{num_samples}件にするには refetch=True で取得し直す）")
+        if request.get('failed'):
+            print(f"注意: {sample_path} は{len(request['failed'])}件を取得できなかったサンプルです")
+        return samples[:num_samples]
+
+    samples, failed = fetch_sample(csv_path, num_samples, seed, exclude_shas)
+    request = {
+        'csv_path': os.path.basename(csv_path),
+        'num_samples': num_samples,
+        'seed': seed,
+        'failed': failed,
+        'samples': samples
+    }
+    os.makedirs(os.path.dirname(sample_path), exist_ok=True)
+    with open(sample_path, 'w', encoding='utf-8') as f:
+        json.dump(request, f, ensure_ascii=False)
+    print(f"サンプル保存: {sample_path}（{len(samples)}件、取得できなかった行: {len(failed)}件）")
+    return samples
@@ -0,0 +1,83 @@
+"""
+システムプロンプトのKVキャッシュ再利用によるコミット1件あたりの分類時間の比較（CPU）
+
+通常の分類（毎回プロンプト全体を処理）と、共通部分のKVキャッシュを再利用する分類で
+同じコミットを1件ずつ分類し、1件あたりの時間とラベルの一致率を表示する。
+入力にはこのリポジトリのソースコードから作った差分を使う（ネットワーク不要）。
+"""
+
+import glob
+import os
+import sys
+import time
+
+import numpy as np
+import torch
+from transformers import pipeline
+
+# src ディレクトリをパスに追加
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from components.ccs_prompt import MODEL_ID
+from components.commit_classifier import CommitClassifier
+
+
+def build_samples(num_samples, max_lines=80):
+    """リポジトリ内のPythonファイルを「ファイル追加」の差分に見立てたサンプルを作成"""
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    paths = sorted(glob.glob(os.path.join(script_dir, '..', '**', '*.py'), recursive=True))
+    samples = []
+    for path in paths[:num_samples]:
+        rel_path = os.path.relpath(path, os.path.join(script_dir, '..'))
+        with open(path, encoding='utf-8') as f:
+            lines = f.read().splitlines()[:max_lines]
+        diff = f"diff --git a/{rel_path} b/{rel_path}\nnew file mode 100644\n--- /dev/null\n+++ b/{rel_path}\n"
+        diff += f"@@ -0,0 +1,{len(lines)} @@\n" + "\n".join("+" + line for line in lines)
+        samples.append((f"Add {os.path.basename(rel_path)}", diff))
+    return samples
+
+
+def measure(classifier, samples):
+    """1件ずつ分類して所要時間（秒）とラベルを返す"""
+    times = []
+    labels = []
+    for message, diff in samples:
+        start = time.perf_counter()
+        labels.append(classifier.classify(message, diff))
+        times.append(time.perf_counter() - start)
+    return np.array(times), labels
+
+
+def main():
+    """メイン実行"""
+    # サンプル数とスレッド数
+    num_samples = 10
+    num_threads = os.cpu_count()
+
+    torch.set_num_threads(num_threads)
+    print(f"モデル読み込み中: {MODEL_ID}（CPU, スレッド数: {num_threads}）")
+    pipe = pipeline("text-generation", model=MODEL_ID, device="cpu", torch_dtype=torch.float32)
+
+    samples = build_samples(num_samples)
+    baseline = CommitClassifier(pipe, batch_size=1)
+    prefix = CommitClassifier(pipe, batch_size=1, use_prefix_cache=True)
+    print(f"サンプル数: {len(samples)}, 共通部分: {len(prefix.prompt_builder.head_ids)}トークン")
+
+    # ウォームアップ（KVキャッシュの初回計算もここで行う）
+    baseline.classify(*samples[0])
+    prefix.classify(*samples[0])
+
+    baseline_times, baseline_labels = measure(baseline, samples)
+    prefix_times, prefix_labels = measure(prefix, samples)
+
+    agreement = sum(a == b for a, b in zip(baseline_labels, prefix_labels)) / len(samples) * 100
+    print("\n" + "=" * 60)
+    print(f"{'':<20} {'平均(秒)':>10} {'p50(秒)':>10} {'p95(秒)':>10}")
+    for name, times in [("通常", baseline_times), ("KVキャッシュ再利用", prefix_times)]:
+        print(f"{name:<20} {times.mean():>10.2f} {np.percentile(times, 50):>10.2f} {np.percentile(times, 95):>10.2f}")
+    print(f"高速化: {baseline_times.mean() / prefix_times.mean():.2f}倍")
+    print(f"ラベル一致率: {agreement:.1f}%")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
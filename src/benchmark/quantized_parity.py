@@ -0,0 +1,93 @@
+"""
+量子化バックエンドの分類精度と1コアあたりのスループットの比較（CPU）
+
+results_v7_released_commits_restriction.csvから選んだラベル付きサンプル（benchmark/labelled_sample.py）を
+各バックエンドで分類し、以下を表示する。
+- CSVのラベル（現行パイプラインの結果）との一致率
+- 基準バックエンド（backendsの先頭）との一致率
+- 1コアあたりのスループット（コミット/秒、入力トークン/秒）
+"""
+
+import gc
+import os
+import sys
+import time
+
+import torch
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from components.ccs_prompt import MODEL_ID
+from components.commit_classifier import CommitClassifier
+from components.inference_backend import load_pipeline
+from benchmark.labelled_sample import load_labelled_sample
+
+
+def run_backend(backend, samples, num_threads, batch_size, context_window):
+    """1バックエンドでサンプルを分類
+
+    Returns:
+        dict: labels, load_time, elapsed, tokens
+    """
+    print(f"\nモデル読み込み中: {MODEL_ID}（{backend}, スレッド数: {num_threads}）")
+    start = time.perf_counter()
+    pipe = load_pipeline(MODEL_ID, backend, num_threads=num_threads)
+    classifier = CommitClassifier(pipe, batch_size=batch_size, mode='score')
+    load_time = time.perf_counter() - start
+
+    pairs = [(sample['message'], sample['patch']) for sample in samples]
+    tokens = sum(len(classifier.prepare_input_ids(message, diff, context_window)) for message, diff in pairs)
+
+    # ウォームアップ
+    classifier.classify_batch(pairs[:batch_size], context_window)
+
+    start = time.perf_counter()
+    labels = classifier.classify_batch(pairs, context_window)
+    elapsed = time.perf_counter() - start
+
+    del classifier, pipe
+    gc.collect()
+    return {'labels': labels, 'load_time': load_time, 'elapsed': elapsed, 'tokens': tokens}
+
+
+def agreement(labels_a, labels_b):
+    """ラベルの一致率（%）"""
+    return sum(a == b for a, b in zip(labels_a, labels_b)) / len(labels_a) * 100
+
+
+def main():
+    """メイン実行"""
+    # 比較するバックエンド（先頭が基準）
+    backends = ['cpu-fp32', 'cpu-int8', 'cpu-int4']
+    # サンプル数・スレッド数・バッチサイズ
+    num_samples = 200
+    num_threads = os.cpu_count()
+    batch_size = 8
+    context_window = 1024
+
+    samples = load_labelled_sample(num_samples)
+    csv_labels = [sample['label'] for sample in samples]
+    print(f"サンプル数: {len(samples)}")
+
+    results = {}
+    for backend in backends:
+        try:
+            results[backend] = run_backend(backend, samples, num_threads, batch_size, context_window)
+        except ImportError as e:
+            print(f"スキップ（{backend}）: {e}")
+
+    reference = results.get(backends[0])
+    print("\n" + "=" * 100)
+    print(f"{'バックエンド':<12} {'読込(秒)':>10} {'分類(秒)':>10} {'件/秒/コア':>12} {'トークン/秒/コア':>16} "
+          f"{'CSV一致率':>10} {'基準一致率':>10}")
+    for backend, result in results.items():
+        per_core = result['elapsed'] * num_threads
+        vs_reference = agreement(result['labels'], reference['labels']) if reference else float('nan')
+        print(f"{backend:<12} {result['load_time']:>10.1f} {result['elapsed']:>10.1f} "
+              f"{len(samples) / per_core:>12.4f} {result['tokens'] / per_core:>16.1f} "
+              f"{agreement(result['labels'], csv_labels):>9.1f}% {vs_reference:>9.1f}%")
+    print("=" * 100)
+    print(f"torch: {torch.__version__}, スレッド数: {num_threads}")
+
+
+if __name__ == "__main__":
+    main()
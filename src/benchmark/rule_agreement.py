@@ -0,0 +1,70 @@
+"""
+ルールによる事前分類のカバー率とLLMの分類結果との一致率
+
+results_v7_released_commits_restriction.csvのラベル付きサンプル（benchmark/labelled_sample.py）に対して
+ルール分類（components/rule_classifier.py）を行い、以下を表示する。
+- カバー率（ルールで判定できた割合、接頭辞 / パス別）
+- ルールで判定できたものについてのLLMのラベルとの一致率（判定方法別・ラベル別）
+サンプルの差分はファイルごとのpatch（ヘッダなし）のため、get_commits_expansion.pyの
+LazyClassifier.classify(..., file_path=...) と同じ入力（patchと行のfile_name）でルールを適用する。
+"""
+
+import os
+import sys
+from collections import Counter
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from components.ccs_prompt import LABELS
+from components.rule_classifier import RuleClassifier
+from benchmark.labelled_sample import load_labelled_sample
+
+
+def main():
+    """メイン実行"""
+    num_samples = 1000
+
+    samples = load_labelled_sample(num_samples)
+    rules = RuleClassifier()
+
+    by_source = Counter()
+    agree_by_source = Counter()
+    by_label = Counter()
+    agree_by_label = Counter()
+    disagreements = Counter()
+    for sample in samples:
+        label, source = rules.classify(sample['message'], sample['patch'], paths=[sample['file_name']])
+        by_source[source] += 1
+        if label is None:
+            continue
+        by_label[label] += 1
+        if label == sample['label']:
+            agree_by_source[source] += 1
+            agree_by_label[label] += 1
+        else:
+            disagreements[(label, sample['label'])] += 1
+
+    total = len(samples)
+    covered = by_source['message'] + by_source['paths']
+    agreed = agree_by_source['message'] + agree_by_source['paths']
+    print("=" * 60)
+    print(f"サンプル数: {total}")
+    print(f"カバー率: {covered / total * 100:.1f}%（{covered}件）")
+    for source, name in [('message', '接頭辞'), ('paths', 'パス')]:
+        if by_source[source]:
+            print(f"  {name}: {by_source[source]}件, LLMとの一致率 {agree_by_source[source] / by_source[source] * 100:.1f}%")
+    if covered:
+        print(f"LLMとの一致率（判定できたもの全体）: {agreed / covered * 100:.1f}%")
+
+    print("\nラベル別（ルールのラベル: 件数, 一致率）")
+    for label in LABELS:
+        if by_label[label]:
+            print(f"  {label:<10} {by_label[label]:>5}件 {agree_by_label[label] / by_label[label] * 100:>6.1f}%")
+
+    print("\n不一致の多い組み合わせ（ルール → LLM）")
+    for (rule_label, llm_label), count in disagreements.most_common(10):
+        print(f"  {rule_label} → {llm_label}: {count}件")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
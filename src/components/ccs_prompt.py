@@ -0,0 +1,46 @@
+"""
+コミット分類（CCS）のモデルID・ラベル・プロンプト
+
+torch / transformers に依存しないため、モデルを読み込まない処理（キャッシュ等）からも使える。
+"""
+
+MODEL_ID = "0x404/ccs-code-llama-7b"
+
+# 分類ラベル
+LABELS = ['docs', 'perf', 'style', 'refactor', 'feat', 'fix', 'test', 'ci', 'build', 'chore']
+
+PROMPT_HEAD = "<s>[INST] <<SYS>>\nYou are a commit classifier based on commit message and code diff.Please classify the given commit into one of the ten categories: docs, perf, style, refactor, feat, fix, test, ci, build, and chore. The definitions of each category are as follows:\n**feat**: Code changes aim to introduce new features to the codebase, encompassing both internal and user-oriented features.\n**fix**: Code changes aim to fix bugs and faults within the codebase.\n**perf**: Code changes aim to improve performance, such as enhancing execution speed or reducing memory consumption.\n**style**: Code changes aim to improve readability without affecting the meaning of the code. This type encompasses aspects like variable naming, indentation, and addressing linting or code analysis warnings.\n**refactor**: Code changes aim to restructure the program without changing its behavior, aiming to improve maintainability. To avoid confusion and overlap, we propose the constraint that this category does not include changes classified as ``perf'' or ``style''. Examples include enhancing modularity, refining exception handling, improving scalability, conducting code cleanup, and removing deprecated code.\n**docs**: Code changes that modify documentation or text, such as correcting typos, modifying comments, or updating documentation.\n**test**: Code changes that modify test files, including the addition or updating of tests.\n**ci**: Code changes to CI (Continuous Integration) configuration files and scripts, such as configuring or updating CI/CD scripts, e.g., ``.travis.yml'' and ``.github/workflows''.\n**build**: Code changes affecting the build system (e.g., Maven, Gradle, Cargo). Change examples include updating dependencies, configuring build configurations, and adding scripts.\n**chore**: Code changes for other miscellaneous tasks that do not neatly fit into any of the above categories.\n<</SYS>>\n\n"
+
+
+# 差分1トークンあたりの最大バイト数の目安（これ以上の差分はプロンプトに入らないためダウンロードしない）
+MAX_BYTES_PER_TOKEN = 16
+
+
+def diff_byte_budget(context_window=1024):
+    """プロンプトに入りうる差分の最大バイト数"""
+    return context_window * MAX_BYTES_PER_TOKEN
+
+
+class PromptBuilder:
+    def __init__(self, tokenizer):
+        """
+        tokenizer: モデルのトークナイザ（固定部分はここで1回だけエンコードする）
+        """
+        self.tokenizer = tokenizer
+        self.head_ids = tokenizer.encode(PROMPT_HEAD, add_special_tokens=False)
+        self.end_ids = tokenizer.encode(" [/INST]", add_special_tokens=False)
+
+    def build_ids(self, commit_message: str, git_diff: str, context_window: int = 1024):
+        """コミット分類用プロンプトのトークンID列を作成"""
+        prompt_message = f"- given commit message:\n{commit_message}\n"
+        message_ids = self.tokenizer.encode(prompt_message, max_length=64, truncation=True, add_special_tokens=False)
+
+        prompt_diff = f"- given commit diff: \n{git_diff}\n"
+        remaining_length = (context_window - len(self.head_ids) - len(message_ids) - 6)
+        diff_ids = self.tokenizer.encode(prompt_diff, max_length=remaining_length, truncation=True, add_special_tokens=False)
+
+        return self.head_ids + message_ids + diff_ids + self.end_ids
+
+    def build(self, commit_message: str, git_diff: str, context_window: int = 1024):
+        """コミット分類用プロンプト作成（文字列、確認用）"""
+        return self.tokenizer.decode(self.build_ids(commit_message, git_diff, context_window))
@@ -0,0 +1,132 @@
+"""
+処理単位（ファイル等）ごとの結果を追記するチェックポイント用ジャーナル
+
+- 結果の行は「出力CSV名.journal.csv」に追記し、処理済みのキーは「出力CSV名.journal.idx」にJSON Linesで追記する
+  （キー・追記後のジャーナルのサイズ・末尾のハッシュ、components/result_sink.pyと同じ確定方式）
+- 再開時はインデックスだけを読む（結果の行は読まない）。確定していない追記は切り詰める
+- インデックスの壊れた行は除去し、インデックスがジャーナルと一致しない場合はジャーナルから作り直す
+- 最後にconsolidateでジャーナルを1回だけ読み、出力CSVを一時ファイル経由で書き出す
+"""
+
+import csv
+import io
+import json
+import os
+
+import pandas as pd
+
+from components.result_sink import tail_digest, fsync_append, read_index, rewrite_index
+
+
+class CheckpointJournal:
+    def __init__(self, output_csv, columns, key_columns):
+        """
+        output_csv: 最終的な出力CSVのパス
+        columns: 列名のリスト（ジャーナルのヘッダ、追記する行はこの順に並べる）
+        key_columns: 処理単位のキーの列（インデックスをジャーナルから作り直すときに使う）
+        """
+        self.output_csv = output_csv
+        self.journal_path = output_csv + '.journal.csv'
+        self.index_path = output_csv + '.journal.idx'
+        self.columns = list(columns)
+        self.key_columns = list(key_columns)
+        self.processed = set()
+        self.open()
+
+    def open(self):
+        """インデックスから処理済みのキーを読み込み、ジャーナルの確定位置を確認"""
+        if not os.path.exists(self.journal_path):
+            self.initialize()
+            return
+
+        # インデックスへの追記途中で停止した行があれば除去する（その分のジャーナルは未確定として扱う）
+        entries = read_index(self.index_path)
+        size = os.path.getsize(self.journal_path)
+        last = entries[-1] if entries else None
+        if last is None or size < last['size'] or tail_digest(self.journal_path, last['size']) != last['tail']:
+            self.rebuild_index()
+            return
+        if size > last['size']:
+            print(f"未確定の追記を切り詰め: {self.journal_path}（{size - last['size']}バイト）")
+            with open(self.journal_path, 'r+b') as f:
+                f.truncate(last['size'])
+                os.fsync(f.fileno())
+        self.processed = {tuple(entry['key']) for entry in entries if entry['key'] is not None}
+
+    def initialize(self):
+        """ヘッダだけのジャーナルと空のインデックスを作成"""
+        header = io.StringIO()
+        csv.writer(header, lineterminator='\n').writerow(self.columns)
+        tmp_path = self.journal_path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(header.getvalue().encode('utf-8'))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.journal_path)
+        rewrite_index(self.index_path, [])
+        self.processed = set()
+        self.write_index_entry(None)
+
+    def rebuild_index(self):
+        """インデックスとジャーナルが一致しない場合（インデックス作成前の停止等）にジャーナルから作り直す
+
+        ジャーナルの行は処理単位ごとにまとめて追記されるため、最後の処理単位は途中までの可能性がある。
+        最後のキーの行は除いて書き直し、残りのキーを処理済みとする。
+        """
+        try:
+            df = pd.read_csv(self.journal_path, dtype=str, keep_default_na=False)
+        except (pd.errors.EmptyDataError, pd.errors.ParserError):
+            df = None
+        if df is None or list(df.columns) != self.columns or len(df) == 0:
+            print(f"ジャーナルを初期化: {self.journal_path}")
+            self.initialize()
+            return
+
+        key_columns = self.key_columns
+        keys = list(dict.fromkeys(map(tuple, df[key_columns].itertuples(index=False, name=None))))
+        last_key = keys.pop()
+        df = df[[tuple(row) != last_key for row in df[key_columns].itertuples(index=False, name=None)]]
+
+        self.initialize()
+        if len(df):
+            data = df.to_csv(index=False, header=False, lineterminator='\n')
+            fsync_append(self.journal_path, data.encode('utf-8'))
+        # 行のない処理単位はジャーナルから分からないため、再処理される
+        for key in keys:
+            self.write_index_entry(key)
+        self.processed = set(keys)
+        print(f"インデックス再作成: {self.index_path}（{len(keys)}件）")
+
+    def write_index_entry(self, key):
+        size = os.path.getsize(self.journal_path)
+        entry = {'key': list(key) if key is not None else None, 'size': size,
+                 'tail': tail_digest(self.journal_path, size)}
+        fsync_append(self.index_path, (json.dumps(entry, ensure_ascii=False) + '\n').encode('utf-8'))
+
+    def __contains__(self, key):
+        return tuple(key) in self.processed
+
+    def __len__(self):
+        return len(self.processed)
+
+    def append(self, key, df):
+        """1処理単位の結果を追記して処理済みにする（ジャーナル → インデックスの順にfsync）"""
+        if len(df):
+            data = df.reindex(columns=self.columns).to_csv(index=False, header=False, lineterminator='\n')
+            fsync_append(self.journal_path, data.encode('utf-8'))
+        self.write_index_entry(key)
+        self.processed.add(tuple(key))
+
+    def consolidate(self):
+        """ジャーナルから出力CSVを書き出す（一時ファイルに書いてから置き換える）
+
+        Returns:
+            DataFrame: 出力した結果
+        """
+        df = pd.read_csv(self.journal_path)
+        tmp_path = self.output_csv + '.tmp'
+        df.to_csv(tmp_path, index=False, encoding='utf-8-sig')
+        with open(tmp_path, 'rb') as f:
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.output_csv)
+        return df
@@ -0,0 +1,149 @@
+"""
+コミット分類結果の永続キャッシュ（SQLite）
+
+キーは (モデルのキー, コミットsha, 差分のハッシュ)。モデルのキーは「モデルID|分類方法/推論バックエンド」
+（例: 'Qwen/...|score/cpu-int8'）で、分類方法・バックエンドを変えた場合は別のキャッシュとして扱う。
+結果CSVのcommit_classification列から一括で読み込むこともできる（ウォームアップ）。
+CSVには差分が含まれないため、ウォームアップしたラベルは入力の種類（コミット全体の差分 / ファイルごとのpatch）が
+同じであれば差分を問わずshaで一致したものとして扱う（完全一致のキーがない場合のみ使用）。
+既存の結果CSVのラベルは生成モードの7Bモデルで分類したものなので、WARM_UP_SCOPE（'generate/auto'）に読み込む。
+他の分類方法/バックエンドからは、fallback_scopeを明示的に指定した場合のみ参照する。
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+
+import pandas as pd
+
+from components.ccs_prompt import LABELS
+
+# 入力の種類（ウォームアップしたラベルはCSVと同じ種類の入力にのみ一致する）
+COMMIT_DIFF = 'commit'
+FILE_PATCH = 'file'
+INPUT_KINDS = (COMMIT_DIFF, FILE_PATCH)
+
+# 既存の結果CSVのラベルを分類した分類方法/推論バックエンド（ウォームアップしたラベルのキー）
+WARM_UP_SCOPE = 'generate/auto'
+
+
+def any_diff(kind):
+    """ウォームアップしたラベルの差分ハッシュ（kindの任意の差分に一致）"""
+    return '*' + kind
+
+
+def diff_digest(git_diff):
+    """差分のハッシュ"""
+    return hashlib.sha256((git_diff or "").encode('utf-8', errors='replace')).hexdigest()
+
+
+class ClassificationCache:
+    def __init__(self, cache_path, model_id):
+        """
+        cache_path: SQLiteファイルのパス
+        model_id: 分類モデルのID（モデルを変えた場合は別のキャッシュとして扱う）
+        """
+        self.model_id = model_id
+        self.lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        self.db = sqlite3.connect(cache_path, check_same_thread=False)
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS classifications (
+                model_id TEXT,
+                commit_sha TEXT,
+                diff_digest TEXT,
+                label TEXT,
+                PRIMARY KEY (model_id, commit_sha, diff_digest)
+            )
+        """)
+        # 以前はウォームアップしたラベルを実行時の分類方法/バックエンドのキーに読み込んでいたため削除する
+        self.db.execute("DELETE FROM classifications WHERE diff_digest LIKE '*%' AND model_id != ?",
+                        (self.model_key(WARM_UP_SCOPE),))
+        self.db.commit()
+        self.hits = 0
+        self.misses = 0
+
+    def model_key(self, scope):
+        """モデルのキー（scopeは分類方法/推論バックエンド、例: 'score/cpu-int8'）"""
+        return f"{self.model_id}|{scope}"
+
+    def get(self, commit_sha, git_diff, scope, kind=COMMIT_DIFF, fallback_scope=None):
+        """キャッシュ済みのラベルを取得（なければNone）
+
+        Args:
+            scope: 分類方法/推論バックエンド（LazyClassifier.cache_scope）
+            kind: git_diffの種類（COMMIT_DIFF / FILE_PATCH、ウォームアップしたラベルの照合に使う）
+            fallback_scope: scopeになければ参照する分類方法/推論バックエンド（例: WARM_UP_SCOPE、Noneなら参照しない）
+        """
+        scopes = [scope] if fallback_scope in (None, scope) else [scope, fallback_scope]
+        with self.lock:
+            row = None
+            for key in map(self.model_key, scopes):
+                row = self.db.execute(
+                    "SELECT label FROM classifications WHERE model_id = ? AND commit_sha = ? "
+                    "AND diff_digest IN (?, ?) ORDER BY diff_digest = ? LIMIT 1",
+                    (key, commit_sha, diff_digest(git_diff), any_diff(kind), any_diff(kind))
+                ).fetchone()
+                if row is not None:
+                    break
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return row[0]
+
+    def put_many(self, records, scope):
+        """分類結果をまとめて保存（有効なラベルのみ）
+
+        Args:
+            records: (commit_sha, git_diff, label) のリスト
+            scope: 分類方法/推論バックエンド（LazyClassifier.cache_scope）
+        """
+        model_key = self.model_key(scope)
+        rows = [(model_key, sha, diff_digest(diff), label) for sha, diff, label in records if label in LABELS]
+        with self.lock:
+            self.db.executemany("INSERT OR REPLACE INTO classifications VALUES (?, ?, ?, ?)", rows)
+            self.db.commit()
+
+    def warm_up_from_csv(self, csv_paths, kind, scope=WARM_UP_SCOPE):
+        """結果CSVのcommit_classification列からラベルを読み込む
+
+        同じコミットに異なるラベルが付いている場合（ファイルごとのpatchで分類した等）は読み込まない。
+
+        Args:
+            kind: CSVのラベルの入力の種類（COMMIT_DIFF / FILE_PATCH）
+            scope: CSVのラベルを分類した分類方法/推論バックエンド
+
+        Returns:
+            int: 読み込んだコミット数
+        """
+        if kind not in INPUT_KINDS:
+            raise ValueError(f"不明な入力の種類: {kind}（{', '.join(INPUT_KINDS)}）")
+
+        frames = []
+        for csv_path in csv_paths:
+            if os.path.exists(csv_path):
+                frames.append(pd.read_csv(csv_path, usecols=['commit_hash', 'commit_classification']))
+        if not frames:
+            return 0
+
+        df = pd.concat(frames, ignore_index=True).dropna()
+        df = df[df['commit_classification'].isin(LABELS)].drop_duplicates()
+        # ラベルが1種類だけのコミットのみ
+        unique = df.groupby('commit_hash')['commit_classification'].nunique()
+        df = df[df['commit_hash'].isin(unique[unique == 1].index)].drop_duplicates('commit_hash')
+
+        model_key = self.model_key(scope)
+        rows = [(model_key, sha, any_diff(kind), label)
+                for sha, label in zip(df['commit_hash'], df['commit_classification'])]
+        with self.lock:
+            # 既に分類済みのものは上書きしない
+            self.db.executemany("INSERT OR IGNORE INTO classifications VALUES (?, ?, ?, ?)", rows)
+            self.db.commit()
+        return len(rows)
+
+    def summary(self):
+        """表示用の統計"""
+        return f"分類キャッシュ: ヒット={self.hits} ミス={self.misses}"
@@ -0,0 +1,206 @@
+"""
+コミット分類サービス（localhostのHTTP、モデルを1回だけ読み込んで複数スクリプトから共有）
+
+サーバ（src/get_data/classifier_daemon.py で起動）:
+- 受け付けた分類要求をキューに入れ、分類スレッドが複数クライアントの要求をまとめて1回のclassify_batchで分類する
+  （最初の要求から max_wait 秒待つか、max_batch 件集まった時点で実行）
+- POST /classify  {"pairs": [[message, diff], ...], "shas": [...] | null, "paths": [[path, ...], ...] | null,
+                   "kind": "commit" | "file", "context_window": 1024} → {"labels": [...]}
+  shasを送った場合はサービス側の分類キャッシュを使う（kindはウォームアップしたラベルの照合に使う）
+- POST /prompt    {"message": ..., "diff": ..., "context_window": 1024} → {"prompt": ...}
+- GET  /health    → モデルID・キュー長・処理件数
+
+クライアント（RemoteClassifier）はCommitClassifierと同じclassify_batch / prepare_promptを持ち、
+LazyClassifier(service_url=...) から使う。
+"""
+
+import json
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from components.classification_cache import COMMIT_DIFF
+
+DEFAULT_PORT = 8765
+
+
+class ClassifyJob:
+    """1回の/classify要求"""
+    def __init__(self, pairs, shas, paths, kind, context_window):
+        self.pairs = pairs
+        self.shas = shas
+        self.paths = paths
+        self.kind = kind
+        self.context_window = context_window
+        self.future = Future()
+
+
+class ClassifierService:
+    def __init__(self, classifier, max_batch=32, max_wait=0.05):
+        """
+        classifier: LazyClassifier（分類キャッシュ付き）
+        max_batch: 1回の分類でまとめるコミット数の上限
+        max_wait: 最初の要求を受けてから他の要求を待つ時間（秒）
+        """
+        self.classifier = classifier
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.queue = queue.Queue()
+        self.requests = 0
+        self.batches = 0
+        self.classified = 0
+        self.worker = threading.Thread(target=self.run, daemon=True)
+        self.worker.start()
+
+    def submit(self, pairs, shas=None, context_window=1024, paths=None, kind=COMMIT_DIFF):
+        """分類要求をキューに入れる（結果はFutureで返す）"""
+        job = ClassifyJob(pairs, shas or [None] * len(pairs), paths or [None] * len(pairs), kind, context_window)
+        self.queue.put(job)
+        return job.future
+
+    def run(self):
+        """分類スレッド（キューから要求を集めてまとめて分類）"""
+        while True:
+            jobs = [self.queue.get()]
+            count = len(jobs[0].pairs)
+            deadline = time.monotonic() + self.max_wait
+            while count < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    job = self.queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                jobs.append(job)
+                count += len(job.pairs)
+            self.process(jobs)
+
+    def process(self, jobs):
+        """集めた要求をcontext_window・入力の種類ごとにまとめて分類し、各要求に結果を返す"""
+        groups = {}
+        for job in jobs:
+            groups.setdefault((job.context_window, job.kind), []).append(job)
+
+        for (context_window, kind), group in groups.items():
+            pairs = [pair for job in group for pair in job.pairs]
+            shas = [sha for job in group for sha in job.shas]
+            # パスがない要素（None）は差分のヘッダから取得される
+            paths = [file_paths for job in group for file_paths in job.paths]
+            try:
+                labels = self.classifier.classify_batch(pairs, context_window, shas=shas, paths=paths, kind=kind)
+            except Exception as e:
+                for job in group:
+                    job.future.set_exception(e)
+                continue
+
+            start = 0
+            for job in group:
+                job.future.set_result(labels[start:start + len(job.pairs)])
+                start += len(job.pairs)
+            self.requests += len(group)
+            self.batches += 1
+            self.classified += len(pairs)
+
+    def health(self):
+        """状態（GET /health）"""
+        return {
+            'model_id': self.classifier.model_id,
+            'loaded': self.classifier.loaded,
+            'queued': self.queue.qsize(),
+            'requests': self.requests,
+            'batches': self.batches,
+            'classified': self.classified
+        }
+
+
+def make_handler(service):
+    """ClassifierServiceを呼び出すHTTPハンドラを作成"""
+    class Handler(BaseHTTPRequestHandler):
+        def send_json(self, status, body):
+            data = json.dumps(body, ensure_ascii=False).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path == '/health':
+                self.send_json(200, service.health())
+            else:
+                self.send_json(404, {'error': 'not found'})
+
+        def do_POST(self):
+            try:
+                body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+                context_window = body.get('context_window', 1024)
+                if self.path == '/classify':
+                    pairs = [tuple(pair) for pair in body['pairs']]
+                    labels = service.submit(pairs, body.get('shas'), context_window, body.get('paths'),
+                                            body.get('kind', COMMIT_DIFF)).result()
+                    self.send_json(200, {'labels': labels})
+                elif self.path == '/prompt':
+                    prompt = service.classifier.prepare_prompt(body['message'], body['diff'], context_window)
+                    self.send_json(200, {'prompt': prompt})
+                else:
+                    self.send_json(404, {'error': 'not found'})
+            except Exception as e:
+                self.send_json(500, {'error': f"{type(e).__name__}: {e}"})
+
+        def log_message(self, format, *args):
+            # リクエストごとのログは出さない
+            pass
+
+    return Handler
+
+
+def serve(classifier, host='127.0.0.1', port=DEFAULT_PORT, max_batch=32, max_wait=0.05):
+    """分類サービスを起動（終了するまで戻らない）"""
+    service = ClassifierService(classifier, max_batch=max_batch, max_wait=max_wait)
+    server = ThreadingHTTPServer((host, port), make_handler(service))
+    print(f"分類サービス起動: http://{host}:{port}（まとめる上限: {max_batch}件, 待ち時間: {max_wait}秒）")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+
+
+class RemoteClassifier:
+    def __init__(self, service_url, timeout=None):
+        """
+        service_url: 分類サービスのURL（例: http://127.0.0.1:8765）
+        timeout: 1要求の待ち時間の上限（秒、Noneなら無制限。サービス側の初回モデル読み込みを待つため）
+        """
+        self.service_url = service_url.rstrip('/')
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def post(self, path, body):
+        response = self.session.post(f"{self.service_url}{path}", json=body, timeout=self.timeout)
+        if response.status_code != 200:
+            raise RuntimeError(f"分類サービスエラー ({response.status_code}): {response.json().get('error')}")
+        return response.json()
+
+    def health(self):
+        """サービスの状態"""
+        return self.session.get(f"{self.service_url}/health", timeout=5).json()
+
+    def prepare_prompt(self, commit_message: str, git_diff: str, context_window: int = 1024):
+        """コミット分類用プロンプト作成（サービス側のトークナイザで作成）"""
+        body = {'message': commit_message, 'diff': git_diff, 'context_window': context_window}
+        return self.post('/prompt', body)['prompt']
+
+    def classify_batch(self, pairs, context_window: int = 1024, batch_size=None, shas=None, paths=None,
+                       kind=COMMIT_DIFF):
+        """複数コミットをまとめて分類（batch_sizeはサービス側で決めるため使わない）
+
+        shas: 指定した場合はサービス側の分類キャッシュを使う（LazyClassifier.classify_batchと同じ）
+        """
+        body = {'pairs': [list(pair) for pair in pairs], 'shas': shas, 'paths': paths, 'kind': kind,
+                'context_window': context_window}
+        return self.post('/classify', body)['labels']
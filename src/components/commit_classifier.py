@@ -0,0 +1,219 @@
+"""
+コミット分類（CCS: ccs-code-llama-7b）
+
+get-AI-files.py と get_commits_expansion.py で共通の分類処理。
+プロンプトはトークンID列として組み立て（components/ccs_prompt.py）、
+文字列に戻さずにそのままモデルに入力する。
+複数コミットをまとめて分類する場合は、プロンプト長でソートしたバケットごとに
+バッチ内の最長に合わせてパディングしてモデルに入力する。
+use_prefix_cache=True の場合は、全コミット共通のシステムプロンプト部分の
+past_key_valuesを1回だけ計算し、各コミットではメッセージと差分の部分のみを処理する。
+mode='score' の場合は生成を行わず、1回の順伝播で10個のラベルの尤度を比較して最大のものを返す。
+研究データの収集ではmode='generate'を既定とする（scoreはclassifier_benchmark.pyでgenerateとの
+一致率を確認するまで、CLASSIFIER_MODE=scoreを指定した場合のみ使う）。
+"""
+
+import threading
+
+import torch
+from transformers import DynamicCache
+
+from components.ccs_prompt import LABELS, PromptBuilder
+
+
+class CommitClassifier:
+    def __init__(self, pipe, batch_size=8, max_new_tokens=10, use_prefix_cache=False, mode='generate'):
+        """
+        pipe: transformersのtext-generationパイプライン
+        batch_size: 1回のモデル呼び出しで処理するプロンプト数
+        max_new_tokens: 生成する最大トークン数（mode='generate'のみ）
+        use_prefix_cache: システムプロンプト部分のKVキャッシュを再利用する
+                          （左パディングのバッチとは併用できないため1件ずつ処理する）
+        mode: 'generate'（テキスト生成の最後の単語）または 'score'（1回の順伝播でラベルの尤度を比較）
+        """
+        self.pipe = pipe
+        self.tokenizer = pipe.tokenizer
+        self.model = pipe.model
+        self.prompt_builder = PromptBuilder(self.tokenizer)
+        self.batch_size = batch_size
+        self.max_new_tokens = max_new_tokens
+        self.use_prefix_cache = use_prefix_cache
+        self.prefix_cache = None
+        self.mode = mode
+        if mode == 'score':
+            self.label_token_ids = self.get_label_token_ids()
+        # モデルはスレッド間で共有するため推論は1バッチずつ行う
+        self.lock = threading.Lock()
+
+        # パディングに使うトークン（パディング位置はattention_maskで無視される）
+        self.pad_token_id = self.tokenizer.pad_token_id
+        if self.pad_token_id is None:
+            self.pad_token_id = self.tokenizer.eos_token_id
+
+    def get_label_token_ids(self):
+        """各ラベルの先頭トークンIDを取得（[/INST]の直後に生成されるトークン）
+
+        先頭トークンが全ラベルで異なれば、先頭トークンの尤度の比較だけでラベルが決まる。
+        """
+        label_token_ids = [self.tokenizer.encode(label, add_special_tokens=False)[0] for label in LABELS]
+        if len(set(label_token_ids)) != len(LABELS):
+            raise ValueError("ラベルの先頭トークンが重複しているためscoreモードは使えません")
+        return label_token_ids
+
+    def prepare_prompt(self, commit_message: str, git_diff: str, context_window: int = 1024):
+        """コミット分類用プロンプト作成（文字列）"""
+        return self.prompt_builder.build(commit_message, git_diff, context_window)
+
+    def prepare_input_ids(self, commit_message: str, git_diff: str, context_window: int = 1024):
+        """コミット分類用プロンプトのトークンID列を作成"""
+        return self.prompt_builder.build_ids(commit_message, git_diff, context_window)
+
+    def pad_batch(self, batch_ids):
+        """ID列のリストを左詰めでパディングしてテンソルにする（右側だと生成位置がずれる）"""
+        max_length = max(len(ids) for ids in batch_ids)
+        input_ids = [[self.pad_token_id] * (max_length - len(ids)) + ids for ids in batch_ids]
+        attention_mask = [[0] * (max_length - len(ids)) + [1] * len(ids) for ids in batch_ids]
+        return {
+            'input_ids': torch.tensor(input_ids, device=self.model.device),
+            'attention_mask': torch.tensor(attention_mask, device=self.model.device)
+        }
+
+    def get_prefix_cache(self):
+        """システムプロンプト部分のpast_key_valuesを取得（初回のみ計算、ロック内で呼ぶ）"""
+        if self.prefix_cache is None:
+            head_ids = torch.tensor([self.prompt_builder.head_ids], device=self.model.device)
+            with torch.no_grad():
+                self.prefix_cache = self.model(input_ids=head_ids, past_key_values=DynamicCache(),
+                                               use_cache=True).past_key_values
+        return self.prefix_cache
+
+    def generate_label_with_prefix(self, ids):
+        """共通部分のKVキャッシュを使って1件生成し、ラベルを返す"""
+        input_ids = torch.tensor([ids], device=self.model.device)
+        with self.lock, torch.no_grad():
+            prefix_cache = self.get_prefix_cache()
+            try:
+                # キャッシュ済みの位置は計算されず、メッセージと差分の部分のみ処理される
+                outputs = self.model.generate(
+                    input_ids=input_ids,
+                    attention_mask=torch.ones_like(input_ids),
+                    past_key_values=prefix_cache,
+                    max_new_tokens=self.max_new_tokens,
+                    do_sample=False,
+                    pad_token_id=self.tokenizer.eos_token_id
+                )
+            finally:
+                # 生成で伸びたキャッシュを共通部分の長さに戻す（コピーせずに再利用）
+                prefix_cache.crop(len(self.prompt_builder.head_ids))
+        text = self.tokenizer.decode(outputs[0, input_ids.shape[1]:], skip_special_tokens=True)
+        return text.split()[-1] if text.split() else "[/INST]"
+
+    def last_logits(self, **inputs):
+        """最後の位置のlogitsのみ計算（全位置×語彙数のlogitsを作らない）"""
+        if 'attention_mask' in inputs:
+            # 左パディングの分だけ位置をずらす（generateが内部で行っている処理と同じ）
+            inputs['position_ids'] = (inputs['attention_mask'].long().cumsum(-1) - 1).clamp(min=0)
+        outputs = self.model.base_model(**inputs, use_cache=self.use_prefix_cache)
+        hidden = outputs.last_hidden_state[:, -1, :]
+        return self.model.get_output_embeddings()(hidden).float()
+
+    def score_labels(self, batch_ids):
+        """1回の順伝播で各ラベルの確率を計算
+
+        Returns:
+            list: 各プロンプトについて {ラベル: 確率}（10ラベルで正規化）
+        """
+        with self.lock, torch.no_grad():
+            if self.use_prefix_cache:
+                prefix_cache = self.get_prefix_cache()
+                head_length = len(self.prompt_builder.head_ids)
+                rows = []
+                for ids in batch_ids:
+                    suffix = torch.tensor([ids[head_length:]], device=self.model.device)
+                    try:
+                        rows.append(self.last_logits(input_ids=suffix, past_key_values=prefix_cache))
+                    finally:
+                        prefix_cache.crop(head_length)
+                logits = torch.cat(rows)
+            else:
+                logits = self.last_logits(**self.pad_batch(batch_ids))
+
+        probs = torch.softmax(logits[:, self.label_token_ids], dim=-1).cpu().tolist()
+        return [dict(zip(LABELS, row)) for row in probs]
+
+    def generate_labels(self, batch_ids):
+        """1バッチ分のプロンプト（ID列）を生成し、ラベルを返す（バッチ内の最長に合わせてパディング）"""
+        if self.mode == 'score':
+            return [max(scores, key=scores.get) for scores in self.score_labels(batch_ids)]
+
+        if self.use_prefix_cache:
+            return [self.generate_label_with_prefix(ids) for ids in batch_ids]
+
+        inputs = self.pad_batch(batch_ids)
+        with self.lock, torch.no_grad():
+            outputs = self.model.generate(
+                **inputs,
+                max_new_tokens=self.max_new_tokens,
+                do_sample=False,
+                pad_token_id=self.tokenizer.eos_token_id
+            )
+        new_tokens = outputs[:, inputs['input_ids'].shape[1]:]
+        generated = self.tokenizer.batch_decode(new_tokens, skip_special_tokens=True)
+        # 「プロンプト+生成文」の最後の単語をラベルとする（何も生成されなければプロンプト末尾の[/INST]）
+        return [text.split()[-1] if text.split() else "[/INST]" for text in generated]
+
+    def classify_batch(self, pairs, context_window: int = 1024, batch_size=None):
+        """複数コミットをまとめて分類
+
+        Args:
+            pairs: (commit_message, git_diff) のリスト
+            context_window: プロンプトの最大トークン数
+            batch_size: 1回のモデル呼び出しで処理するプロンプト数（Noneなら初期化時の値）
+
+        Returns:
+            list: pairsと同じ順序のラベル（失敗したバッチは "classification_error"）
+        """
+        batch_size = batch_size or self.batch_size
+        prompts = [self.prepare_input_ids(message, diff, context_window) for message, diff in pairs]
+
+        # 長さでソートしてバケット化（パディングの無駄を減らす）
+        order = sorted(range(len(prompts)), key=lambda i: len(prompts[i]))
+
+        labels = [None] * len(prompts)
+        for start in range(0, len(order), batch_size):
+            bucket = order[start:start + batch_size]
+            try:
+                bucket_labels = self.generate_labels([prompts[i] for i in bucket])
+            except Exception as e:
+                print(f"分類エラー: {e}")
+                bucket_labels = ["classification_error"] * len(bucket)
+            for i, label in zip(bucket, bucket_labels):
+                labels[i] = label
+        return labels
+
+    def score_batch(self, pairs, context_window: int = 1024, batch_size=None):
+        """複数コミットのラベルごとの確率を計算（modeに関係なく1回の順伝播で採点）
+
+        Returns:
+            list: pairsと同じ順序の (ラベル, {ラベル: 確率}) 。失敗したバッチは ("classification_error", {})
+        """
+        batch_size = batch_size or self.batch_size
+        prompts = [self.prepare_input_ids(message, diff, context_window) for message, diff in pairs]
+        order = sorted(range(len(prompts)), key=lambda i: len(prompts[i]))
+
+        results = [None] * len(prompts)
+        for start in range(0, len(order), batch_size):
+            bucket = order[start:start + batch_size]
+            try:
+                bucket_scores = self.score_labels([prompts[i] for i in bucket])
+                bucket_results = [(max(scores, key=scores.get), scores) for scores in bucket_scores]
+            except Exception as e:
+                print(f"分類エラー: {e}")
+                bucket_results = [("classification_error", {})] * len(bucket)
+            for i, result in zip(bucket, bucket_results):
+                results[i] = result
+        return results
+
+    def classify(self, commit_message: str, git_diff: str, context_window: int = 1024):
+        """コミット分類（1件）"""
+        return self.classify_batch([(commit_message, git_diff)], context_window)[0]
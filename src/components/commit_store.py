@@ -0,0 +1,99 @@
+"""
+コミット詳細のメモ化（リポジトリごと、shaをキーにしたLRU）
+
+同じコミットに対する repo.get_commit(sha) を1回にまとめ、
+メッセージ・変更行数・ファイルごとのpatch・親コミットをここから返す。
+"""
+
+import threading
+from collections import OrderedDict
+
+
+def commit_to_record(commit):
+    """PyGithubのCommitから必要な情報だけを取り出す（.files/.statsで未取得なら詳細を取得する）"""
+    files = {}
+    for file in commit.files:
+        files[file.filename] = {
+            'status': file.status,
+            'patch': file.patch or "",
+            'changes': file.changes,
+            'additions': file.additions,
+            'deletions': file.deletions
+        }
+    return {
+        'sha': commit.sha,
+        'message': commit.commit.message,
+        'additions': commit.stats.additions,
+        'deletions': commit.stats.deletions,
+        'parents': [parent.sha for parent in commit.parents],
+        'files': files
+    }
+
+
+def file_patch_to_diff(file_path, file):
+    """ファイルごとのpatchをgit diff形式（ヘッダ付き）にする"""
+    old_path = '/dev/null' if file['status'] == 'added' else f'a/{file_path}'
+    new_path = '/dev/null' if file['status'] == 'removed' else f'b/{file_path}'
+    return f"diff --git a/{file_path} b/{file_path}\n--- {old_path}\n+++ {new_path}\n{file['patch']}\n"
+
+
+class CommitDetailStore:
+    def __init__(self, repo, max_size=2048):
+        """
+        repo: PyGithubのRepositoryオブジェクト
+        max_size: 保持するコミット数の上限（超えたら最も古く参照されたものから破棄）
+        """
+        self.repo = repo
+        self.max_size = max_size
+        self.records = OrderedDict()
+        self.lock = threading.Lock()
+        self.api_calls = 0  # 実際にget_commitした回数
+        self.saved_calls = 0  # キャッシュから返したことで省略できた回数
+
+    def _put(self, record):
+        """レコードを追加（ロック内で呼ぶ）"""
+        self.records[record['sha']] = record
+        self.records.move_to_end(record['sha'])
+        while len(self.records) > self.max_size:
+            self.records.popitem(last=False)
+
+    def add(self, commit):
+        """取得済みのCommitを登録（ステップ1等で既に詳細を取得した場合）"""
+        record = commit_to_record(commit)
+        with self.lock:
+            self._put(record)
+        return record
+
+    def get(self, commit_sha):
+        """コミット詳細を取得（未取得ならget_commitを1回だけ呼ぶ）
+
+        Returns:
+            dict: sha, message, additions, deletions, parents, files（ファイル名→patch等）
+        """
+        with self.lock:
+            record = self.records.get(commit_sha)
+            if record is not None:
+                self.records.move_to_end(commit_sha)
+                self.saved_calls += 1
+                return record
+
+        record = commit_to_record(self.repo.get_commit(commit_sha))
+        with self.lock:
+            self.api_calls += 1
+            self._put(record)
+        return record
+
+    def get_file_patch(self, commit_sha, file_path):
+        """特定ファイルのpatchと変更行数を取得
+
+        Returns:
+            tuple: (patch, changes) - ファイルが含まれない場合は ("", 0)
+        """
+        file = self.get(commit_sha)['files'].get(file_path)
+        if file is None:
+            return "", 0
+        return file['patch'], file['changes']
+
+    def summary(self):
+        """表示用の統計"""
+        return f"コミット詳細キャッシュ: API呼び出し={self.api_calls}回, 省略={self.saved_calls}回"
@@ -0,0 +1,104 @@
+"""
+ファイル履歴の取得（1ファイルにつき1回の走査で作成情報・コミット数・期間内のコミット履歴を返す）
+
+- 期間内（until以前）のコミット履歴を1回だけ走査（Nページ）
+- 作成コミットは期間内履歴の最後の要素（untilより前に作成されていれば全履歴の最後と同じ）
+- 全期間のコミット数はtotalCount（per_page=1のリクエスト1回、Linkヘッダの最終ページ番号）で取得
+- 期間内にコミットがない場合のみ、totalCountから最終ページ（per_page=1）を直接要求して作成コミットを取得
+"""
+
+import threading
+
+
+def commit_authors(commit):
+    """コミットアカウント（author + committer）のリストを取得"""
+    author_name = commit.commit.author.name or "Unknown"
+    all_authors = [author_name]
+
+    # committerも追加（authorと異なる場合）
+    if commit.commit.committer and commit.commit.committer.name:
+        committer_name = commit.commit.committer.name
+        if committer_name != author_name and committer_name not in all_authors:
+            all_authors.append(committer_name)
+    return all_authors
+
+
+def commit_to_log(commit):
+    """get_file_commits_apiと同じ形のコミット履歴レコード"""
+    all_authors = commit_authors(commit)
+    return {
+        'hash': commit.sha,
+        'date': commit.commit.author.date.isoformat(),
+        'author': all_authors[0],
+        'all_authors': all_authors,
+        'email': commit.commit.author.email or "unknown@example.com",
+        'message': commit.commit.message
+    }
+
+
+class FileHistoryService:
+    def __init__(self, repo, until_date):
+        """
+        repo: PyGithubのRepositoryオブジェクト
+        until_date: コミット履歴の取得期間の終わり
+        """
+        self.repo = repo
+        self.until_date = until_date
+        self.histories = {}
+        self.lock = threading.Lock()
+        self.path_locks = {}
+
+    def get(self, file_path):
+        """ファイル履歴を取得（同じファイルは1回だけ取得）
+
+        Returns:
+            dict: creation_info（作成情報、履歴がなければNone）, commit_logs（期間内のコミット履歴、新しい順）
+        """
+        with self.lock:
+            path_lock = self.path_locks.setdefault(file_path, threading.Lock())
+        # 同じファイルを複数スレッドから同時に要求された場合も取得は1回
+        with path_lock:
+            if file_path not in self.histories:
+                self.histories[file_path] = self.fetch(file_path)
+            return self.histories[file_path]
+
+    def fetch(self, file_path):
+        """APIからファイル履歴を取得"""
+        # 期間内の履歴（1回の走査）
+        commit_logs = []
+        first_commit = None
+        for commit in self.repo.get_commits(path=file_path, until=self.until_date):
+            commit_logs.append(commit_to_log(commit))
+            first_commit = commit
+
+        # 全期間のコミット数（per_page=1のリクエスト1回）
+        all_commits = self.repo.get_commits(path=file_path)
+        commit_count = all_commits.totalCount
+
+        # 期間内にコミットがない場合のみ最終ページへ直接ジャンプ
+        if first_commit is None and commit_count > 0:
+            first_commit = self.fetch_oldest_commit(file_path, commit_count)
+
+        creation_info = None
+        if first_commit is not None:
+            all_authors = commit_authors(first_commit)
+            creation_info = {
+                'author_name': all_authors[0],
+                'all_authors': all_authors,  # 全作成者リスト
+                'all_creator_names': all_authors,  # CSV出力用（ファイル作成者名）
+                'creation_date': first_commit.commit.author.date.isoformat(),
+                'commit_count': commit_count
+            }
+
+        return {'creation_info': creation_info, 'commit_logs': commit_logs}
+
+    def fetch_oldest_commit(self, file_path, commit_count):
+        """ファイルの最も古いコミットを取得（per_page=1でcommit_countページ目を要求する1回のリクエスト）
+
+        PaginatedListのインデックス指定は1ページ目から順に取得するため使わない。
+        """
+        from github.Commit import Commit
+
+        headers, data = self.repo._requester.requestJsonAndCheck(
+            "GET", f"{self.repo.url}/commits", parameters={'path': file_path, 'per_page': 1, 'page': commit_count})
+        return Commit(self.repo._requester, headers, data[0], completed=False) if data else None
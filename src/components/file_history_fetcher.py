@@ -0,0 +1,60 @@
+"""
+ファイルごとの作成情報・行数・コミット履歴の並行取得（asyncio版）
+
+PyGithubの呼び出しは同期処理のため、asyncio.to_threadでスレッドに逃がし、
+Semaphoreで同時実行数を制限する。結果は入力と同じ順序で返す。
+"""
+
+import asyncio
+
+
+async def fetch_one(semaphore, file_info, get_creation_info, get_line_count, get_commits):
+    """1ファイル分の情報を取得
+
+    Returns:
+        dict: file_info, creation_info, line_count, commit_logs（作成情報の取得に失敗した場合はcreation_info=None）
+    """
+    file_path = file_info['added_file']
+    async with semaphore:
+        creation_info = await asyncio.to_thread(get_creation_info, file_path)
+    if not creation_info:
+        return {'file_info': file_info, 'creation_info': None, 'line_count': 0, 'commit_logs': []}
+
+    async def limited(func, *args):
+        async with semaphore:
+            return await asyncio.to_thread(func, *args)
+
+    # 行数とコミット履歴は独立しているので同時に取得
+    line_count, commit_logs = await asyncio.gather(
+        limited(get_line_count, file_path, file_info['commit_hash']),
+        limited(get_commits, file_path)
+    )
+    return {
+        'file_info': file_info,
+        'creation_info': creation_info,
+        'line_count': line_count,
+        'commit_logs': commit_logs or []
+    }
+
+
+async def fetch_all(files, get_creation_info, get_line_count, get_commits, max_concurrency):
+    semaphore = asyncio.Semaphore(max_concurrency)
+    tasks = [fetch_one(semaphore, file_info, get_creation_info, get_line_count, get_commits) for file_info in files]
+    # gatherは入力順で結果を返すため、完了順に関係なく出力は決定的
+    return await asyncio.gather(*tasks)
+
+
+def fetch_file_histories(files, get_creation_info, get_line_count, get_commits, max_concurrency=8):
+    """全ファイルの作成情報・行数・コミット履歴を並行取得
+
+    Args:
+        files: get_files_by_author_typeが返すファイル情報のリスト
+        get_creation_info: file_path -> 作成情報dict（失敗時None）
+        get_line_count: (file_path, commit_sha) -> 行数
+        get_commits: file_path -> コミット履歴のリスト
+        max_concurrency: 同時に実行するAPI呼び出しの上限
+
+    Returns:
+        list: filesと同じ順序の取得結果
+    """
+    return asyncio.run(fetch_all(files, get_creation_info, get_line_count, get_commits, max_concurrency))
@@ -0,0 +1,204 @@
+"""
+ローカルgitリポジトリを使ったコミット情報取得（GitHub REST APIの代替）
+
+blobless partial clone（--filter=blob:none）を一度だけ作成し、
+RQ1AnalyzerAPIのステップ1・2で使うREST呼び出しと同じ形のレコードを
+git log / git show / git diff から返す。
+"""
+
+import os
+import subprocess
+from datetime import datetime, timezone
+
+# git logの出力区切り（レコード区切り / フィールド区切り）
+RECORD_SEP = '\x1e'
+FIELD_SEP = '\x1f'
+
+# ハッシュ, author名, authorメール, author日時(UNIX時間), committer名, メッセージ
+LOG_FORMAT = f"{RECORD_SEP}%H{FIELD_SEP}%an{FIELD_SEP}%ae{FIELD_SEP}%at{FIELD_SEP}%cn{FIELD_SEP}%B{FIELD_SEP}"
+
+def to_git_date(dt):
+    """datetimeをgitの日付指定に変換（タイムゾーンなしはUTCとして扱う、PyGithubと同じ）"""
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.strftime('%Y-%m-%d %H:%M:%S %z')
+
+
+def to_iso_date(timestamp):
+    """UNIX時間をGitHub APIと同じ形式（UTCのISO 8601）に変換"""
+    return datetime.fromtimestamp(int(timestamp), timezone.utc).isoformat()
+
+
+def decode_head(data, max_bytes):
+    """先頭max_bytesの出力を文字列にする（UTF-8でmax_bytesを超えないように末尾で切る）
+
+    errors='replace'の置換文字や途中で切れた文字で、デコード後のUTF-8のバイト数が増えることがあるため、
+    デコードしてから切り詰める。
+    """
+    encoded = data.decode('utf-8', errors='replace').encode('utf-8')
+    # 途中で切れた末尾の文字は捨てる
+    return encoded[:max_bytes].decode('utf-8', errors='ignore')
+
+
+class LocalGitBackend:
+    def __init__(self, repo_dir):
+        """
+        repo_dir: 既存のローカルgitリポジトリのパス（テスト用のフィクスチャもそのまま使える）
+        """
+        self.repo_dir = repo_dir
+
+    @classmethod
+    def from_github(cls, repo_name_full, cache_dir):
+        """GitHubリポジトリをblobless partial cloneして返す（既にあればfetchのみ）
+
+        Args:
+            repo_name_full: 'owner/repo' 形式のリポジトリ名
+            cache_dir: クローン保存先ディレクトリ
+        """
+        repo_dir = os.path.join(cache_dir, repo_name_full.replace('/', '__'))
+        url = f"https://github.com/{repo_name_full}.git"
+
+        if os.path.exists(os.path.join(repo_dir, 'HEAD')):
+            print(f"既存のクローンを更新中: {repo_dir}")
+            subprocess.run(['git', '-C', repo_dir, 'fetch', '--quiet', '--filter=blob:none', 'origin', '+refs/heads/*:refs/heads/*'],
+                           check=True)
+        else:
+            os.makedirs(cache_dir, exist_ok=True)
+            print(f"blobless cloneを作成中: {url}")
+            subprocess.run(['git', 'clone', '--quiet', '--bare', '--filter=blob:none', url, repo_dir],
+                           check=True)
+        return cls(repo_dir)
+
+    def git(self, *args):
+        """gitコマンドを実行して標準出力を返す"""
+        result = subprocess.run(['git', '-C', self.repo_dir, *args],
+                                capture_output=True, check=True)
+        return result.stdout.decode('utf-8', errors='replace')
+
+    def git_head(self, max_bytes, *args):
+        """gitコマンドの標準出力を先頭max_bytesだけ読み、残りは読まずに終了させる
+
+        blobless cloneのgit diffは出力しながらblobを取得するため、途中で止めれば取得量も抑えられる。
+        """
+        process = subprocess.Popen(['git', '-C', self.repo_dir, *args],
+                                   stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        try:
+            data = process.stdout.read(max_bytes)
+        finally:
+            process.kill()
+            process.wait()
+        return decode_head(data, max_bytes)
+
+    def parse_log(self, output):
+        """LOG_FORMATで出力したgit logをレコードのリストに変換
+
+        Returns:
+            list: (コミット情報dict, 後続の出力（--name-only等のファイル一覧）) のリスト
+        """
+        records = []
+        for chunk in output.split(RECORD_SEP)[1:]:
+            sha, author_name, author_email, timestamp, committer_name, message, rest = chunk.split(FIELD_SEP, 6)
+            author_name = author_name or "Unknown"
+
+            # コミットアカウントのみ取得（author + committer）
+            all_authors = [author_name]
+            if committer_name and committer_name != author_name:
+                all_authors.append(committer_name)
+
+            records.append(({
+                'hash': sha,
+                'author_name': author_name,
+                'author_email': author_email or "unknown@example.com",
+                'all_authors': all_authors,
+                'date': to_iso_date(timestamp),
+                'message': message.rstrip('\n')
+            }, rest))
+        return records
+
+    def get_all_commits_with_file_additions(self, since_date, until_date):
+        """期間内の全コミットのうちファイル追加を含むものを取得
+
+        Returns:
+            tuple: (commits_data, total_commits_count)
+        """
+        date_args = [f'--since={to_git_date(since_date)}', f'--until={to_git_date(until_date)}']
+        total_commits_count = int(self.git('rev-list', '--count', *date_args, 'HEAD').strip() or 0)
+
+        # --diff-filter=Aで追加ファイルを含むコミットのみ（マージは第1親との差分、APIと同じ）
+        output = self.git('log', *date_args, '--diff-filter=A', '--name-only', '--diff-merges=first-parent',
+                          f'--format={LOG_FORMAT}', 'HEAD')
+
+        commits_data = []
+        for info, rest in self.parse_log(output):
+            added_files = [line for line in rest.splitlines() if line]
+            if added_files:
+                info['added_files'] = added_files
+                commits_data.append(info)
+        return commits_data, total_commits_count
+
+    def get_file_commits(self, file_path, until_date=None):
+        """特定ファイルのコミット履歴（新しい順）をget_file_commits_apiと同じ形で取得"""
+        args = ['log', f'--format={LOG_FORMAT}']
+        if until_date is not None:
+            args.append(f'--until={to_git_date(until_date)}')
+        output = self.git(*args, 'HEAD', '--', file_path)
+
+        return [{
+            'hash': info['hash'],
+            'date': info['date'],
+            'author': info['author_name'],
+            'all_authors': info['all_authors'],
+            'email': info['author_email'],
+            'message': info['message']
+        } for info, _ in self.parse_log(output)]
+
+    def get_file_creation_info(self, file_path):
+        """ファイルの作成情報を取得（最初のコミット）"""
+        output = self.git('log', f'--format={LOG_FORMAT}', 'HEAD', '--', file_path)
+        records = self.parse_log(output)
+        if not records:
+            return None
+
+        first_commit = records[-1][0]
+        return {
+            'author_name': first_commit['author_name'],
+            'all_authors': first_commit['all_authors'],
+            'all_creator_names': first_commit['all_authors'],
+            'creation_date': first_commit['date'],
+            'commit_count': len(records)
+        }
+
+    def get_file_line_count(self, file_path, commit_sha):
+        """特定コミット時点のファイル行数を取得（blobはここで初めて取得される）"""
+        content = self.git('show', f'{commit_sha}:{file_path}')
+        return len(content.splitlines())
+
+    def get_parents(self, commit_sha):
+        """親コミットのハッシュ一覧を取得"""
+        return self.git('rev-list', '--parents', '-n', '1', commit_sha).split()[1:]
+
+    def fetch_message_and_diff(self, commit_sha, max_bytes=None):
+        """コミットメッセージと第1親との差分を取得（max_bytesを指定した場合は差分の先頭のみ）"""
+        message = self.git('show', '-s', '--format=%B', commit_sha).rstrip('\n')
+        parents = self.get_parents(commit_sha)
+        if parents and max_bytes is not None:
+            return message, self.git_head(max_bytes, 'diff', parents[0], commit_sha)
+        if parents:
+            return message, self.git('diff', parents[0], commit_sha)
+        return message, ""
+
+    def get_changed_paths(self, commit_sha):
+        """コミットで変更されたファイルのパス一覧（マージコミットは第1親との差分、APIと同じ）"""
+        output = self.git('show', '--format=', '--name-only', '-z', '--diff-merges=first-parent', commit_sha)
+        return [path for path in output.split('\0') if path]
+
+    def get_commit_changed_lines(self, commit_sha):
+        """コミットの変更行数（追加+削除）を取得"""
+        output = self.git('show', '--numstat', '--format=', '--diff-merges=first-parent', commit_sha)
+        total = 0
+        for line in output.splitlines():
+            parts = line.split('\t')
+            # バイナリファイルは '-' になるため除外
+            if len(parts) >= 3 and parts[0].isdigit() and parts[1].isdigit():
+                total += int(parts[0]) + int(parts[1])
+        return total
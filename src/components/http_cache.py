@@ -0,0 +1,264 @@
+"""
+PyGithubクライアント用の永続HTTPキャッシュ（ETag / Last-Modifiedによる条件付きリクエスト）
+
+- URLをキーにレスポンスをSQLiteへ保存
+- 再検証時はIf-None-Match / If-Modified-Sinceを送信（304はレート制限を消費しない）
+- shaで指定したコミット等の不変なレスポンスはリクエストせずにキャッシュから返す
+- 合計サイズの上限を超えたら最終アクセスが古いものから削除
+  （合計サイズはメモリ上で保持、最終アクセスの更新はACCESS_FLUSH_SIZE件ごと・削除前・終了時にまとめて書き込む）
+- 実際に送信するリクエストはトークンプール（TokenPool）のトークンで送り、間隔を調整
+"""
+
+import atexit
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from github.Requester import Requester, HTTPRequestsConnectionClass, HTTPSRequestsConnectionClass
+
+# shaで内容が確定するURL（コミット詳細 / ref=shaのファイル内容 / sha同士の比較）
+SHA = r'[0-9a-f]{40}'
+IMMUTABLE_URL_PATTERNS = [
+    re.compile(rf'^/repos/[^/]+/[^/]+/commits/{SHA}(\?|$)'),
+    re.compile(rf'^/repos/[^/]+/[^/]+/git/(commits|trees|blobs)/{SHA}(\?|$)'),
+    re.compile(rf'^/repos/[^/]+/[^/]+/contents/[^?]*\?(.*&)?ref={SHA}(&|$)'),
+    re.compile(rf'^/repos/[^/]+/[^/]+/compare/{SHA}\.\.\.{SHA}(\?|$)'),
+]
+
+# 最終アクセスの更新をまとめて書き込む件数
+ACCESS_FLUSH_SIZE = 256
+
+# キャッシュから返すときに除くヘッダ（古いレート制限値でPyGithubの残量表示が狂うため）
+VOLATILE_HEADERS = ('x-ratelimit-limit', 'x-ratelimit-remaining', 'x-ratelimit-reset',
+                    'x-ratelimit-used', 'x-ratelimit-resource', 'date')
+
+
+def is_immutable_url(url):
+    """レスポンスが変化しないURLかどうか"""
+    return any(pattern.search(url) for pattern in IMMUTABLE_URL_PATTERNS)
+
+
+class CachedResponse:
+    """PyGithubのRequestsResponseと同じインターフェースのレスポンス"""
+    def __init__(self, status, headers, text):
+        self.status = status
+        self.headers = headers
+        self.text = text
+
+    def getheaders(self):
+        return self.headers.items()
+
+    def read(self):
+        return self.text
+
+
+class HttpCache:
+    def __init__(self, cache_path, max_bytes=1024 * 1024 * 1024):
+        """
+        cache_path: SQLiteファイルのパス
+        max_bytes: キャッシュの合計サイズ上限（バイト）
+        """
+        self.cache_path = cache_path
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        self.db = sqlite3.connect(cache_path, check_same_thread=False)
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                headers TEXT,
+                body TEXT,
+                size INTEGER,
+                immutable INTEGER,
+                last_access REAL
+            )
+        """)
+        self.db.commit()
+
+        # 合計サイズ（起動時に1回だけ集計し、以降は保存・削除のたびに加減する）
+        self.total_size = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        # まだ書き込んでいない最終アクセス（URL → 時刻）
+        self.pending_access = {}
+
+        # ヒット/ミス等のカウンタ
+        self.stats = {
+            'hits': 0,          # リクエストせずに返した（不変なレスポンス）
+            'revalidated': 0,   # 304で再検証できた
+            'misses': 0,        # キャッシュなし、または内容が更新されていた
+            'stored': 0,
+            'evicted': 0
+        }
+
+    def get(self, url):
+        """キャッシュエントリを取得（なければNone）"""
+        with self.lock:
+            row = self.db.execute(
+                "SELECT etag, last_modified, headers, body, immutable FROM responses WHERE url = ?", (url,)
+            ).fetchone()
+            if row is None:
+                return None
+            self.pending_access[url] = time.time()
+            if len(self.pending_access) >= ACCESS_FLUSH_SIZE:
+                self.flush_access()
+        etag, last_modified, headers, body, immutable = row
+        return {
+            'etag': etag,
+            'last_modified': last_modified,
+            'headers': json.loads(headers),
+            'body': body,
+            'immutable': bool(immutable)
+        }
+
+    def put(self, url, headers, body):
+        """200レスポンスを保存（ETagもLast-Modifiedもない場合は保存しない）"""
+        lower_headers = {k.lower(): v for k, v in headers.items()}
+        etag = lower_headers.get('etag')
+        last_modified = lower_headers.get('last-modified')
+        immutable = is_immutable_url(url)
+        if not etag and not last_modified and not immutable:
+            return
+
+        stored_headers = {k: v for k, v in lower_headers.items() if k not in VOLATILE_HEADERS}
+        size = len(body.encode('utf-8')) if body else 0
+        with self.lock:
+            old = self.db.execute("SELECT size FROM responses WHERE url = ?", (url,)).fetchone()
+            self.db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, etag, last_modified, json.dumps(stored_headers), body, size, int(immutable), time.time())
+            )
+            self.pending_access.pop(url, None)
+            self.total_size += size - (old[0] if old else 0)
+            self.stats['stored'] += 1
+            self.evict()
+            self.db.commit()
+
+    def flush_access(self):
+        """まだ書き込んでいない最終アクセスをまとめて書き込む（ロック内で呼ぶ）"""
+        if not self.pending_access:
+            return
+        self.db.executemany("UPDATE responses SET last_access = ? WHERE url = ?",
+                            [(accessed, url) for url, accessed in self.pending_access.items()])
+        self.db.commit()
+        self.pending_access.clear()
+
+    def close(self):
+        """終了時に最終アクセスを書き込む"""
+        with self.lock:
+            self.flush_access()
+
+    def evict(self):
+        """サイズ上限を超えた分を最終アクセスが古い順に削除（ロック内で呼ぶ）"""
+        if self.total_size <= self.max_bytes:
+            return
+        # 削除順を決める前に最終アクセスを反映
+        self.flush_access()
+        for url, size in self.db.execute("SELECT url, size FROM responses ORDER BY last_access").fetchall():
+            if self.total_size <= self.max_bytes:
+                break
+            self.db.execute("DELETE FROM responses WHERE url = ?", (url,))
+            self.total_size -= size
+            self.stats['evicted'] += 1
+
+    def count(self, name):
+        """カウンタを加算"""
+        with self.lock:
+            self.stats[name] += 1
+
+    def summary(self):
+        """カウンタの表示用文字列"""
+        total = self.stats['hits'] + self.stats['revalidated'] + self.stats['misses']
+        hit_rate = (self.stats['hits'] + self.stats['revalidated']) / total * 100 if total else 0
+        return (f"HTTPキャッシュ: ヒット={self.stats['hits']} 再検証(304)={self.stats['revalidated']} "
+                f"ミス={self.stats['misses']} 保存={self.stats['stored']} 削除={self.stats['evicted']} "
+                f"(ヒット率 {hit_rate:.1f}%)")
+
+
+def make_connection_class(base_class, cache, token_pool=None):
+    """PyGithubの接続クラスにキャッシュ処理とトークンの切り替えを追加したクラスを作成"""
+    class CachingConnection(base_class):
+        def send(self):
+            """実際にリクエストを送信（プールのトークンに差し替え、前後でレート制限を調整）"""
+            if token_pool is None:
+                return super().getresponse()
+
+            token, throttler = token_pool.acquire()
+            headers = {k: v for k, v in (self.headers or {}).items() if k.lower() != 'authorization'}
+            headers['Authorization'] = f'token {token}'
+            self.headers = headers
+
+            throttler.wait()
+            response = super().getresponse()
+            # PyGithubのレスポンスのread()は読み込み済みの本文を返すため、ここで読んでも後で再び読める
+            throttler.observe(response.status, dict(response.getheaders()),
+                              response.read() if response.status in (403, 429) else None)
+            return response
+
+        def getresponse(self):
+            headers = self.headers or {}
+            lower_keys = {k.lower() for k in headers}
+            # GET以外、または呼び出し側が条件付きリクエストを自前で行う場合はそのまま
+            if self.verb != 'GET' or 'if-none-match' in lower_keys or 'if-modified-since' in lower_keys:
+                return self.send()
+
+            entry = cache.get(self.url)
+
+            # 不変なレスポンスはリクエストしない
+            if entry is not None and entry['immutable']:
+                cache.count('hits')
+                return CachedResponse(200, entry['headers'], entry['body'])
+
+            if entry is not None:
+                headers = dict(headers)
+                if entry['etag']:
+                    headers['If-None-Match'] = entry['etag']
+                if entry['last_modified']:
+                    headers['If-Modified-Since'] = entry['last_modified']
+                self.headers = headers
+
+            response = self.send()
+
+            if response.status == 304 and entry is not None:
+                cache.count('revalidated')
+                # レート制限ヘッダは最新のものを使う
+                merged_headers = dict(entry['headers'])
+                merged_headers.update({k.lower(): v for k, v in response.getheaders()
+                                       if k.lower() in VOLATILE_HEADERS})
+                return CachedResponse(200, merged_headers, entry['body'])
+
+            cache.count('misses')
+            if response.status == 200:
+                cache.put(self.url, dict(response.getheaders()), response.read())
+            return response
+
+    return CachingConnection
+
+
+# プロセス内で1つだけ使う
+_installed_cache = None
+_install_lock = threading.Lock()
+
+
+def install_http_cache(cache_path, max_bytes=1024 * 1024 * 1024, token_pool=None):
+    """PyGithubの全リクエストにHTTPキャッシュを適用（2回目以降は既存のキャッシュを返す）
+
+    Args:
+        cache_path: SQLiteファイルのパス
+        max_bytes: キャッシュの合計サイズ上限（バイト）
+        token_pool: リクエストに使うTokenPool（Noneならクライアントのトークンのまま、間隔も調整しない）
+    """
+    global _installed_cache
+    with _install_lock:
+        if _installed_cache is None:
+            _installed_cache = HttpCache(cache_path, max_bytes)
+            atexit.register(_installed_cache.close)
+            Requester.injectConnectionClasses(
+                make_connection_class(HTTPRequestsConnectionClass, _installed_cache, token_pool),
+                make_connection_class(HTTPSRequestsConnectionClass, _installed_cache, token_pool)
+            )
+        return _installed_cache
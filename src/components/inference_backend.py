@@ -0,0 +1,44 @@
+"""
+コミット分類モデルの推論バックエンド
+
+- 'auto'     : device_map="auto"（GPUがあればGPU、なければCPUの全精度）
+- 'cpu-fp32' : CPUの全精度（量子化との比較用）
+- 'cpu-int8' : CPUでLinear層を動的int8量子化（torch.ao.quantization.quantize_dynamic、追加の依存なし）
+- 'cpu-int4' : CPUで重みを4bit量子化（transformersのQuantoConfig、optimum-quantoが必要）
+"""
+
+import torch
+from transformers import pipeline
+
+from components.ccs_prompt import MODEL_ID
+
+BACKENDS = ('auto', 'cpu-fp32', 'cpu-int8', 'cpu-int4')
+
+
+def load_pipeline(model_id=MODEL_ID, backend='auto', num_threads=None):
+    """バックエンドに合わせてtext-generationパイプラインを作成
+
+    Args:
+        model_id: 分類モデルのID
+        backend: BACKENDSのいずれか
+        num_threads: CPUバックエンドで使うスレッド数（Noneならtorchの既定値）
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"未対応のバックエンド: {backend}（{', '.join(BACKENDS)}）")
+
+    if backend == 'auto':
+        return pipeline("text-generation", model=model_id, device_map="auto")
+
+    if num_threads:
+        torch.set_num_threads(num_threads)
+
+    if backend == 'cpu-int4':
+        from transformers import QuantoConfig
+        return pipeline("text-generation", model=model_id, device="cpu",
+                        model_kwargs={'quantization_config': QuantoConfig(weights="int4")})
+
+    pipe = pipeline("text-generation", model=model_id, device="cpu", torch_dtype=torch.float32)
+    if backend == 'cpu-int8':
+        # 重みをint8で保持し、活性は実行時にint8へ量子化して行列積を行う（lm_headも含む）
+        torch.ao.quantization.quantize_dynamic(pipe.model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+    return pipe
@@ -0,0 +1,215 @@
+"""
+初回の分類要求までモデルを読み込まないコミット分類器
+
+transformersのimportと7Bモデルの読み込みは、キャッシュにない分類が初めて必要になった時点で行う。
+取得のみの実行や、全て分類キャッシュで済む再実行ではモデルを読み込まない。
+service_urlを指定した場合はモデルを読み込まず、分類サービス（components/classifier_service.py）に要求を送る。
+num_workersが2以上の場合は複数プロセスに分けて分類する（components/sharded_classifier.py）。
+rulesを指定した場合は、ルールで判定できたコミット（components/rule_classifier.py）はモデルに送らない。
+backend='ngram'の場合は7Bモデルの代わりに学習済みの軽量分類器（components/ngram_classifier.py）を使う。
+その結果は分類キャッシュには書き込まない。
+分類キャッシュのキーには分類方法（mode）と推論バックエンドを含める（cache_scope）。
+"""
+
+import os
+import threading
+
+from components.ccs_prompt import MODEL_ID
+from components.classification_cache import COMMIT_DIFF, FILE_PATCH, WARM_UP_SCOPE
+
+
+def mode_from_env():
+    """CLASSIFIER_MODE（既定: generate）
+
+    'score'はclassifier_benchmark.pyでgenerateとのラベル一致率を確認するまで研究データの既定にしない。
+    """
+    return os.getenv('CLASSIFIER_MODE', 'generate')
+
+
+def prefix_cache_from_env():
+    """CLASSIFIER_PREFIX_CACHE（既定: 有効）"""
+    return os.getenv('CLASSIFIER_PREFIX_CACHE', '1') != '0'
+
+
+class LazyClassifier:
+    def __init__(self, model_id=MODEL_ID, cache=None, backend='auto', service_url=None, num_workers=1,
+                 threads_per_worker=None, rules=None, ngram_model_path=None, fallback_scope=None,
+                 **classifier_kwargs):
+        """
+        model_id: 分類モデルのID
+        cache: ClassificationCache（shaを指定した分類はモデル読み込み前にここを確認する）
+        backend: 推論バックエンド（components/inference_backend.pyのBACKENDS）
+        service_url: 分類サービスのURL（指定した場合はこのプロセスではモデルを読み込まない）
+        num_workers: 分類ワーカープロセス数（1ならこのプロセスで分類）
+        threads_per_worker: 1ワーカーのスレッド数（Noneならコア数をワーカー数で割った値）
+        rules: RuleClassifier（モデル・キャッシュより先に判定する、Noneなら使わない）
+        ngram_model_path: backend='ngram'で使う重みファイル（Noneなら既定のパス）
+        fallback_scope: cache_scopeにない場合に参照する分類キャッシュのキー（例: WARM_UP_SCOPE、Noneなら参照しない）
+        classifier_kwargs: CommitClassifierに渡す引数（batch_size, mode等）
+        """
+        self.model_id = model_id
+        self.cache = cache
+        self.backend = backend
+        self.service_url = service_url
+        self.num_workers = num_workers
+        self.threads_per_worker = threads_per_worker
+        self.rules = rules
+        self.ngram_model_path = ngram_model_path
+        self.fallback_scope = fallback_scope
+        self.classifier_kwargs = classifier_kwargs
+        self.classifier = None
+        self.lock = threading.Lock()
+
+    @property
+    def cache_scope(self):
+        """分類キャッシュのキーに含める分類方法/推論バックエンド（分類サービスを使う場合は'remote'）"""
+        mode = self.classifier_kwargs.get('mode', 'generate')
+        return f"{mode}/{'remote' if self.service_url else self.backend}"
+
+    @classmethod
+    def from_env(cls, cache=None, **classifier_kwargs):
+        """環境変数（.env）の設定で作成
+
+        CLASSIFIER_URL: 分類サービスのURL
+        CLASSIFIER_BACKEND: 推論バックエンド（既定: auto、'ngram'なら軽量分類器）
+        CLASSIFIER_NGRAM_MODEL: 軽量分類器の重みファイル
+        CLASSIFIER_WORKERS: 分類ワーカープロセス数（既定: 1）
+        CLASSIFIER_THREADS: 1ワーカーのスレッド数
+        CLASSIFIER_RULES: 0ならルールによる事前分類を使わない（既定: 1）
+        CLASSIFIER_MODE: 分類方法（既定: generate、'score'なら1回の順伝播でラベルの尤度を比較）
+        CLASSIFIER_PREFIX_CACHE: 0ならシステムプロンプトのKVキャッシュを再利用しない（既定: 1、7Bモデルのみ）
+        CLASSIFIER_USE_WARMED_LABELS: 1なら他の分類方法/バックエンドでも既存の結果CSVのラベル（WARM_UP_SCOPE）を使う（既定: 0）
+        """
+        from components.rule_classifier import RuleClassifier
+        threads = os.getenv('CLASSIFIER_THREADS')
+        use_rules = os.getenv('CLASSIFIER_RULES', '1') != '0'
+        classifier_kwargs.setdefault('mode', mode_from_env())
+        classifier_kwargs.setdefault('use_prefix_cache', prefix_cache_from_env())
+        return cls(MODEL_ID, cache=cache,
+                   backend=os.getenv('CLASSIFIER_BACKEND', 'auto'),
+                   service_url=os.getenv('CLASSIFIER_URL'),
+                   num_workers=int(os.getenv('CLASSIFIER_WORKERS', '1')),
+                   threads_per_worker=int(threads) if threads else None,
+                   rules=RuleClassifier() if use_rules else None,
+                   ngram_model_path=os.getenv('CLASSIFIER_NGRAM_MODEL'),
+                   fallback_scope=WARM_UP_SCOPE if os.getenv('CLASSIFIER_USE_WARMED_LABELS') == '1' else None,
+                   **classifier_kwargs)
+
+    @property
+    def loaded(self):
+        """モデルを読み込み済みかどうか"""
+        return self.classifier is not None
+
+    @property
+    def batch_size(self):
+        return self.classifier_kwargs.get('batch_size', 8)
+
+    def get(self):
+        """分類器を取得（初回のみモデルを読み込む）"""
+        with self.lock:
+            if self.classifier is None and self.service_url:
+                from components.classifier_service import RemoteClassifier
+                print(f"分類サービスを使用: {self.service_url}")
+                self.classifier = RemoteClassifier(self.service_url)
+            elif self.classifier is None and self.backend == 'ngram':
+                from components.ngram_classifier import NgramClassifier, DEFAULT_MODEL_PATH
+                model_path = self.ngram_model_path or DEFAULT_MODEL_PATH
+                print(f"軽量分類器読み込み中: {model_path}")
+                self.classifier = NgramClassifier.load(model_path)
+            elif self.classifier is None and self.num_workers > 1:
+                from components.sharded_classifier import ShardedClassifier
+                print(f"分類モデル読み込み中: {self.model_id}（{self.backend}, {self.num_workers}プロセス）")
+                self.classifier = ShardedClassifier(self.model_id, self.backend, self.num_workers,
+                                                    self.threads_per_worker, **self.classifier_kwargs)
+            elif self.classifier is None:
+                print(f"分類モデル読み込み中: {self.model_id}（{self.backend}）")
+                from components.inference_backend import load_pipeline
+                from components.commit_classifier import CommitClassifier
+                pipe = load_pipeline(self.model_id, self.backend)
+                self.classifier = CommitClassifier(pipe, **self.classifier_kwargs)
+            return self.classifier
+
+    def prepare_prompt(self, commit_message: str, git_diff: str, context_window: int = 1024):
+        """コミット分類用プロンプト作成"""
+        return self.get().prepare_prompt(commit_message, git_diff, context_window)
+
+    def lookup(self, commit_sha, git_diff, file_path=None):
+        """分類キャッシュのみを確認（なければNone、モデルは読み込まない、file_pathはclassifyと同じ）"""
+        if self.cache is None or not commit_sha:
+            return None
+        return self.cache.get(commit_sha, git_diff, self.cache_scope, FILE_PATCH if file_path else COMMIT_DIFF,
+                              self.fallback_scope)
+
+    def classify_batch(self, pairs, context_window: int = 1024, batch_size=None, shas=None, paths=None, kind=None):
+        """複数コミットをまとめて分類
+
+        Args:
+            pairs: (commit_message, git_diff) のリスト
+            context_window: プロンプトの最大トークン数
+            batch_size: 1回のモデル呼び出しで処理するプロンプト数
+            shas: pairsに対応するコミットsha（指定した場合は分類キャッシュを使う、Noneの要素はキャッシュしない）
+            paths: pairsに対応する変更ファイルのパスのリスト（ルール分類用、差分がヘッダのないpatchや途中で打ち切った差分の場合に指定）
+            kind: 差分の種類（COMMIT_DIFF / FILE_PATCH、分類キャッシュのウォームアップしたラベルの照合に使う）
+                Noneなら、pathsを指定した場合はFILE_PATCH、それ以外はCOMMIT_DIFF
+
+        Returns:
+            list: pairsと同じ順序のラベル
+        """
+        if kind is None:
+            kind = FILE_PATCH if paths is not None else COMMIT_DIFF
+        if self.rules is None:
+            return self.classify_with_model(pairs, context_window, batch_size, shas, kind, paths)
+
+        # ルールで判定できなかったものだけモデルで分類
+        labels = self.rules.classify_batch(pairs, paths)
+        undecided = [i for i, label in enumerate(labels) if label is None]
+        if undecided:
+            model_labels = self.classify_with_model([pairs[i] for i in undecided], context_window, batch_size,
+                                                    [shas[i] for i in undecided] if shas is not None else None, kind,
+                                                    [paths[i] for i in undecided] if paths is not None else None)
+            for i, label in zip(undecided, model_labels):
+                labels[i] = label
+        return labels
+
+    def classify_with_model(self, pairs, context_window: int = 1024, batch_size=None, shas=None, kind=COMMIT_DIFF,
+                            paths=None):
+        """分類キャッシュとモデルで分類（shasを指定した場合はキャッシュにないものだけモデルで分類）"""
+        if self.cache is None or shas is None:
+            return self.run_model(pairs, context_window, batch_size, paths)
+
+        # キャッシュにないものだけモデルで分類
+        scope = self.cache_scope
+        labels = [self.cache.get(sha, diff, scope, kind, self.fallback_scope) if sha else None
+                  for sha, (_, diff) in zip(shas, pairs)]
+        missing = [i for i, label in enumerate(labels) if label is None]
+        if missing:
+            new_labels = self.run_model([pairs[i] for i in missing], context_window, batch_size,
+                                        [paths[i] for i in missing] if paths is not None else None,
+                                        [shas[i] for i in missing], kind)
+            for i, label in zip(missing, new_labels):
+                labels[i] = label
+            if self.backend != 'ngram':
+                self.cache.put_many([(shas[i], pairs[i][1], labels[i]) for i in missing if shas[i]], scope)
+        return labels
+
+    def run_model(self, pairs, context_window: int = 1024, batch_size=None, paths=None, shas=None, kind=COMMIT_DIFF):
+        """モデルで分類
+
+        変更ファイルのパスは特徴量に使う軽量分類器にだけ渡す。
+        分類サービスにはshas・kindも送り、サービス側の分類キャッシュを使わせる（shasがNoneなら使わない）。
+        """
+        if self.service_url:
+            return self.get().classify_batch(pairs, context_window, batch_size, shas=shas, paths=paths, kind=kind)
+        if self.backend == 'ngram':
+            return self.get().classify_batch(pairs, context_window, batch_size, paths=paths)
+        return self.get().classify_batch(pairs, context_window, batch_size)
+
+    def classify(self, commit_message: str, git_diff: str, context_window: int = 1024, commit_sha=None,
+                 file_path=None):
+        """コミット分類（1件、commit_shaを指定した場合は分類キャッシュを使う）
+
+        file_path: git_diffがファイルごとのpatch（ヘッダなし）の場合のファイルパス（ルール分類用）
+        """
+        shas = [commit_sha] if commit_sha else None
+        paths = [[file_path]] if file_path else None
+        return self.classify_batch([(commit_message, git_diff)], context_window, shas=shas, paths=paths)[0]
@@ -0,0 +1,162 @@
+"""
+ハッシュしたn-gram特徴量と線形モデルによる軽量なコミット分類器（7Bモデルの分類結果から学習）
+
+特徴量（zlib.crc32でNUM_FEATURES次元にハッシュ、件数はlog1pの後にL2正規化）:
+- コミットメッセージの単語unigram / bigram
+- 変更ファイルのパスの要素と拡張子（差分のヘッダ、またはヘッダのないpatchの場合は指定したパス）
+- 差分の追加行 / 削除行の単語unigram（プロンプトに入る分の先頭のみ）
+モデルは多クラスロジスティック回帰（SGD）。CPUで1件あたり数十マイクロ秒で分類できる。
+
+CommitClassifierと同じclassify_batchを持ち、LazyClassifier(backend='ngram') から使う。
+"""
+
+import os
+import re
+import zlib
+
+import numpy as np
+
+from components.ccs_prompt import LABELS, diff_byte_budget
+
+DEFAULT_MODEL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '../data_list/ngram_classifier/model.npz')
+NUM_FEATURES = 2 ** 18
+
+WORD = re.compile(r"[a-z_]+|\d+")
+DIFF_PATH = re.compile(r'^diff --git a/.* b/(.*)$')
+
+
+def words(text):
+    return WORD.findall(text.lower())
+
+
+def path_feature_names(path):
+    """変更ファイルのパスの要素と拡張子の特徴量名"""
+    names = ['p:' + part for part in words(path)]
+    if '.' in path.rsplit('/', 1)[-1]:
+        names.append('x:' + path.rsplit('.', 1)[-1].lower())
+    return names
+
+
+def feature_names(commit_message, git_diff, max_diff_bytes, paths=None):
+    """特徴量名のリスト（重複あり）
+
+    paths: 変更ファイルのパス（ファイルごとのpatchにはヘッダがないため指定する、Noneなら差分のヘッダから取得）
+    """
+    names = []
+    message_words = words((commit_message or "")[:1000])
+    names.extend('m:' + word for word in message_words)
+    names.extend(f'm2:{a} {b}' for a, b in zip(message_words, message_words[1:]))
+    for path in paths or ():
+        names.extend(path_feature_names(path))
+
+    for line in (git_diff or "")[:max_diff_bytes].splitlines():
+        match = DIFF_PATH.match(line)
+        if match:
+            if paths is None:
+                names.extend(path_feature_names(match.group(1)))
+        elif line.startswith('+') and not line.startswith('+++'):
+            names.extend('a:' + word for word in words(line))
+        elif line.startswith('-') and not line.startswith('---'):
+            names.extend('r:' + word for word in words(line))
+    return names
+
+
+def extract_features(commit_message, git_diff, context_window=1024, paths=None):
+    """ハッシュした疎な特徴量
+
+    Returns:
+        tuple: (indices, values) - 重複のないインデックスとL2正規化した値
+    """
+    counts = {}
+    for name in feature_names(commit_message, git_diff, diff_byte_budget(context_window), paths):
+        index = zlib.crc32(name.encode('utf-8')) % NUM_FEATURES
+        counts[index] = counts.get(index, 0) + 1
+    indices = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+    values = np.log1p(np.fromiter(counts.values(), dtype=np.float32, count=len(counts)))
+    norm = np.linalg.norm(values)
+    if norm > 0:
+        values /= norm
+    return indices, values
+
+
+def softmax(scores):
+    scores = scores - scores.max()
+    exp = np.exp(scores)
+    return exp / exp.sum()
+
+
+class NgramClassifier:
+    def __init__(self, weights=None, bias=None, train_shas=()):
+        """
+        weights: (NUM_FEATURES, ラベル数) の重み（Noneなら0で初期化）
+        bias: (ラベル数,) のバイアス
+        train_shas: 学習に使ったコミット（評価用のサンプルとの重複の確認用）
+        """
+        self.weights = weights if weights is not None else np.zeros((NUM_FEATURES, len(LABELS)), dtype=np.float32)
+        self.bias = bias if bias is not None else np.zeros(len(LABELS), dtype=np.float32)
+        self.train_shas = set(train_shas)
+        self.batch_size = None
+
+    def scores(self, features):
+        indices, values = features
+        return values @ self.weights[indices] + self.bias
+
+    def fit(self, pairs, labels, epochs=5, learning_rate=0.5, l2=1e-6, seed=0, context_window=1024, paths=None):
+        """SGDで学習
+
+        Args:
+            pairs: (commit_message, git_diff) のリスト
+            labels: 教師ラベル（7Bモデルの分類結果、LABELS以外は除く）
+            paths: pairsに対応する変更ファイルのパスのリスト（feature_namesと同じ、Noneなら差分のヘッダから取得）
+        """
+        paths = paths if paths is not None else [None] * len(pairs)
+        data = [(extract_features(message, diff, context_window, file_paths), LABELS.index(label))
+                for (message, diff), label, file_paths in zip(pairs, labels, paths) if label in LABELS]
+        rng = np.random.default_rng(seed)
+        for epoch in range(epochs):
+            rate = learning_rate / (1 + epoch)
+            loss = 0.0
+            for i in rng.permutation(len(data)):
+                (indices, values), target = data[i]
+                probs = softmax(self.scores((indices, values)))
+                loss -= np.log(probs[target] + 1e-12)
+                grad = probs
+                grad[target] -= 1.0
+                self.weights[indices] -= rate * (np.outer(values, grad) + l2 * self.weights[indices])
+                self.bias -= rate * grad
+            print(f"エポック {epoch + 1}/{epochs}: 平均損失 {loss / max(len(data), 1):.4f}")
+        return self
+
+    def predict_proba(self, commit_message, git_diff, context_window=1024, paths=None):
+        """{ラベル: 確率}"""
+        probs = softmax(self.scores(extract_features(commit_message, git_diff, context_window, paths)))
+        return dict(zip(LABELS, probs.tolist()))
+
+    def classify_batch(self, pairs, context_window: int = 1024, batch_size=None, paths=None):
+        """複数コミットを分類（batch_sizeは使わない、pathsはfitと同じ）"""
+        paths = paths if paths is not None else [None] * len(pairs)
+        return [LABELS[int(np.argmax(self.scores(extract_features(message, diff, context_window, file_paths))))]
+                for (message, diff), file_paths in zip(pairs, paths)]
+
+    def prepare_prompt(self, commit_message: str, git_diff: str, context_window: int = 1024):
+        """入力の確認用（ハッシュ前の特徴量名を空白区切りで返す）"""
+        return " ".join(feature_names(commit_message, git_diff, diff_byte_budget(context_window)))
+
+    def classify(self, commit_message: str, git_diff: str, context_window: int = 1024):
+        """コミット分類（1件）"""
+        return self.classify_batch([(commit_message, git_diff)], context_window)[0]
+
+    def save(self, path, train_shas=()):
+        """重みと学習に使ったコミットを保存（npz）"""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        np.savez_compressed(path, weights=self.weights, bias=self.bias, labels=np.array(LABELS),
+                            num_features=NUM_FEATURES, train_shas=np.array(sorted(train_shas), dtype=str))
+
+    @classmethod
+    def load(cls, path):
+        """保存した重みを読み込む（ラベル・次元数が現在の定義と異なればエラー）"""
+        data = np.load(path)
+        if list(data['labels']) != LABELS or int(data['num_features']) != NUM_FEATURES:
+            raise ValueError(f"ラベルまたは特徴量の次元数が異なるモデルです: {path}")
+        train_shas = data['train_shas'].tolist() if 'train_shas' in data.files else ()
+        return cls(data['weights'], data['bias'], train_shas)
@@ -0,0 +1,99 @@
+"""
+GitHub APIのレート制限に合わせたリクエスト間隔の調整
+
+レスポンスの X-RateLimit-Remaining / X-RateLimit-Reset / Retry-After を読み、
+残りの回数をリセットまでの残り時間に均等に割り振る。
+残り回数がなくなった場合はリセット時刻まで待機する。
+403/429はレート制限によるもの（残り回数0、または本文が二次レート制限）の場合のみ待機する
+（権限がない等の403では待機しない）。
+"""
+
+import threading
+import time
+from datetime import datetime
+
+# 二次レート制限（Retry-Afterなしの403/429）時の待機時間（秒）
+SECONDARY_LIMIT_WAIT = 60
+
+
+def is_secondary_limit(status, body):
+    """二次レート制限のレスポンスか（429、または本文に "secondary rate limit" を含む403）"""
+    if status == 429:
+        return True
+    if isinstance(body, bytes):
+        body = body.decode('utf-8', errors='replace')
+    return status == 403 and 'secondary rate limit' in (body or '').lower()
+
+
+class RateLimitThrottler:
+    def __init__(self, reserve=0):
+        """
+        reserve: 使い切らずに残しておく回数（他の用途のための予備）
+        """
+        self.reserve = reserve
+        self.lock = threading.Lock()
+        self.remaining = None  # 残り回数（未取得ならNone）
+        self.reset_at = None  # リセット時刻（UNIX時間）
+        self.blocked_until = 0  # Retry-After等で指定された再開時刻
+        self.next_slot = 0  # 次のリクエストを送ってよい時刻
+        self.total_wait = 0.0  # 待機した合計時間（秒）
+
+    def wait(self):
+        """リクエスト前に呼ぶ: 必要な時間だけ待機する（複数スレッドからの呼び出しも順番に割り振る）"""
+        with self.lock:
+            now = time.time()
+            start = max(now, self.blocked_until)
+
+            if self.remaining is not None and self.reset_at is not None and self.reset_at > now:
+                budget = self.remaining - self.reserve
+                if budget <= 0:
+                    # 残りなし: リセットまで待つ（他のスレッドも新しいレスポンスヘッダが届くまで同じく待たせる）
+                    self.blocked_until = max(self.blocked_until, self.reset_at + 1)
+                    start = max(start, self.blocked_until)
+                else:
+                    # 残り回数をリセットまでの時間に均等に割り振る
+                    interval = (self.reset_at - now) / budget
+                    start = max(start, self.next_slot)
+                    self.next_slot = start + interval
+                    self.remaining -= 1
+
+            delay = start - now
+            if delay > 0:
+                self.total_wait += delay
+
+        if delay > 0:
+            if delay >= 10:
+                resume = datetime.fromtimestamp(start).strftime('%H:%M:%S')
+                print(f"\n[レート制限] {delay:.0f}秒待機します（{resume}に再開）")
+            time.sleep(delay)
+
+    def observe(self, status, headers, body=None):
+        """レスポンス受信後に呼ぶ: レート制限ヘッダから状態を更新する
+
+        Args:
+            status: HTTPステータスコード
+            headers: レスポンスヘッダ（dict）
+            body: レスポンス本文（403の場合に二次レート制限かどうかの判定に使う）
+        """
+        headers = {k.lower(): v for k, v in headers.items()}
+        now = time.time()
+        with self.lock:
+            # coreのみ管理（searchやgraphqlは別枠）
+            if headers.get('x-ratelimit-resource', 'core') == 'core':
+                if 'x-ratelimit-remaining' in headers:
+                    self.remaining = int(headers['x-ratelimit-remaining'])
+                if 'x-ratelimit-reset' in headers:
+                    self.reset_at = int(headers['x-ratelimit-reset'])
+
+            if 'retry-after' in headers:
+                self.blocked_until = max(self.blocked_until, now + int(headers['retry-after']))
+            elif status in (403, 429):
+                if headers.get('x-ratelimit-remaining') == '0' and 'x-ratelimit-reset' in headers:
+                    self.blocked_until = max(self.blocked_until, int(headers['x-ratelimit-reset']) + 1)
+                elif is_secondary_limit(status, body):
+                    self.blocked_until = max(self.blocked_until, now + SECONDARY_LIMIT_WAIT)
+
+    def summary(self):
+        """表示用の状態"""
+        reset = datetime.fromtimestamp(self.reset_at).strftime('%H:%M:%S') if self.reset_at else '-'
+        return f"レート制限: 残り={self.remaining} リセット={reset} 待機合計={self.total_wait:.0f}秒"
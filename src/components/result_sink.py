@@ -0,0 +1,181 @@
+"""
+追記のみの結果CSV（既存の行を読み直さずに重複を除いて追記する）
+
+- 重複判定はキー列（repository_name, file_name, commit_hash 等）のインデックスで行う
+- インデックスは「CSV名.idx」にJSON Linesで追記する（1回の追記ごとに、追記後のCSVのサイズ・末尾のハッシュ・キー）
+- 追記は「インデックスに追記後の予定サイズ（intent）→ CSV → インデックスに確定エントリ」の順にそれぞれfsyncする。
+  インデックスに確定したサイズまでが確定した内容で、それより後ろが予定サイズ以内なら（追記途中で停止した分）
+  次に開いたときに切り詰める
+- CSVが他のスクリプトで書き換えられた場合（サイズ・末尾が記録と一致しない、または予定のない追記がある）は、
+  キー列だけを読んでインデックスを作り直す
+"""
+
+import csv
+import hashlib
+import io
+import json
+import os
+import threading
+
+import pandas as pd
+
+# 確定位置の確認に使う末尾のバイト数
+TAIL_BYTES = 256
+
+
+def tail_digest(path, size):
+    """ファイルのsizeバイト目までの末尾TAIL_BYTESのハッシュ"""
+    with open(path, 'rb') as f:
+        f.seek(max(0, size - TAIL_BYTES))
+        return hashlib.sha256(f.read(min(size, TAIL_BYTES))).hexdigest()
+
+
+def fsync_append(path, data):
+    """ファイルの末尾にdataを書き込んでfsync"""
+    with open(path, 'ab') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def read_index(index_path):
+    """JSON Linesのインデックスを読み込む
+
+    追記途中で停止した行（JSONとして読めない行）があれば、それより前のエントリだけで
+    インデックスを書き直す（壊れた行の後ろに追記すると、次に開いたときにその分が読まれなくなるため）
+
+    Returns:
+        list: 有効なエントリ
+    """
+    entries = []
+    if not os.path.exists(index_path):
+        return entries
+    torn = False
+    with open(index_path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                entries.append(json.loads(line))
+            except json.JSONDecodeError:
+                torn = True
+                break
+    if torn:
+        print(f"インデックスの壊れた行を除去: {index_path}（有効なエントリ{len(entries)}件）")
+        rewrite_index(index_path, entries)
+    return entries
+
+
+def rewrite_index(index_path, entries):
+    """インデックスをentriesだけで書き直す（一時ファイルに書いてから置き換える）"""
+    tmp_path = index_path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        for entry in entries:
+            f.write((json.dumps(entry, ensure_ascii=False) + '\n').encode('utf-8'))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, index_path)
+
+
+class AppendOnlyCsvSink:
+    def __init__(self, csv_path, columns, key_columns):
+        """
+        csv_path: 結果CSVのパス（utf-8-sig、ヘッダはcolumns）
+        columns: 列名のリスト（新規作成時のヘッダ、追記する行はこの順に並べる）
+        key_columns: 重複判定に使う列
+        """
+        self.csv_path = csv_path
+        self.index_path = csv_path + '.idx'
+        self.columns = list(columns)
+        self.key_columns = list(key_columns)
+        self.lock = threading.Lock()
+        self.keys = set()
+        os.makedirs(os.path.dirname(os.path.abspath(csv_path)), exist_ok=True)
+        self.open()
+
+    def key(self, row):
+        return tuple(str(row[column]) for column in self.key_columns)
+
+    def open(self):
+        """インデックスを読み込み、CSVの確定位置を確認"""
+        if not os.path.exists(self.csv_path):
+            header = io.StringIO()
+            csv.writer(header, lineterminator='\n').writerow(self.columns)
+            with open(self.csv_path, 'wb') as f:
+                f.write(header.getvalue().encode('utf-8-sig'))
+                f.flush()
+                os.fsync(f.fileno())
+            if os.path.exists(self.index_path):
+                os.remove(self.index_path)
+            self.write_index_entry([])
+            return
+
+        # インデックスへの追記途中で停止した行があれば除去する（その分のCSVは未確定として扱う）
+        entries = read_index(self.index_path)
+        commits = [entry for entry in entries if 'keys' in entry]
+        # 確定エントリの後に予定サイズだけがある場合は、このクラスの追記の途中で停止した
+        intent = entries[-1].get('intent') if entries and 'intent' in entries[-1] else None
+
+        size = os.path.getsize(self.csv_path)
+        last = commits[-1] if commits else None
+        if last is None or size < last['size'] or tail_digest(self.csv_path, last['size']) != last['tail']:
+            self.rebuild_index()
+            return
+        if size > last['size']:
+            if intent is None or size > intent:
+                # 確定した内容の後ろに他のスクリプトが追記した
+                self.rebuild_index()
+                return
+            print(f"未確定の追記を切り詰め: {self.csv_path}（{size - last['size']}バイト）")
+            with open(self.csv_path, 'r+b') as f:
+                f.truncate(last['size'])
+                os.fsync(f.fileno())
+        for entry in commits:
+            self.keys.update(tuple(key) for key in entry['keys'])
+
+    def rebuild_index(self):
+        """CSVのキー列だけを読んでインデックスを作り直す"""
+        df = pd.read_csv(self.csv_path, usecols=self.key_columns, dtype=str, keep_default_na=False)
+        self.keys = {self.key(row) for row in df.to_dict('records')}
+        open(self.index_path, 'w').close()
+        self.write_index_entry(sorted(self.keys))
+        print(f"インデックス再作成: {self.index_path}（{len(self.keys)}件）")
+
+    def write_index_entry(self, keys):
+        """確定したCSVのサイズ・末尾のハッシュ・追加したキーをインデックスに追記"""
+        size = os.path.getsize(self.csv_path)
+        entry = {'size': size, 'tail': tail_digest(self.csv_path, size), 'keys': [list(key) for key in keys]}
+        fsync_append(self.index_path, (json.dumps(entry, ensure_ascii=False) + '\n').encode('utf-8'))
+
+    def append(self, rows):
+        """行を追記（既にあるキーの行と、rows内で重複する行は追記しない）
+
+        Args:
+            rows: dictのリスト
+
+        Returns:
+            int: 追記した行数
+        """
+        with self.lock:
+            new_rows = []
+            new_keys = {}
+            for row in rows:
+                key = self.key(row)
+                if key in self.keys or key in new_keys:
+                    continue
+                new_keys[key] = True
+                new_rows.append(row)
+            if not new_rows:
+                return 0
+
+            data = pd.DataFrame(new_rows).reindex(columns=self.columns).to_csv(index=False, header=False,
+                                                                              lineterminator='\n').encode('utf-8')
+            # 追記後の予定サイズを先に記録（停止した場合に、この分だけを未確定として切り詰めるため）
+            intent = {'intent': os.path.getsize(self.csv_path) + len(data)}
+            fsync_append(self.index_path, (json.dumps(intent) + '\n').encode('utf-8'))
+            fsync_append(self.csv_path, data)
+            self.write_index_entry(list(new_keys))
+            # 書き込みが確定してからインデックスに加える
+            self.keys.update(new_keys)
+            return len(new_rows)
+
+    def __len__(self):
+        return len(self.keys)
@@ -0,0 +1,163 @@
+"""
+リポジトリごとに分割したParquetの結果ストア（results_v5 / results_v7等の単一CSVの代わり）
+
+- 保存先は「ストアのディレクトリ/repository_name=<URLエンコードしたリポジトリ名>/*.parquet」（hiveパーティション）
+- 列は型付きで保存する（日時はUTCのtimestamp、件数・行数は整数、ラベル等はcategory）
+- 読み込み時は必要な列・リポジトリだけを読む（他のパーティションのファイルは開かない）
+- リポジトリの削除はパーティションのディレクトリを削除するだけ（他のリポジトリは書き直さない）
+"""
+
+import os
+import shutil
+from urllib.parse import unquote
+
+import pandas as pd
+
+PARTITION_COLUMN = 'repository_name'
+
+# 結果CSVの列の型（ここにない列はそのまま保存する）
+DATETIME_COLUMNS = ['file_creation_date', 'commit_date']
+INT_COLUMNS = ['file_line_count', 'file_commit_count', 'commit_changed_lines', 'file_specific_changed_lines']
+CATEGORY_COLUMNS = ['file_created_by', 'commit_created_by', 'commit_classification']
+STRING_COLUMNS = ['file_name', 'file_creators', 'commit_hash', 'commit_authors']
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+RESULTS_DIR = os.path.join(script_dir, '../../results/EASE-results')
+
+
+def normalize_types(df):
+    """結果の列を保存用の型に変換"""
+    df = df.copy()
+    for column in DATETIME_COLUMNS:
+        if column in df.columns:
+            df[column] = pd.to_datetime(df[column], utc=True, errors='coerce', format='ISO8601')
+    for column in INT_COLUMNS:
+        if column in df.columns:
+            df[column] = pd.to_numeric(df[column], errors='coerce').astype('Int64')
+    for column in CATEGORY_COLUMNS:
+        if column in df.columns:
+            df[column] = df[column].astype('category')
+    for column in STRING_COLUMNS:
+        if column in df.columns:
+            df[column] = df[column].astype('string')
+    return df
+
+
+def to_plain_types(df):
+    """CSVをpd.read_csvで読んだ場合と同じ型に戻す
+
+    - category・string列は文字列（read_csvと同じdtype、欠損値はNaN）
+    - 整数列（Int64）は欠損値がなければint64、あればfloat64（numpy・scipyの処理が扱える型）
+    - 日時列はISO 8601の文字列（CSVに保存されていた形式）
+    """
+    for column in df.columns:
+        dtype = df[column].dtype
+        if isinstance(dtype, (pd.CategoricalDtype, pd.StringDtype)):
+            df[column] = df[column].astype(object).where(df[column].notna(), float('nan')).infer_objects()
+        elif isinstance(dtype, pd.Int64Dtype):
+            df[column] = df[column].astype('float64' if df[column].hasnans else 'int64')
+        elif isinstance(dtype, pd.DatetimeTZDtype):
+            df[column] = df[column].map(lambda value: value.isoformat() if not pd.isna(value) else float('nan')).infer_objects()
+    return df
+
+
+class ResultsStore:
+    def __init__(self, store_dir):
+        """
+        store_dir: ストアのディレクトリ（なければ最初の書き込みで作成）
+        """
+        self.store_dir = store_dir
+
+    @classmethod
+    def named(cls, name):
+        """results/EASE-results/parquet/<name> のストア（例: 'results_v7_released_commits_restriction'）"""
+        return cls(os.path.join(RESULTS_DIR, 'parquet', name))
+
+    def exists(self):
+        return os.path.isdir(self.store_dir) and bool(self.partition_dirs())
+
+    def partition_dirs(self):
+        """{リポジトリ名: パーティションのディレクトリ}"""
+        if not os.path.isdir(self.store_dir):
+            return {}
+        prefix = f"{PARTITION_COLUMN}="
+        return {unquote(name[len(prefix):]): os.path.join(self.store_dir, name)
+                for name in os.listdir(self.store_dir) if name.startswith(prefix)}
+
+    def repositories(self):
+        """保存されているリポジトリ名の一覧"""
+        return sorted(self.partition_dirs())
+
+    def write(self, df):
+        """結果を書き込む（dfに含まれるリポジトリのパーティションは置き換え、それ以外はそのまま）"""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if len(df) == 0:
+            return
+        os.makedirs(self.store_dir, exist_ok=True)
+        table = pa.Table.from_pandas(normalize_types(df), preserve_index=False)
+        pq.write_to_dataset(table, self.store_dir, partition_cols=[PARTITION_COLUMN],
+                            existing_data_behavior='delete_matching')
+
+    def read(self, columns=None, repositories=None, categorical=True):
+        """結果を読み込む
+
+        Args:
+            columns: 読み込む列（Noneなら全列、repository_nameは常に含む）
+            repositories: 読み込むリポジトリ（Noneなら全リポジトリ）
+            categorical: Falseならto_plain_typesでCSVから読んだ場合と同じ型に戻す
+                （groupby・value_counts・scipyの結果をCSVから読んだ場合と同じにする）
+
+        Returns:
+            DataFrame
+        """
+        if columns is not None and PARTITION_COLUMN not in columns:
+            columns = [PARTITION_COLUMN, *columns]
+        filters = [(PARTITION_COLUMN, 'in', list(repositories))] if repositories is not None else None
+        df = pd.read_parquet(self.store_dir, engine='pyarrow', columns=columns, filters=filters)
+        if not categorical:
+            df = to_plain_types(df)
+        return df
+
+    def drop_repository(self, repository_name):
+        """リポジトリのパーティションを削除
+
+        Returns:
+            bool: 削除した場合True
+        """
+        partition_dir = self.partition_dirs().get(repository_name)
+        if partition_dir is None:
+            return False
+        shutil.rmtree(partition_dir)
+        return True
+
+    def import_csv(self, csv_path):
+        """既存の結果CSVを取り込む（CSVに含まれるリポジトリのパーティションは置き換え）
+
+        Returns:
+            int: 取り込んだ行数
+        """
+        df = pd.read_csv(csv_path)
+        self.write(df)
+        return len(df)
+
+
+def load_results(name, columns=None, repositories=None, categorical=True):
+    """結果を読み込む（Parquetのストアがあればそこから、なければ同名のCSVから）
+
+    Args:
+        name: 結果の名前（例: 'results_v7_released_commits_restriction'）
+        categorical: ResultsStore.readと同じ（CSVから読む場合、Falseなら型を変換しない）
+    """
+    store = ResultsStore.named(name)
+    if store.exists():
+        return store.read(columns, repositories, categorical)
+
+    usecols = None
+    if columns is not None:
+        usecols = columns if PARTITION_COLUMN in columns else [PARTITION_COLUMN, *columns]
+    df = pd.read_csv(os.path.join(RESULTS_DIR, 'csv', f"{name}.csv"), usecols=usecols)
+    if repositories is not None:
+        df = df[df[PARTITION_COLUMN].isin(list(repositories))]
+    return normalize_types(df) if categorical else df
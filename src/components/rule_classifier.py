@@ -0,0 +1,122 @@
+"""
+ルールによるコミットの事前分類（判定できたものはモデルに送らない）
+
+1. コミットメッセージの1行目がConventional Commitsの接頭辞（fix:, docs(...):, feat!: 等）を持つ場合はその種類
+2. 変更ファイルが全てテスト / CI設定 / ドキュメント / ビルド設定のいずれか1種類の場合はその種類
+どちらにも当てはまらないものはNone（モデルで分類する）。
+"""
+
+import re
+
+from components.ccs_prompt import LABELS
+
+# 「種類(スコープ)!: 説明」
+CONVENTIONAL_PREFIX = re.compile(r'^\s*([a-zA-Z]+)(?:\([^)]*\))?!?:\s')
+
+# 接頭辞の表記ゆれ
+PREFIX_ALIASES = {
+    'doc': 'docs',
+    'tests': 'test',
+    'feature': 'feat',
+    'bugfix': 'fix',
+    'hotfix': 'fix',
+    'deps': 'build',
+}
+
+# パスの判定ルール（上から順に判定し、最初に一致したものを使う）
+PATH_RULES = [
+    ('ci', re.compile(r'(^|/)(\.github/workflows|\.github/actions|\.circleci)/|(^|/)(\.travis\.yml|\.gitlab-ci\.yml|'
+                      r'azure-pipelines\.yml|Jenkinsfile|appveyor\.yml)$')),
+    ('build', re.compile(r'(^|/)(package\.json|package-lock\.json|yarn\.lock|pnpm-lock\.yaml|requirements[^/]*\.txt|'
+                         r'pyproject\.toml|setup\.py|setup\.cfg|poetry\.lock|Pipfile(\.lock)?|Cargo\.(toml|lock)|'
+                         r'go\.(mod|sum)|pom\.xml|[^/]*\.gradle(\.kts)?|gradle\.properties|Makefile|CMakeLists\.txt|'
+                         r'[^/]*\.cmake|Gemfile(\.lock)?|[^/]*\.csproj|Directory\.Build\.props)$')),
+    ('test', re.compile(r'(^|/)(tests?|__tests__|spec)/|(^|/)test_[^/]*\.py$|_test\.(py|go)$|'
+                        r'\.(test|spec)\.[jt]sx?$|Tests?\.(java|cs|kt)$')),
+    ('docs', re.compile(r'(^|/)docs?/|\.(md|rst|adoc)$|(^|/)(LICENSE|CHANGELOG|AUTHORS|CONTRIBUTORS)[^/]*$')),
+]
+
+DIFF_PATH = re.compile(r'^diff --git a/(.*) b/(.*)$', re.MULTILINE)
+
+
+def paths_from_diff(git_diff):
+    """git diff形式の差分から変更ファイルのパスを取得（ヘッダのないpatchなら空）"""
+    return [match.group(2) for match in DIFF_PATH.finditer(git_diff or "")]
+
+
+def label_from_message(commit_message):
+    """Conventional Commitsの接頭辞からラベルを判定（なければNone）"""
+    first_line = (commit_message or "").split('\n', 1)[0]
+    match = CONVENTIONAL_PREFIX.match(first_line)
+    if not match:
+        return None
+    prefix = match.group(1).lower()
+    prefix = PREFIX_ALIASES.get(prefix, prefix)
+    return prefix if prefix in LABELS else None
+
+
+def label_from_path(path):
+    """1ファイルのパスの種類（どれにも当てはまらなければNone）"""
+    for label, pattern in PATH_RULES:
+        if pattern.search(path):
+            return label
+    return None
+
+
+def label_from_paths(paths):
+    """変更ファイルが全て同じ種類ならその種類（それ以外はNone）"""
+    labels = {label_from_path(path) for path in paths}
+    if len(labels) == 1:
+        return labels.pop()
+    return None
+
+
+class RuleClassifier:
+    def __init__(self, use_message=True, use_paths=True):
+        """
+        use_message: Conventional Commitsの接頭辞で判定する
+        use_paths: 変更ファイルのパスで判定する
+        """
+        self.use_message = use_message
+        self.use_paths = use_paths
+        self.counts = {'message': 0, 'paths': 0, 'model': 0}
+
+    def classify(self, commit_message, git_diff, paths=None):
+        """ルールで分類
+
+        Args:
+            paths: 変更ファイルのパス（Noneなら差分のヘッダから取得）
+
+        Returns:
+            tuple: (ラベル, 判定方法 'message' / 'paths') - 判定できなければ (None, 'model')
+        """
+        if self.use_message:
+            label = label_from_message(commit_message)
+            if label:
+                return label, 'message'
+        if self.use_paths:
+            label = label_from_paths(paths if paths is not None else paths_from_diff(git_diff))
+            if label:
+                return label, 'paths'
+        return None, 'model'
+
+    def classify_batch(self, pairs, paths=None):
+        """複数コミットをルールで分類（判定できないものはNone）
+
+        Args:
+            paths: pairsに対応する変更ファイルのパスのリスト（Noneまたは要素がNoneなら差分のヘッダから取得）
+        """
+        labels = []
+        for (message, diff), file_paths in zip(pairs, paths if paths is not None else [None] * len(pairs)):
+            label, source = self.classify(message, diff, file_paths)
+            self.counts[source] += 1
+            labels.append(label)
+        return labels
+
+    def summary(self):
+        """表示用の統計"""
+        total = sum(self.counts.values())
+        covered = self.counts['message'] + self.counts['paths']
+        rate = covered / total * 100 if total else 0
+        return (f"ルール分類: {covered}/{total}件（{rate:.1f}%、接頭辞={self.counts['message']}, "
+                f"パス={self.counts['paths']}）")
@@ -0,0 +1,27 @@
+"""
+リザーバサンプリング（件数が事前に分からないストリームから一様にk件を選ぶ）
+"""
+
+import random
+
+
+class ReservoirSampler:
+    def __init__(self, k, rng=None):
+        """
+        k: 選ぶ件数
+        rng: random.Random（Noneなら毎回異なる結果）
+        """
+        self.k = k
+        self.rng = rng or random.Random()
+        self.items = []
+        self.seen = 0  # これまでに見た件数
+
+    def add(self, item):
+        """1件追加（見た件数に対してk/seenの確率でサンプルに残る）"""
+        self.seen += 1
+        if len(self.items) < self.k:
+            self.items.append(item)
+        else:
+            j = self.rng.randrange(self.seen)
+            if j < self.k:
+                self.items[j] = item
@@ -0,0 +1,95 @@
+"""
+複数プロセスでのコミット分類（CPUコアを分割して使う）
+
+1つのtorchプロセスでは多コアのCPUを使い切れないため、分類対象をN個のワーカープロセスに分けて処理する。
+- 各ワーカーは固定のスレッド数（threads_per_worker）でモデルを1つずつ読み込む（メモリはN倍必要）
+- 入力は文字数でソートしてから順番に配り、ワーカーごとの処理量をそろえる
+- 結果は入力と同じ順序に並べ直して返す
+
+CommitClassifierと同じclassify_batch / prepare_promptを持ち、LazyClassifier(num_workers=...) から使う。
+"""
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+# ワーカープロセス内の分類器
+worker_classifier = None
+
+
+def init_worker(model_id, backend, num_threads, classifier_kwargs):
+    """ワーカープロセスの初期化（スレッド数を固定してモデルを読み込む）"""
+    global worker_classifier
+    # torchのimport前に設定する（OpenMPのスレッド数は最初のimport時に決まる）
+    os.environ['OMP_NUM_THREADS'] = str(num_threads)
+    os.environ['MKL_NUM_THREADS'] = str(num_threads)
+    import torch
+    from components.inference_backend import load_pipeline
+    from components.commit_classifier import CommitClassifier
+
+    torch.set_num_threads(num_threads)
+    pipe = load_pipeline(model_id, backend, num_threads=num_threads)
+    worker_classifier = CommitClassifier(pipe, **classifier_kwargs)
+
+
+def classify_shard(pairs, context_window, batch_size):
+    """ワーカープロセスで1シャード分を分類"""
+    return worker_classifier.classify_batch(pairs, context_window, batch_size)
+
+
+def prepare_prompt_in_worker(commit_message, git_diff, context_window):
+    return worker_classifier.prepare_prompt(commit_message, git_diff, context_window)
+
+
+class ShardedClassifier:
+    def __init__(self, model_id, backend='cpu-fp32', num_workers=4, threads_per_worker=None, **classifier_kwargs):
+        """
+        model_id: 分類モデルのID
+        backend: 推論バックエンド（components/inference_backend.pyのBACKENDS）
+        num_workers: ワーカープロセス数
+        threads_per_worker: 1ワーカーのスレッド数（Noneならコア数をワーカー数で割った値）
+        classifier_kwargs: CommitClassifierに渡す引数（batch_size, mode等）
+        """
+        self.num_workers = num_workers
+        self.threads_per_worker = threads_per_worker or max(1, (os.cpu_count() or 1) // num_workers)
+        self.batch_size = classifier_kwargs.get('batch_size', 8)
+        # forkはtorchのスレッドプールと相性が悪いためspawnで起動する
+        self.executor = ProcessPoolExecutor(
+            max_workers=num_workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=init_worker,
+            initargs=(model_id, backend, self.threads_per_worker, classifier_kwargs)
+        )
+        print(f"分類ワーカー: {num_workers}プロセス × {self.threads_per_worker}スレッド")
+
+    def shard(self, pairs):
+        """入力のインデックスをワーカー数に分割（文字数の順に配って処理量をそろえる）"""
+        num_shards = min(self.num_workers, len(pairs))
+        order = sorted(range(len(pairs)), key=lambda i: len(pairs[i][0]) + len(pairs[i][1]))
+        return [order[k::num_shards] for k in range(num_shards)]
+
+    def classify_batch(self, pairs, context_window: int = 1024, batch_size=None):
+        """複数コミットをワーカーに分けて分類
+
+        Returns:
+            list: pairsと同じ順序のラベル
+        """
+        if not pairs:
+            return []
+        shards = self.shard(pairs)
+        futures = [self.executor.submit(classify_shard, [pairs[i] for i in shard], context_window, batch_size)
+                   for shard in shards]
+
+        labels = [None] * len(pairs)
+        for shard, future in zip(shards, futures):
+            for i, label in zip(shard, future.result()):
+                labels[i] = label
+        return labels
+
+    def prepare_prompt(self, commit_message: str, git_diff: str, context_window: int = 1024):
+        """コミット分類用プロンプト作成（ワーカーのトークナイザで作成）"""
+        return self.executor.submit(prepare_prompt_in_worker, commit_message, git_diff, context_window).result()
+
+    def close(self):
+        """ワーカープロセスを終了"""
+        self.executor.shutdown()
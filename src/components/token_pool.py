@@ -0,0 +1,137 @@
+"""
+複数のGitHubトークンを使い分けるトークンプール
+
+.env または環境変数から GITHUB_TOKENS（カンマ区切り）, GITHUB_TOKEN, GITHUB_TOKEN_1, GITHUB_TOKEN_2, ... を読み込む。
+リクエストごとに残り回数が最も多いトークンを選び、使い切ったトークンはリセットまで使わない。
+トークンごとのリクエスト間隔はRateLimitThrottlerで調整する。
+api.github.com以外（github.comのdiff等）へのリクエストはAPIの残り回数を消費しないため、
+トークンとは別の1つのRateLimitThrottler（Retry-After・429のみ）で調整する。
+"""
+
+import os
+import threading
+import time
+from datetime import datetime
+from urllib.parse import urlparse
+
+import requests
+
+from components.rate_limiter import RateLimitThrottler
+
+API_HOST = 'api.github.com'
+
+
+def load_tokens_from_env():
+    """環境変数からトークン一覧を取得（重複は除く、順序は保持）"""
+    tokens = []
+    tokens.extend(t.strip() for t in os.getenv("GITHUB_TOKENS", "").split(',') if t.strip())
+    if os.getenv("GITHUB_TOKEN"):
+        tokens.append(os.getenv("GITHUB_TOKEN"))
+    index = 1
+    while os.getenv(f"GITHUB_TOKEN_{index}"):
+        tokens.append(os.getenv(f"GITHUB_TOKEN_{index}"))
+        index += 1
+    return list(dict.fromkeys(tokens))
+
+
+class TokenPool:
+    def __init__(self, tokens):
+        """
+        tokens: GitHub Personal Access Tokenのリスト
+        """
+        self.tokens = list(dict.fromkeys(tokens))
+        self.throttlers = {token: RateLimitThrottler() for token in self.tokens}
+        # API以外のリクエスト用（全トークン共通）
+        self.web_throttler = RateLimitThrottler()
+        self.usage = {token: 0 for token in self.tokens}
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def label(token):
+        """表示用にトークンを伏せ字にする"""
+        return f"{token[:8]}...{token[-4:]}" if len(token) > 12 else "****"
+
+    def budget(self, token, now):
+        """トークンの残り回数（待機中・使い切ってリセット前なら0、未取得なら無限大）"""
+        throttler = self.throttlers[token]
+        if throttler.blocked_until > now:
+            return 0
+        if throttler.remaining is None or throttler.reset_at is None or throttler.reset_at <= now:
+            return float('inf')
+        return throttler.remaining
+
+    def acquire(self):
+        """次のリクエストに使うトークンを選ぶ
+
+        Returns:
+            tuple: (token, throttler)
+        """
+        with self.lock:
+            now = time.time()
+            budgets = {token: self.budget(token, now) for token in self.tokens}
+            available = [token for token in self.tokens if budgets[token] > 0]
+            if available:
+                token = max(available, key=lambda t: budgets[t])
+            else:
+                # 全トークンを使い切った場合は最も早くリセットされるものを使う（throttlerがリセットまで待つ）
+                token = min(self.tokens, key=lambda t: max(self.throttlers[t].reset_at or 0,
+                                                           self.throttlers[t].blocked_until))
+            self.usage[token] += 1
+            return token, self.throttlers[token]
+
+    def get_text(self, url, max_bytes=None, **kwargs):
+        """プールのトークンでレスポンス本文をストリーミング取得（max_bytesを超えた時点で読み込みをやめる）
+
+        Returns:
+            tuple: (text, truncated) - truncatedは途中で読み込みをやめた場合True
+        """
+        token, throttler = self.acquire()
+        if urlparse(url).hostname != API_HOST:
+            throttler = self.web_throttler
+        headers = dict(kwargs.pop('headers', None) or {})
+        headers['Authorization'] = f'token {token}'
+        throttler.wait()
+        chunks = []
+        size = 0
+        truncated = False
+        # withを抜けると残りを読まずに接続を閉じる
+        with requests.get(url, headers=headers, stream=True, **kwargs) as response:
+            # 403/429の本文（エラーメッセージ）は短いため先に読んで二次レート制限かを判定する
+            throttler.observe(response.status_code, dict(response.headers),
+                              response.text if response.status_code in (403, 429) else None)
+            for chunk in response.iter_content(chunk_size=16 * 1024):
+                chunks.append(chunk)
+                size += len(chunk)
+                if max_bytes is not None and size > max_bytes:
+                    truncated = True
+                    break
+            encoding = response.encoding or 'utf-8'
+        data = b''.join(chunks)
+        if truncated:
+            data = data[:max_bytes]
+        return data.decode(encoding, errors='replace'), truncated
+
+    def summary(self):
+        """トークンごとの使用状況（表示用の行リスト）"""
+        lines = [f"トークン使用状況（{len(self.tokens)}個）:"]
+        for token in self.tokens:
+            throttler = self.throttlers[token]
+            reset = datetime.fromtimestamp(throttler.reset_at).strftime('%H:%M:%S') if throttler.reset_at else '-'
+            lines.append(f"  {self.label(token)}: リクエスト={self.usage[token]}回 残り={throttler.remaining} "
+                         f"リセット={reset} 待機合計={throttler.total_wait:.0f}秒")
+        lines.append(f"  API以外: 待機合計={self.web_throttler.total_wait:.0f}秒")
+        return lines
+
+
+# プロセス内で1つだけ使う
+_token_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_token_pool():
+    """環境変数から作成したトークンプールを取得（.envの読み込み後に呼ぶこと）"""
+    global _token_pool
+    with _pool_lock:
+        if _token_pool is None:
+            _token_pool = TokenPool(load_tokens_from_env())
+        return _token_pool
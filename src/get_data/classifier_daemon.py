@@ -0,0 +1,58 @@
+"""
+コミット分類サービスの起動
+
+ccs-code-llama-7bを1回だけ読み込み、get-AI-files.py / get_commits_expansion.py / classify_pending.py
+からの分類要求をまとめて処理する。各スクリプトは.envのCLASSIFIER_URLにこのサービスのURLを設定すると
+自分ではモデルを読み込まずにサービスへ要求を送る。
+"""
+
+import os
+import sys
+
+from dotenv import load_dotenv
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from components.ccs_prompt import MODEL_ID
+from components.lazy_classifier import LazyClassifier, mode_from_env, prefix_cache_from_env
+from components.classification_cache import ClassificationCache
+from components.classifier_service import serve, DEFAULT_PORT
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+load_dotenv(os.path.join(script_dir, '.env'))
+
+
+def main():
+    """メイン実行"""
+    # 待ち受けアドレス（localhostのみ）
+    host = '127.0.0.1'
+    port = DEFAULT_PORT
+
+    # 推論バックエンド（'auto', 'cpu-fp32', 'cpu-int8', 'cpu-int4'）
+    backend = os.getenv('CLASSIFIER_BACKEND', 'auto')
+    # 分類ワーカープロセス数（2以上なら複数プロセスに分けて分類）
+    num_workers = int(os.getenv('CLASSIFIER_WORKERS', '1'))
+    # 1ワーカーのスレッド数（Noneならコア数をワーカー数で割った値）
+    threads_per_worker = int(os.getenv('CLASSIFIER_THREADS')) if os.getenv('CLASSIFIER_THREADS') else None
+    # システムプロンプトのKVキャッシュを再利用するか（CLASSIFIER_PREFIX_CACHE=0で無効）
+    use_prefix_cache = prefix_cache_from_env()
+    # 分類方法（CLASSIFIER_MODE、既定: generate）
+    mode = mode_from_env()
+
+    # 1回の分類でまとめるコミット数の上限と、他の要求を待つ時間（秒）
+    max_batch = 32
+    max_wait = 0.05
+
+    classification_cache = ClassificationCache(
+        os.path.join(script_dir, '../data_list/classification_cache/classifications.sqlite'), MODEL_ID)
+    # CLASSIFIER_URLは使わない（このプロセスがサービス本体）
+    classifier = LazyClassifier(MODEL_ID, cache=classification_cache, backend=backend, num_workers=num_workers,
+                                threads_per_worker=threads_per_worker, use_prefix_cache=use_prefix_cache,
+                                mode=mode)
+    # 最初の要求を待たずに読み込んでおく
+    classifier.get()
+
+    serve(classifier, host=host, port=port, max_batch=max_batch, max_wait=max_wait)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+"""
+分類を後回しにした行（commit_classification == 'pending'）の分類パス
+
+get-AI-files.py / get_commits_expansion.py を --no-classify で実行した結果CSVに対して、
+差分を取得してコミット分類を行い、CSVを1回だけ書き戻す。
+- results_v4.csv: コミット全体の差分で分類（get-AI-files.pyと同じ）
+- results_v7_released_commits_restriction.csv: ファイルごとのpatchで分類（get_commits_expansion.pyと同じ）
+  Parquetのストア（convert_results_to_parquet.py）があれば、ラベルが変わったリポジトリのパーティションも書き直す
+
+--all を指定すると、pendingだけでなく全行を分類キャッシュを使わずに分類し直す（既存結果CSVの一括再分類）。
+CLASSIFIER_WORKERSを2以上にすると複数プロセスに分けて分類する。
+"""
+
+import argparse
+import os
+import sys
+
+import pandas as pd
+from dotenv import load_dotenv
+from github import Github
+from tqdm import tqdm
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from components.ccs_prompt import MODEL_ID, diff_byte_budget
+from components.lazy_classifier import LazyClassifier
+from components.classification_cache import ClassificationCache
+from components.check_network import retry_with_network_check
+from components.http_cache import install_http_cache
+from components.token_pool import get_token_pool
+from components.commit_store import CommitDetailStore
+from components.results_store import ResultsStore
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+load_dotenv(os.path.join(script_dir, '.env'))
+
+PENDING_LABEL = 'pending'
+
+classification_cache = ClassificationCache(
+    os.path.join(script_dir, '../data_list/classification_cache/classifications.sqlite'), MODEL_ID)
+
+
+def key_of(row, per_file):
+    """分類の単位（ファイルごとなら(sha, ファイル名)、コミット全体ならsha）"""
+    return (row['commit_hash'], row['file_name']) if per_file else row['commit_hash']
+
+
+class PendingClassifier:
+    def __init__(self, github_token, classifier, reclassify_all=False):
+        """
+        github_token: GitHub Personal Access Token
+        classifier: LazyClassifier
+        reclassify_all: Trueなら全行を分類し直す（Falseならpendingの行のみ）
+        """
+        self.classifier = classifier
+        self.reclassify_all = reclassify_all
+        self.token_pool = get_token_pool()
+        self.http_cache = install_http_cache(os.path.join(script_dir, '../data_list/http_cache/github_api.sqlite'),
+                                             token_pool=self.token_pool)
+        self.g = Github(github_token)
+        self.repos = {}
+        self.commit_stores = {}
+
+    @retry_with_network_check
+    def get_repo(self, repo_name):
+        """リポジトリ取得（同じリポジトリは1回だけ）"""
+        if repo_name not in self.repos:
+            self.repos[repo_name] = self.g.get_repo(repo_name)
+            self.commit_stores[repo_name] = CommitDetailStore(self.repos[repo_name])
+        return self.repos[repo_name]
+
+    @retry_with_network_check
+    def fetch_commit_diff(self, repo_name, commit_sha):
+        """コミット全体のメッセージと差分を取得"""
+        repo = self.get_repo(repo_name)
+        record = self.commit_stores[repo_name].get(commit_sha)
+        if not record['parents']:
+            return record['message'], ""
+        diff_url = repo.compare(record['parents'][0], commit_sha).diff_url
+        diff, _ = self.token_pool.get_text(diff_url, max_bytes=diff_byte_budget())
+        return record['message'], diff
+
+    @retry_with_network_check
+    def fetch_file_patch(self, repo_name, commit_sha, file_path):
+        """コミットのメッセージと特定ファイルのpatchを取得"""
+        self.get_repo(repo_name)
+        store = self.commit_stores[repo_name]
+        patch, _ = store.get_file_patch(commit_sha, file_path)
+        return store.get(commit_sha)['message'], patch
+
+    def classify_csv(self, csv_path, per_file, results_store=None):
+        """CSVのpending行（reclassify_allなら全行）を分類して書き戻す
+
+        Args:
+            csv_path: 結果CSVのパス
+            per_file: Trueならファイルごとのpatch、Falseならコミット全体の差分で分類
+            results_store: 同じ結果のParquetストア（あれば、ラベルが変わったリポジトリのパーティションも書き直す）
+
+        Returns:
+            int: 分類した行数
+        """
+        if not os.path.exists(csv_path):
+            print(f"スキップ（ファイルなし）: {csv_path}")
+            return 0
+
+        df = pd.read_csv(csv_path)
+        if self.reclassify_all:
+            pending_rows = df.index[df['commit_hash'] != 'No commits found']
+        else:
+            pending_rows = df.index[df['commit_classification'] == PENDING_LABEL]
+        print(f"{os.path.basename(csv_path)}: 分類対象 {len(pending_rows)}行")
+        if len(pending_rows) == 0:
+            return 0
+
+        # 同じ入力（コミット全体なら同じsha）は1回だけ分類
+        keys = {}
+        for i in tqdm(pending_rows, desc="差分取得"):
+            row = df.loc[i]
+            key = key_of(row, per_file)
+            if key in keys:
+                continue
+            try:
+                if per_file:
+                    keys[key] = self.fetch_file_patch(row['repository_name'], row['commit_hash'], row['file_name'])
+                else:
+                    keys[key] = self.fetch_commit_diff(row['repository_name'], row['commit_hash'])
+            except Exception as e:
+                tqdm.write(f"エラー {row['commit_hash'][:8]}: {e}")
+                keys[key] = None
+
+        fetched = [key for key, pair in keys.items() if pair is not None]
+        shas = [key[0] if per_file else key for key in fetched]
+        # ファイルごとのpatchにはヘッダがないため、ルール分類にはファイル名を渡す
+        paths = [[key[1]] for key in fetched] if per_file else None
+        labels = dict(zip(fetched, self.classifier.classify_batch([keys[key] for key in fetched], shas=shas,
+                                                                  paths=paths)))
+
+        changed_repos = set()
+        for i in pending_rows:
+            key = key_of(df.loc[i], per_file)
+            # 取得に失敗した行は元のラベルのまま残し、次回の実行で再試行する
+            if key in labels:
+                if df.at[i, 'commit_classification'] != labels[key]:
+                    changed_repos.add(df.at[i, 'repository_name'])
+                df.at[i, 'commit_classification'] = labels[key]
+
+        df.to_csv(csv_path, index=False, encoding='utf-8-sig')
+        # 分析スクリプトはストアを優先して読むため、ストアがあれば同じラベルに揃える
+        # （ストアがない場合は作らない: 一部のリポジトリだけのストアがCSVより優先されてしまう）
+        if results_store is not None and results_store.exists() and changed_repos:
+            results_store.write(df[df['repository_name'].isin(changed_repos)])
+            print(f"Parquet: {results_store.store_dir}（{len(changed_repos)}リポジトリを更新）")
+        print(f"✓ 分類完了: {len(labels)}件（{classification_cache.summary()}）")
+        return sum(1 for i in pending_rows if key_of(df.loc[i], per_file) in labels)
+
+
+def main():
+    """メイン実行"""
+    parser = argparse.ArgumentParser(description="pending行の分類・結果CSVの一括再分類")
+    parser.add_argument('--all', action='store_true', help="全行を分類キャッシュを使わずに分類し直す")
+    args = parser.parse_args()
+
+    project_root = os.path.join(script_dir, '../..')
+    # (CSVパス, ファイルごとのpatchで分類するか, Parquetのストア)
+    targets = [
+        (os.path.join(script_dir, '../data_list/RQ1/final_result/results_v4.csv'), False, None),
+        (os.path.join(project_root, 'results/EASE-results/csv/results_v7_released_commits_restriction.csv'), True,
+         ResultsStore.named('results_v7_released_commits_restriction')),
+    ]
+
+    token_pool = get_token_pool()
+    if not token_pool.tokens:
+        print("エラー: GITHUB_TOKENが設定されていません")
+        return
+
+    # 再分類では既存の分類結果（キャッシュ）を使わない
+    classifier = LazyClassifier.from_env(None if args.all else classification_cache)
+    runner = PendingClassifier(token_pool.tokens[0], classifier, reclassify_all=args.all)
+    for csv_path, per_file, results_store in targets:
+        runner.classify_csv(csv_path, per_file, results_store)
+
+    print(runner.http_cache.summary())
+    print("\n".join(token_pool.summary()))
+
+
+if __name__ == "__main__":
+    main()
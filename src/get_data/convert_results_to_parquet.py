@@ -0,0 +1,36 @@
+"""
+結果CSVをリポジトリごとに分割したParquetのストア（components/results_store.py）に変換
+
+results/EASE-results/csv/<名前>.csv → results/EASE-results/parquet/<名前>/repository_name=<リポジトリ>/
+変換後は分析スクリプト（analyze/RQ*_analyze.py）とprepere_csvがストアを使う。
+CSVはそのまま残す（get_commits_expansion.pyは引き続きCSVにも書き出す）。
+"""
+
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from components.results_store import ResultsStore, RESULTS_DIR
+
+
+def main():
+    """メイン実行"""
+    # 変換する結果の名前（results/EASE-results/csv/<名前>.csv）
+    names = ['results_v5', 'results_v7_released_commits_restriction', 'step1_all_files']
+
+    for name in names:
+        csv_path = os.path.join(RESULTS_DIR, 'csv', f"{name}.csv")
+        if not os.path.exists(csv_path):
+            print(f"スキップ（CSVがありません）: {csv_path}")
+            continue
+
+        store = ResultsStore.named(name)
+        start = time.perf_counter()
+        rows = store.import_csv(csv_path)
+        print(f"{name}: {rows}行、{len(store.repositories())}リポジトリ → {store.store_dir}"
+              f"（{time.perf_counter() - start:.1f}秒）")
+
+
+if __name__ == "__main__":
+    main()
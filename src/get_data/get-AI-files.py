@@ -7,48 +7,148 @@ import os # ファイルパスを扱うためのライブラリ
 import pandas as pd # データフレームを扱うためのライブラリ
 from datetime import datetime, timedelta # 日付取得や時間の計算のためのライブラリ
 import numpy as np # 数値計算を行うためのライブラリ
-from transformers import pipeline # 事前学習したモデルを扱うためのライブラリ
-import requests # HTTPリクエストを扱うためのライブラリ
 from github import Github # Github APIを扱うためのライブラリ
 from dotenv import load_dotenv # .envファイルを読み込むためのライブラリ
 from tqdm import tqdm # プログレスバーを表示するためのライブラリ
-import time
 import base64 # Base64エンコード/デコードを行うためのライブラリ
+import argparse # コマンドライン引数を扱うためのライブラリ
+import random # ランダムサンプリングのためのライブラリ
+import threading # 並列実行時の排他制御のためのライブラリ
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED # リポジトリ単位の並列実行のためのライブラリ
+from contextlib import contextmanager
 
 # componentsフォルダからインポート
 from components.AI_check import ai_check
+from components.ccs_prompt import MODEL_ID, diff_byte_budget
+from components.lazy_classifier import LazyClassifier
+from components.classification_cache import ClassificationCache, COMMIT_DIFF
 from components.check_network import retry_with_network_check, check_network_connectivity
+from components.git_backend import LocalGitBackend
+from components.http_cache import install_http_cache
+from components.token_pool import get_token_pool
+from components.commit_store import CommitDetailStore, file_patch_to_diff
+from components.file_history_fetcher import fetch_file_histories
+from components.sampling import ReservoirSampler
+from components.file_history import FileHistoryService, commit_authors
+from components.result_sink import AppendOnlyCsvSink
 
 # srcフォルダ内の.envファイルを読み込む
 script_dir = os.path.dirname(os.path.abspath(__file__))
 dotenv_path = os.path.join(script_dir, '.env')
 load_dotenv(dotenv_path)
 
-pipe = pipeline("text-generation", model="0x404/ccs-code-llama-7b", device_map="auto")
-tokenizer = pipe.tokenizer
+# GitHub APIレスポンスのキャッシュ（ETagによる条件付きリクエスト）
+http_cache_path = os.path.join(script_dir, "../data_list/http_cache/github_api.sqlite")
+
+# 分類結果のキャッシュ（モデルID・sha・差分のハッシュで一致したものは再分類しない）
+classification_cache = ClassificationCache(
+    os.path.join(script_dir, "../data_list/classification_cache/classifications.sqlite"), MODEL_ID)
+# 分類方法は.envのCLASSIFIER_MODEで設定（既定: generate、'score'はベンチマークで一致率を確認してから使う）
+# モデルはキャッシュにない分類が初めて必要になった時点で読み込む
+# 分類サービス・推論バックエンド・ワーカープロセス数は.envで設定（LazyClassifier.from_env）
+classifier = LazyClassifier.from_env(classification_cache)
+
+# 分類を後回しにした行のラベル（classify_pending.pyで分類する）
+PENDING_LABEL = 'pending'
+
+
+# results_v4.csvの列と重複判定のキー
+RESULTS_V4_COLUMNS = [
+    'repository_name', 'file_name', 'file_creators', 'file_created_by', 'file_line_count', 'file_creation_date',
+    'file_commit_count', 'commit_hash', 'commit_authors', 'commit_created_by', 'commit_changed_lines', 'commit_date',
+    'commit_classification'
+]
+RESULTS_V4_KEY = ['repository_name', 'file_name', 'commit_hash']
+
+_results_sink = None
+_results_sink_lock = threading.Lock()
+
+
+def get_results_sink():
+    """results_v4.csvの追記先を取得（全リポジトリで1つを共有）"""
+    global _results_sink
+    with _results_sink_lock:
+        if _results_sink is None:
+            csv_path = os.path.join(script_dir, "../data_list/RQ1/final_result/results_v4.csv")
+            _results_sink = AppendOnlyCsvSink(csv_path, RESULTS_V4_COLUMNS, RESULTS_V4_KEY)
+        return _results_sink
+
+
+class SuccessQuota:
+    """並列実行時の成功数管理
+
+    目標成功数に達した後に完了したリポジトリの結果は保存しない。
+    保存処理はロック内で行うため、CSVへの書き込みは常に1スレッドずつになる。
+    """
+    def __init__(self, target):
+        self.target = target
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def reached(self):
+        """目標成功数に達したかどうか"""
+        with self.lock:
+            return self.count >= self.target
+
+    @contextmanager
+    def reserve(self):
+        """成功枠を確保して保存処理を行う
+
+        Yields:
+            bool: 枠を確保できた場合True（with内の処理が例外なく終われば成功数に加算）
+        """
+        with self.lock:
+            if self.count >= self.target:
+                yield False
+                return
+            yield True
+            self.count += 1
+
 
 class RQ1AnalyzerAPI:
-    def __init__(self, repo_name_full, github_token=None):
+    def __init__(self, repo_name_full, github_token=None, backend='api', candidate_factor=None, classify=True):
         """
         repo_name_full: 'owner/repo' 形式のリポジトリ名
         github_token: GitHub Personal Access Token
+        backend: コミット情報の取得方法（'api': GitHub REST API, 'git': ローカルのblobless clone）
+        candidate_factor: ステップ1の打ち切り条件（目標数×この値の候補で走査終了、Noneなら全走査）
+        classify: Falseならステップ3でモデルを使わず、ラベルを'pending'のまま保存する
         """
         self.repo_name_full = repo_name_full
         self.repo_name = repo_name_full.split('/')[-1]
         self.github_token = github_token
+        self.candidate_factor = candidate_factor
+        self.classify = classify
         
         if not self.github_token:
             raise ValueError("GitHub tokenが必要です。.envファイルにGITHUB_TOKENを設定してください。")
         
-        # GitHub API初期化
+        # GitHub API初期化（レスポンスはキャッシュ経由、トークンはプールから選び間隔はレート制限に合わせて調整）
+        self.token_pool = get_token_pool()
+        self.http_cache = install_http_cache(http_cache_path, token_pool=self.token_pool)
         self.g = Github(self.github_token)
         self.repo = self.g.get_repo(repo_name_full)
         
+        # コミット詳細のメモ化（同じshaへのget_commitを1回にまとめる）
+        self.commit_store = CommitDetailStore(self.repo)
+        # ステップ3の差分の取得方法ごとの件数（取得済みpatch / ダウンロード / 途中で打ち切り）
+        self.diff_stats = {'file_patch': 0, 'downloaded': 0, 'truncated': 0}
+        
+        # ファイル履歴（2025/10/31まで、1ファイルにつき1回だけ取得）
+        self.history_until_date = datetime(2025, 10, 31, 23, 59, 59)
+        self.file_history = FileHistoryService(self.repo, self.history_until_date)
+        
         # 出力ディレクトリ
         script_dir = os.path.dirname(os.path.abspath(__file__))
         self.final_output_dir = os.path.join(script_dir, "../data_list/RQ1/final_result")
         os.makedirs(self.final_output_dir, exist_ok=True)
         
+        # ローカルgitバックエンド（ステップ1・2のコミット情報をクローンから取得）
+        self.git_backend = None
+        if backend == 'git':
+            git_cache_dir = os.path.join(script_dir, "../data_list/git_cache")
+            self.git_backend = LocalGitBackend.from_github(repo_name_full, git_cache_dir)
+        
         # 成功リポジトリリストのCSVパス
         dataset_dir = os.path.join(script_dir, "../dataset")
         os.makedirs(dataset_dir, exist_ok=True)
@@ -83,158 +183,168 @@ class RQ1AnalyzerAPI:
         print(f"✓ 成功リポジトリを記録: {self.successful_repos_csv}")
 
     @retry_with_network_check
-    def get_all_commits_with_file_additions_api(self):
-        """GitHub APIで2025/1/1～2025/7/31の全コミットを取得（ファイル追加のみ）
+    def get_commit_record(self, commit):
+        """コミット詳細（変更ファイル一覧）を取得してキャッシュに登録"""
+        return self.commit_store.add(commit)
+
+    def iter_commits_with_file_additions_api(self, scan_stats, wants_files=None):
+        """GitHub APIで2025/1/1～2025/7/31のコミットを順に取得（ファイル追加のみ）
         
-        Returns:
-            tuple: (commits_data, total_commits_count)
-        """
-        print(f"=== GitHub APIで全コミット取得中 ===")
+        ページ単位で取得しながら1コミットずつ返すため、全コミットをメモリに保持しない。
         
-        commits_data = []
+        Args:
+            scan_stats: 走査状況を記録するdict（total_commits, skipped_commits を更新）
+            wants_files: all_authors -> bool。Falseを返したコミットは詳細（変更ファイル）を取得しない
         
-        try:
-            # 2025/1/1～2025/7/31の期間のコミットを取得
-            since_date = datetime(2025, 1, 1)
-            until_date = datetime(2025, 7, 31)
-            print(f"コミット取得期間: {since_date.date()} ～ {until_date.date()}")
-            print("全コミットを取得中...")
-            
-            commits = self.repo.get_commits(since=since_date, until=until_date)
-            commits_list = list(commits)
-            total_commits_count = len(commits_list)
-            print(f"総コミット数: {total_commits_count}件")
-            
-            # 全コミットを処理
-            for commit in tqdm(commits_list, desc="コミット処理"):
-                try:
-                    # コミット情報取得
-                    commit_sha = commit.sha
-                    author_name = commit.commit.author.name or "Unknown"
-                    author_email = commit.commit.author.email or "unknown@example.com"
-                    commit_date = commit.commit.author.date.isoformat()
-                    message = commit.commit.message
-                    
-                    # コミットアカウントのみ取得（author + committer）
-                    all_authors = [author_name]
-                    
-                    # committerも追加（authorと異なる場合）
-                    if commit.commit.committer and commit.commit.committer.name:
-                        committer_name = commit.commit.committer.name
-                        if committer_name != author_name and committer_name not in all_authors:
-                            all_authors.append(committer_name)
-                    
-                    # 追加されたファイルを検索
-                    added_files = []
-                    for file in commit.files:
-                        if file.status == 'added':
-                            added_files.append(file.filename)
-                    
-                    if added_files:
-                        commit_info = {
-                            'hash': commit_sha,
-                            'author_name': author_name,
-                            'author_email': author_email,
-                            'all_authors': all_authors,  # 全作成者リスト
-                            'date': commit_date,
-                            'message': message,
-                            'added_files': added_files
-                        }
-                        commits_data.append(commit_info)
-                    
-                    # API rate limit対策
-                    time.sleep(0.05)
-                    
-                except Exception as e:
-                    print(f"\nコミット処理エラー {commit.sha[:8]}: {e}")
+        Yields:
+            dict: ファイル追加を含むコミットの情報
+        """
+        # 2025/1/1～2025/7/31の期間のコミットを取得
+        since_date = datetime(2025, 1, 1)
+        until_date = datetime(2025, 7, 31)
+        print(f"コミット取得期間: {since_date.date()} ～ {until_date.date()}")
+        
+        if self.git_backend is not None:
+            commits_data, total_commits_count = self.git_backend.get_all_commits_with_file_additions(since_date, until_date)
+            scan_stats['total_commits'] = total_commits_count
+            yield from commits_data
+            return
+        
+        commits = self.repo.get_commits(since=since_date, until=until_date)
+        
+        for commit in tqdm(commits, desc="コミット処理"):
+            scan_stats['total_commits'] += 1
+            try:
+                # コミット情報取得（一覧の情報のみで取得できる）
+                commit_sha = commit.sha
+                author_email = commit.commit.author.email or "unknown@example.com"
+                commit_date = commit.commit.author.date.isoformat()
+                message = commit.commit.message
+                
+                # コミットアカウントのみ取得（author + committer）
+                all_authors = commit_authors(commit)
+                author_name = all_authors[0]
+                
+                # サンプリング対象にならないコミットは詳細を取得しない
+                if wants_files is not None and not wants_files(all_authors):
+                    scan_stats['skipped_commits'] += 1
                     continue
-            
-            print(f"\nコミット取得完了: 2025/1/1～2025/7/31の総コミット数={total_commits_count}件, ファイル追加コミット={len(commits_data)}件")
-            return commits_data, total_commits_count
-            
-        except Exception as e:
-            print(f"GitHub API エラー: {e}")
-            return [], 0
+                
+                # 追加されたファイルを検索（取得した詳細はステップ3以降でも使う）
+                record = self.get_commit_record(commit)
+                added_files = [filename for filename, file in record['files'].items() if file['status'] == 'added']
+                
+                if added_files:
+                    yield {
+                        'hash': commit_sha,
+                        'author_name': author_name,
+                        'author_email': author_email,
+                        'all_authors': all_authors,  # 全作成者リスト
+                        'date': commit_date,
+                        'message': message,
+                        'added_files': added_files
+                    }
+                    
+            except Exception as e:
+                tqdm.write(f"コミット処理エラー {commit.sha[:8]}: {e}")
+                continue
 
-    def step1_find_added_files(self, target_ai_files=10, target_human_files=10):
-        """ステップ1: ファイル追加分析（全コミット取得 + ランダムサンプリング）
+    def step1_find_added_files(self, target_ai_files=10, target_human_files=10, candidate_factor=None, seed=None):
+        """ステップ1: ファイル追加分析（コミットを順に走査 + リザーバサンプリング）
         
         Args:
             target_ai_files: 目標AI作成ファイル数（最大10）
             target_human_files: 目標Human作成ファイル数（最大10）
+            candidate_factor: 打ち切り条件。AI/Humanそれぞれ目標数×この値の候補を見つけたら走査を終える
+                              （Noneなら期間内の全コミットを走査）
+            seed: 乱数シード（Noneなら毎回異なる結果）
         """
-        print("\n=== ステップ1: ファイル追加分析 (全コミット取得 + ランダムサンプリング) ===")
+        print("\n=== ステップ1: ファイル追加分析 (ストリーミング走査 + リザーバサンプリング) ===")
         print(f"目標: AI={target_ai_files}件, Human={target_human_files}件")
-        print("※ 2025/1/1～2025/7/31の全コミットを取得します")
-
-        # 全コミット取得
-        commits_data, total_commits = self.get_all_commits_with_file_additions_api()
+        if candidate_factor is None:
+            print("※ 2025/1/1～2025/7/31の全コミットを走査します")
+        else:
+            print(f"※ 各{candidate_factor}倍の候補が見つかった時点で走査を終えます")
         
-        if total_commits == 0:
-            print("指定期間のコミットが存在しません")
-            return None, 'no_commits_90days'
+        rng = random.Random(seed)
+        ai_sampler = ReservoirSampler(target_ai_files, rng)
+        human_sampler = ReservoirSampler(target_human_files, rng)
+        
+        def enough(sampler):
+            """打ち切り条件を満たす候補数が集まったか"""
+            return candidate_factor is not None and sampler.seen >= candidate_factor * sampler.k
+        
+        def wants_files(all_authors):
+            """候補が足りていない側のコミットのみ詳細を取得"""
+            is_ai, _ = ai_check(all_authors)
+            return not enough(ai_sampler if is_ai else human_sampler)
         
-        # 全データ作成
-        all_csv_data = []
-        for commit in commits_data:
+        scan_stats = {'total_commits': 0, 'skipped_commits': 0}
+        commits = self.iter_commits_with_file_additions_api(scan_stats, wants_files)
+        for commit in commits:
             is_ai, ai_type = ai_check(commit['all_authors'])
             author_type = "AI" if is_ai else "Human"
+            sampler = ai_sampler if is_ai else human_sampler
             
             for file_path in commit['added_files']:
-                all_csv_data.append({
+                sampler.add({
                     'commit_hash': commit['hash'],
                     'commit_date': commit['date'],
                     'added_file': file_path,
                     'author_type': author_type,
                     'ai_type': ai_type,
                     'is_ai_generated': is_ai,
-                    'all_authors': commit['all_authors'],  # ← この行を追加
+                    'all_authors': commit['all_authors'],
                     'author_name': commit['author_name'],
                     'author_email': commit['author_email'],
                     'commit_message': commit['message']
                 })
+            
+            if enough(ai_sampler) and enough(human_sampler):
+                commits.close()
+                print("\n打ち切り条件に到達 - 走査を終了")
+                break
         
-        # DataFrameに変換
-        df = pd.DataFrame(all_csv_data)
+        total_commits = scan_stats['total_commits']
+        print(f"\n走査完了: コミット数={total_commits}件（詳細取得を省略: {scan_stats['skipped_commits']}件）")
         
-        if len(df) == 0:
-            print(f"ファイル追加コミット未発見（総コミット数: {total_commits}件）")
-            return None, 'no_file_additions'
+        if total_commits == 0:
+            print("指定期間のコミットが存在しません")
+            return None, 'no_commits_90days'
         
-        # AI/人間ファイルを分離
-        ai_df = df[df['author_type'] == 'AI'].copy()
-        human_df = df[df['author_type'] == 'Human'].copy()
+        ai_count = ai_sampler.seen
+        human_count = human_sampler.seen
         
-        ai_count = len(ai_df)
-        human_count = len(human_df)
+        if ai_count + human_count == 0:
+            print(f"ファイル追加コミット未発見（総コミット数: {total_commits}件）")
+            return None, 'no_file_additions'
         
         print(f"\n取得結果 - AI作成ファイル: {ai_count}件, 人間作成ファイル: {human_count}件")
         
         # AI作成ファイルが見つからなかった場合
         if ai_count == 0:
             print("警告: AI作成ファイルが見つかりませんでした")
-            return df, 'no_ai_files'
+            return pd.DataFrame(human_sampler.items), 'no_ai_files'
         
-        # AI作成ファイルをランダムに最大10個選択
-        num_ai_files = min(target_ai_files, ai_count)
+        # AI作成ファイル（リザーバに残った最大10件）
+        ai_sampled = ai_sampler.items
+        num_ai_files = len(ai_sampled)
         if ai_count > num_ai_files:
-            ai_sampled = ai_df.sample(n=num_ai_files, random_state=None)
             print(f"AI作成ファイル: {ai_count}件から{num_ai_files}件をランダム選択")
         else:
-            ai_sampled = ai_df
             print(f"AI作成ファイル: 全{ai_count}件を使用")
         
         # 人間作成ファイルを同数ランダムに選択
         num_human_files = num_ai_files  # AI作成ファイルと同数
-        if human_count >= num_human_files:
-            human_sampled = human_df.sample(n=num_human_files, random_state=None)
+        if len(human_sampler.items) >= num_human_files:
+            human_sampled = rng.sample(human_sampler.items, num_human_files)
             print(f"人間作成ファイル: {human_count}件から{num_human_files}件をランダム選択")
         else:
-            human_sampled = human_df
+            human_sampled = human_sampler.items
             print(f"警告: 人間作成ファイルが不足（{human_count}件のみ）")
         
         # 結合
-        sampled_df = pd.concat([ai_sampled, human_sampled], ignore_index=True)
+        sampled_df = pd.DataFrame(ai_sampled + human_sampled)
         
         print(f"\n最終選択 - 総計: {len(sampled_df)}件 (AI: {len(ai_sampled)}件, 人間: {len(human_sampled)}件)")
         
@@ -244,35 +354,11 @@ class RQ1AnalyzerAPI:
     def get_file_commits_api(self, file_path):
         """GitHub APIで特定ファイルのコミット履歴取得（2025/10/31まで）"""
         try:
-            # 2025/10/31までのコミットを取得
-            until_date = datetime(2025, 10, 31, 23, 59, 59)
-            commits = self.repo.get_commits(path=file_path, until=until_date)
-            commit_logs = []
-            
-            for commit in commits:
-                author_name = commit.commit.author.name or "Unknown"
-                
-                # コミットアカウントのみ取得（author + committer）
-                all_authors = [author_name]
-                
-                # committerも追加（authorと異なる場合）
-                if commit.commit.committer and commit.commit.committer.name:
-                    committer_name = commit.commit.committer.name
-                    if committer_name != author_name and committer_name not in all_authors:
-                        all_authors.append(committer_name)
-                
-                commit_logs.append({
-                    'hash': commit.sha,
-                    'date': commit.commit.author.date.isoformat(),
-                    'author': author_name,
-                    'all_authors': all_authors,  # 全作成者リスト
-                    'email': commit.commit.author.email or "unknown@example.com",
-                    'message': commit.commit.message
-                })
-                
-                time.sleep(0.05)  # API rate limit対策
+            if self.git_backend is not None:
+                return self.git_backend.get_file_commits(file_path, self.history_until_date)
             
-            return commit_logs
+            # 作成情報と同じ1回の走査の結果を使う
+            return self.file_history.get(file_path)['commit_logs']
             
         except Exception as e:
             print(f"ファイル履歴取得エラー {file_path}: {e}")
@@ -282,30 +368,11 @@ class RQ1AnalyzerAPI:
     def get_file_creation_info(self, file_path):
         """ファイルの作成情報を取得（最初のコミット）"""
         try:
-            commits = self.repo.get_commits(path=file_path)
-            commit_list = list(commits)
-            if commit_list:
-                # 最後のコミット（最初のコミット）を取得
-                first_commit = commit_list[-1]
-                author_name = first_commit.commit.author.name or "Unknown"
-                
-                # コミットアカウントのみ取得（author + committer）
-                all_authors = [author_name]
-                
-                # committerも追加（authorと異なる場合）
-                if first_commit.commit.committer and first_commit.commit.committer.name:
-                    committer_name = first_commit.commit.committer.name
-                    if committer_name != author_name and committer_name not in all_authors:
-                        all_authors.append(committer_name)
-                
-                return {
-                    'author_name': author_name,
-                    'all_authors': all_authors,  # 全作成者リスト
-                    'all_creator_names': all_authors,  # CSV出力用（ファイル作成者名）
-                    'creation_date': first_commit.commit.author.date.isoformat(),
-                    'commit_count': len(commit_list)
-                }
-            return None
+            if self.git_backend is not None:
+                return self.git_backend.get_file_creation_info(file_path)
+            
+            # コミット数はtotalCount、作成コミットは期間内履歴の最後（または最終ページ）から取得
+            return self.file_history.get(file_path)['creation_info']
         except Exception as e:
             print(f"ファイル作成情報取得エラー {file_path}: {e}")
             return None
@@ -313,6 +380,9 @@ class RQ1AnalyzerAPI:
     def get_file_line_count(self, file_path, commit_sha):
         """ファイルの行数を取得"""
         try:
+            if self.git_backend is not None:
+                return self.git_backend.get_file_line_count(file_path, commit_sha)
+            
             # 特定のコミットでのファイル内容を取得
             content = self.repo.get_contents(file_path, ref=commit_sha)
             if content.encoding == 'base64':
@@ -368,8 +438,47 @@ class RQ1AnalyzerAPI:
         
         return ai_files + human_files
 
-    def step2_find_commit_changed_files(self, df):
-        """ステップ2: コミット履歴分析（API版）- エラーファイルを除外して同数に調整"""
+    def build_file_records(self, fetched):
+        """取得済みのファイル情報からファイル情報レコードとコミット履歴行を作成"""
+        file_info = fetched['file_info']
+        creation_info = fetched['creation_info']
+        file_path = file_info['added_file']
+        
+        # ファイル情報を記録
+        file_info_record = {
+            'repository_name': self.repo_name_full,
+            'file_name': file_path,
+            'all_creator_names': creation_info['all_creator_names'],
+            'line_count': fetched['line_count'],
+            'created_by': file_info['author_type'],
+            'creation_date': creation_info['creation_date'],
+            'commit_count': creation_info['commit_count']
+        }
+        
+        # コミット履歴
+        results = []
+        for log in fetched['commit_logs']:
+            is_ai, ai_type = ai_check(log['all_authors'])
+            results.append({
+                'original_commit_type': file_info['author_type'],
+                'original_commit_hash': file_info['commit_hash'],
+                'file_path': file_path,
+                'commit_hash': log['hash'],
+                'commit_date': log['date'],
+                'author': log['author'],
+                'all_authors': log['all_authors'],
+                'is_ai_generated': is_ai,
+                'ai_type': ai_type
+            })
+        return file_info_record, results
+
+    def step2_find_commit_changed_files(self, df, max_concurrency=8):
+        """ステップ2: コミット履歴分析（API版）- エラーファイルを除外して同数に調整
+        
+        Args:
+            df: ステップ1のサンプリング結果
+            max_concurrency: ファイル情報取得の同時実行数
+        """
         print("\n=== ステップ2: コミット履歴分析 (API版) ===")
         
         selected_files = self.get_files_by_author_type(df)
@@ -384,110 +493,49 @@ class RQ1AnalyzerAPI:
         
         results = []
         
-        # AI作成ファイルを先に処理
-        ai_files = [f for f in selected_files if f['author_type'] == 'AI']
-        print(f"\nAI作成ファイルの処理開始: {len(ai_files)}件")
+        # 全ファイルの作成情報・行数・コミット履歴を並行取得（結果はselected_filesの順序）
+        print(f"\nファイル情報を並行取得中: {len(selected_files)}件（同時実行数: {max_concurrency}）")
+        fetched_list = fetch_file_histories(
+            selected_files,
+            self.get_file_creation_info,
+            self.get_file_line_count,
+            self.get_file_commits_api,
+            max_concurrency=max_concurrency
+        )
         
-        for file_info in tqdm(ai_files, desc="AI作成ファイル処理"):
-            
-            file_path = file_info['added_file']
-            commit_hash = file_info['commit_hash']
-            author_type = file_info['author_type']
-            
-            # ファイル作成情報を取得
-            creation_info = self.get_file_creation_info(file_path)
-            if creation_info:
-                line_count = self.get_file_line_count(file_path, commit_hash)
-                
-                # ファイル情報を記録
-                file_info_record = {
-                    'repository_name': self.repo_name_full,
-                    'file_name': file_path,
-                    'all_creator_names': creation_info['all_creator_names'],
-                    'line_count': line_count,
-                    'created_by': author_type,
-                    'creation_date': creation_info['creation_date'],
-                    'commit_count': creation_info['commit_count']
-                }
+        # AI作成ファイルを先に処理
+        ai_fetched = [f for f in fetched_list if f['file_info']['author_type'] == 'AI']
+        for fetched in ai_fetched:
+            file_path = fetched['file_info']['added_file']
+            if fetched['creation_info']:
+                file_info_record, file_results = self.build_file_records(fetched)
                 file_info_records.append(file_info_record)
                 successful_ai_files.append(file_path)
-                
-                # コミット履歴取得
-                commit_logs = self.get_file_commits_api(file_path)
-                
-                if commit_logs:
-                    for log in commit_logs:
-                        is_ai, ai_type = self.is_ai_generated_commit(log['all_authors'])
-                        results.append({
-                            'original_commit_type': author_type,
-                            'original_commit_hash': commit_hash,
-                            'file_path': file_path,
-                            'commit_hash': log['hash'],
-                            'commit_date': log['date'],
-                            'author': log['author'],
-                            'all_authors': log['all_authors'],
-                            'is_ai_generated': is_ai,
-                            'ai_type': ai_type
-                        })
+                results.extend(file_results)
             else:
                 # 情報取得失敗時はスキップ
-                tqdm.write(f"  警告: ファイル情報取得失敗 - {file_path} (スキップ)")
+                print(f"  警告: ファイル情報取得失敗 - {file_path} (スキップ)")
         
         # 人間作成ファイルを処理（成功したAI作成ファイル数に合わせる）
-        human_files = [f for f in selected_files if f['author_type'] == 'Human']
+        human_fetched = [f for f in fetched_list if f['file_info']['author_type'] == 'Human']
         target_human_count = len(successful_ai_files)  # AI成功数に合わせる
         
-        print(f"\n人間作成ファイルの処理開始: {len(human_files)}件中{target_human_count}件を処理")
+        print(f"\n人間作成ファイルの処理: {len(human_fetched)}件中{target_human_count}件を使用")
         
-        human_processed = 0
-        for file_info in tqdm(human_files, desc="人間作成ファイル処理", total=target_human_count):
-            if human_processed >= target_human_count:
-                tqdm.write(f"  目標数{target_human_count}件に到達 - 残りの人間ファイルはスキップ")
+        for fetched in human_fetched:
+            if len(successful_human_files) >= target_human_count:
+                print(f"  目標数{target_human_count}件に到達 - 残りの人間ファイルはスキップ")
                 break
             
-            file_path = file_info['added_file']
-            commit_hash = file_info['commit_hash']
-            author_type = file_info['author_type']
-            
-            # ファイル作成情報を取得
-            creation_info = self.get_file_creation_info(file_path)
-            if creation_info:
-                line_count = self.get_file_line_count(file_path, commit_hash)
-                
-                # ファイル情報を記録
-                file_info_record = {
-                    'repository_name': self.repo_name_full,
-                    'file_name': file_path,
-                    'all_creator_names': creation_info['all_creator_names'],
-                    'line_count': line_count,
-                    'created_by': author_type,
-                    'creation_date': creation_info['creation_date'],
-                    'commit_count': creation_info['commit_count']
-                }
+            file_path = fetched['file_info']['added_file']
+            if fetched['creation_info']:
+                file_info_record, file_results = self.build_file_records(fetched)
                 file_info_records.append(file_info_record)
                 successful_human_files.append(file_path)
-                human_processed += 1
-                
-                # コミット履歴取得
-                commit_logs = self.get_file_commits_api(file_path)
-                
-                if commit_logs:
-                    for log in commit_logs:
-                        is_ai, ai_type = ai_check(log['all_authors'])
-                        results.append({
-                            'original_commit_type': author_type,
-                            'original_commit_hash': commit_hash,
-                            'file_path': file_path,
-                            'commit_hash': log['hash'],
-                            'commit_date': log['date'],
-                            'author': log['author'],
-                            'all_authors': log['all_authors'],
-                            'is_ai_generated': is_ai,
-                            'ai_type': ai_type
-                        })
+                results.extend(file_results)
             else:
                 # 情報取得失敗時はスキップ
-                tqdm.write(f"  警告: ファイル情報取得失敗 - {file_path} (スキップ)")
+                print(f"  警告: ファイル情報取得失敗 - {file_path} (スキップ)")
         
         # 最終調整：AI/Humanの成功数を同数にする
         final_count = min(len(successful_ai_files), len(successful_human_files))
@@ -516,68 +564,61 @@ class RQ1AnalyzerAPI:
 
     def prepare_prompt(self, commit_message: str, git_diff: str, context_window: int = 1024):
         """コミット分類用プロンプト作成"""
-        prompt_head = "<s>[INST] <<SYS>>\nYou are a commit classifier based on commit message and code diff.Please classify the given commit into one of the ten categories: docs, perf, style, refactor, feat, fix, test, ci, build, and chore. The definitions of each category are as follows:\n**feat**: Code changes aim to introduce new features to the codebase, encompassing both internal and user-oriented features.\n**fix**: Code changes aim to fix bugs and faults within the codebase.\n**perf**: Code changes aim to improve performance, such as enhancing execution speed or reducing memory consumption.\n**style**: Code changes aim to improve readability without affecting the meaning of the code. This type encompasses aspects like variable naming, indentation, and addressing linting or code analysis warnings.\n**refactor**: Code changes aim to restructure the program without changing its behavior, aiming to improve maintainability. To avoid confusion and overlap, we propose the constraint that this category does not include changes classified as ``perf'' or ``style''. Examples include enhancing modularity, refining exception handling, improving scalability, conducting code cleanup, and removing deprecated code.\n**docs**: Code changes that modify documentation or text, such as correcting typos, modifying comments, or updating documentation.\n**test**: Code changes that modify test files, including the addition or updating of tests.\n**ci**: Code changes to CI (Continuous Integration) configuration files and scripts, such as configuring or updating CI/CD scripts, e.g., ``.travis.yml'' and ``.github/workflows''.\n**build**: Code changes affecting the build system (e.g., Maven, Gradle, Cargo). Change examples include updating dependencies, configuring build configurations, and adding scripts.\n**chore**: Code changes for other miscellaneous tasks that do not neatly fit into any of the above categories.\n<</SYS>>\n\n"
-        prompt_head_encoded = tokenizer.encode(prompt_head, add_special_tokens=False)
+        return classifier.prepare_prompt(commit_message, git_diff, context_window)
 
-        prompt_message = f"- given commit message:\n{commit_message}\n"
-        prompt_message_encoded = tokenizer.encode(prompt_message, max_length=64, truncation=True, add_special_tokens=False)
-
-        prompt_diff = f"- given commit diff: \n{git_diff}\n"
-        remaining_length = (context_window - len(prompt_head_encoded) - len(prompt_message_encoded) - 6)
-        prompt_diff_encoded = tokenizer.encode(prompt_diff, max_length=remaining_length, truncation=True, add_special_tokens=False)
-
-        prompt_end = tokenizer.encode(" [/INST]", add_special_tokens=False)
-        return tokenizer.decode(prompt_head_encoded + prompt_message_encoded + prompt_diff_encoded + prompt_end)
-
-    def classify_commit(self, commit_message: str, git_diff: str, context_window: int = 1024):
-        """コミット分類"""
-        if not pipe or not tokenizer:
-            return "model_not_available"
-
-        try:
-            prompt = self.prepare_prompt(commit_message, git_diff, context_window)
-            result = pipe(prompt, max_new_tokens=10, pad_token_id=pipe.tokenizer.eos_token_id)
-            label = result[0]["generated_text"].split()[-1]
-            return label
-        except Exception as e:
-            print(f"分類エラー: {e}")
-            return "classification_error"
+    def classify_commit(self, commit_message: str, git_diff: str, context_window: int = 1024, commit_sha=None):
+        """コミット分類（commit_shaを指定した場合は分類キャッシュを確認）"""
+        return classifier.classify(commit_message, git_diff, context_window, commit_sha=commit_sha)
 
-    def fetch_message_and_diff(self, commit_sha):
-        """GitHub API経由でコミット情報取得"""
+    def fetch_message_and_diff(self, commit_sha, file_path=None, context_window=1024):
+        """GitHub API経由でコミット情報取得
+        
+        file_pathだけを変更したコミットは取得済みのpatchを差分として使う（ダウンロードしない）。
+        それ以外はcompareのdiffをプロンプトに入りうる分（diff_byte_budget）だけストリーミングで取得する。
+        """
         try:
-            commit = self.repo.get_commit(commit_sha)
+            if self.git_backend is not None:
+                return self.git_backend.fetch_message_and_diff(commit_sha, max_bytes=diff_byte_budget(context_window))
+            
+            record = self.commit_store.get(commit_sha)
+            
+            file = record['files'].get(file_path)
+            if file is not None and len(record['files']) == 1 and file['patch']:
+                self.diff_stats['file_patch'] += 1
+                return record['message'], file_patch_to_diff(file_path, file)
             
-            if commit.parents:
-                parent_sha = commit.parents[0].sha
+            if record['parents']:
+                parent_sha = record['parents'][0]
                 diff_url = self.repo.compare(parent_sha, commit_sha).diff_url
-                return commit.commit.message, requests.get(diff_url).text
-            return commit.commit.message, ""
+                diff, truncated = self.token_pool.get_text(diff_url, max_bytes=diff_byte_budget(context_window))
+                self.diff_stats['truncated' if truncated else 'downloaded'] += 1
+                return record['message'], diff
+            return record['message'], ""
         except Exception as e:
             print(f"GitHub取得エラー: {e}")
             return None, None
 
+    def get_changed_paths(self, commit_sha):
+        """コミットで変更されたファイルのパス一覧（ルール分類用、差分が途中で打ち切られても全ファイルを返す）"""
+        if self.git_backend is not None:
+            return self.git_backend.get_changed_paths(commit_sha)
+        return list(self.commit_store.get(commit_sha)['files'])
+
     def get_commit_changed_lines(self, commit_sha):
         """コミットの変更行数を取得"""
         try:
-            commit = self.repo.get_commit(commit_sha)
-            return commit.stats.additions + commit.stats.deletions
+            if self.git_backend is not None:
+                return self.git_backend.get_commit_changed_lines(commit_sha)
+            
+            record = self.commit_store.get(commit_sha)
+            return record['additions'] + record['deletions']
         except Exception as e:
             print(f"変更行数取得エラー {commit_sha[:8]}: {e}")
             return 0
     
     def save_results_to_csv_v4(self, df_classified):
-        """結果をresults_v4.csvに保存（上書き・コミット単位）"""
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        output_dir = os.path.join(script_dir, "../data_list/RQ1/final_result")
-        os.makedirs(output_dir, exist_ok=True)
-        csv_path = os.path.join(output_dir, "results_v4.csv")
-        
-        # 既存のCSVを読み込む（存在する場合）
-        if os.path.exists(csv_path):
-            existing_df = pd.read_csv(csv_path)
-        else:
-            existing_df = pd.DataFrame()
+        """結果をresults_v4.csvに追記（コミット単位、既に保存済みの行は追記しない）"""
+        sink = get_results_sink()
         
         # 新しいデータを作成
         csv_data = []
@@ -617,28 +658,24 @@ class RQ1AnalyzerAPI:
                 'commit_classification': row.get('classification_label', 'not_classified')
             })
         
-        # 新しいデータをDataFrameに変換
-        new_df = pd.DataFrame(csv_data)
+        # まとめて追記（fsync済みのインデックスで重複を除く）
+        appended = sink.append(csv_data)
         
-        # 既存データと結合して上書き保存
-        combined_df = pd.concat([existing_df, new_df], ignore_index=True)
-        combined_df.to_csv(csv_path, index=False, encoding='utf-8-sig')
-        
-        print(f"CSV保存完了: {csv_path}（総行数: {len(combined_df)}行）")
+        print(f"CSV保存完了: {sink.csv_path}（追記: {appended}行, 重複除外: {len(csv_data) - appended}行, "
+              f"総行数: {len(sink)}行）")
 
     def step3_classify_commits(self, df):
-        """ステップ3: コミット分類"""
+        """ステップ3: コミット分類（リポジトリ内の全コミットのプロンプトを集めてまとめて分類）"""
         print("\n=== ステップ3: コミット分類 ===")
         
-        if not pipe:
-            print("分類モデル利用不可 - 分類スキップ")
-            df['classification_label'] = 'not_classified'
-            return df
-        
         results = []
+        # 分類待ちのコミット（sha → メッセージ・差分、同じコミットは1回だけ分類）
+        pending = {}
+        # 分類待ちのコミットの変更ファイル（sha → パス一覧）
+        changed_paths = {}
         
         try:
-            for _, row in tqdm(df.iterrows(), total=len(df), desc="コミット分類"):
+            for _, row in tqdm(df.iterrows(), total=len(df), desc="コミット情報取得"):
                 commit_sha = row['commit_hash']
                 
                 base_result = {
@@ -654,17 +691,42 @@ class RQ1AnalyzerAPI:
                 
                 if commit_sha == 'No commits found':
                     base_result['classification_label'] = 'no_commits'
-                else:
+                elif not self.classify:
+                    # 差分は取得せず、後の分類パスに回す
+                    base_result['classification_label'] = PENDING_LABEL
+                elif commit_sha not in pending:
                     try:
-                        message, diff = self.fetch_message_and_diff(commit_sha)
-                        base_result['classification_label'] = self.classify_commit(message, diff) if message and diff else 'fetch_error'
+                        message, diff = self.fetch_message_and_diff(commit_sha, row['file_path'])
+                        if message and diff:
+                            changed_paths[commit_sha] = self.get_changed_paths(commit_sha)
+                            pending[commit_sha] = (message, diff)
+                        else:
+                            base_result['classification_label'] = 'fetch_error'
                     except Exception as e:
                         tqdm.write(f"エラー {commit_sha[:8]}: {e}")
                         base_result['classification_label'] = 'error'
                 
                 results.append(base_result)
             
-            print("分類処理完了")
+            print(f"差分取得: 取得済みpatch={self.diff_stats['file_patch']}件, "
+                  f"ダウンロード={self.diff_stats['downloaded']}件, 途中で打ち切り={self.diff_stats['truncated']}件")
+            if not pending:
+                return pd.DataFrame(results)
+            
+            # まとめて分類
+            print(f"分類中: {len(pending)}コミット（バッチサイズ: {classifier.batch_size}）")
+            shas = list(pending.keys())
+            # 差分はdiff_byte_budgetで打ち切られるため、ルール分類には全変更ファイルのパスを渡す
+            labels = dict(zip(shas, classifier.classify_batch([pending[sha] for sha in shas], shas=shas,
+                                                              paths=[changed_paths[sha] for sha in shas],
+                                                              kind=COMMIT_DIFF)))
+            for result in results:
+                if 'classification_label' not in result:
+                    result['classification_label'] = labels[result['commit_hash']]
+            
+            print(f"分類処理完了（{classification_cache.summary()}）")
+            if classifier.rules is not None:
+                print(classifier.rules.summary())
             return pd.DataFrame(results)
             
         except Exception as e:
@@ -770,14 +832,29 @@ class RQ1AnalyzerAPI:
         print("\n".join(results[:10]) + "\n...")
         return results
 
-    def run_full_analysis(self):
-        """全分析実行（API版）- エラーハンドリング強化版"""
+    def save_outputs(self, df_classified, ai_file_count):
+        """分析結果CSVと成功リポジトリリストを保存"""
+        # results_v4.csvに保存
+        print("\n--- CSV保存 (results_v4.csv) ---")
+        self.save_results_to_csv_v4(df_classified)
+        print("✓ CSV保存完了")
+        
+        # 成功リポジトリ情報を記録
+        print("\n--- 成功リポジトリ記録 ---")
+        self.save_successful_repository(ai_file_count)
+
+    def run_full_analysis(self, quota=None):
+        """全分析実行（API版）- エラーハンドリング強化版
+        
+        Args:
+            quota: 並列実行時の成功数管理（SuccessQuota）。Noneなら常に保存する
+        """
         print(f"=== RQ1分析開始 (API版): {self.repo_name_full} ===")
         
         try:
             # step1: ファイル追加分析
             print("\n--- ステップ1: ファイル追加分析 ---")
-            df_additions, step1_status = self.step1_find_added_files()
+            df_additions, step1_status = self.step1_find_added_files(candidate_factor=self.candidate_factor)
             if df_additions is None or len(df_additions) == 0:
                 if step1_status == 'no_commits_90days':
                     print("⚠ ステップ1失敗: 7/31以前のコミットが存在しません")
@@ -791,6 +868,10 @@ class RQ1AnalyzerAPI:
             
             print(f"✓ ステップ1完了: {len(df_additions)}件のファイル追加を検出")
             
+            # 並列実行中に目標成功数へ到達していれば以降の処理は行わない
+            if quota is not None and quota.reached():
+                return None, 'target_reached'
+            
             # AI作成ファイルが見つからなかった場合
             if step1_status == 'no_ai_files':
                 print("⚠ 警告: AI作成ファイルが見つかりませんでした")
@@ -805,6 +886,9 @@ class RQ1AnalyzerAPI:
             
             print(f"✓ ステップ2完了: {len(df_history)}件のコミット履歴を取得")
             
+            if quota is not None and quota.reached():
+                return None, 'target_reached'
+            
             # step3: コミット分類
             print("\n--- ステップ3: コミット分類 ---")
             df_classified = self.step3_classify_commits(df_history)
@@ -814,17 +898,20 @@ class RQ1AnalyzerAPI:
             
             print(f"✓ ステップ3完了: {len(df_classified)}件のコミットを分類")
             
-            # results_v4.csvに保存
-            print("\n--- CSV保存 (results_v4.csv) ---")
-            self.save_results_to_csv_v4(df_classified)
-            print("✓ CSV保存完了")
-            
             # AI作成ファイル数をカウント
             ai_file_count = len(df_additions[df_additions['is_ai_generated'] == True])
             
-            # 成功リポジトリ情報を記録
-            print("\n--- 成功リポジトリ記録 ---")
-            self.save_successful_repository(ai_file_count)
+            # 結果を保存（並列実行時は成功枠を確保できた場合のみ）
+            if quota is None:
+                self.save_outputs(df_classified, ai_file_count)
+            else:
+                with quota.reserve() as reserved:
+                    if not reserved:
+                        print(f"⚠ 目標成功数に到達済みのため保存しません: {self.repo_name_full}")
+                        return None, 'target_reached'
+                    self.save_outputs(df_classified, ai_file_count)
+            
+            print(self.commit_store.summary())
             
             # 個別レポートは出力せず、統合分析でまとめて出力
             print(f"\n✓✓✓ 完了: {self.repo_name} ✓✓✓")
@@ -844,88 +931,150 @@ class RQ1AnalyzerAPI:
             return None, f'exception: {type(e).__name__}'
 
 
-def analyze_multiple_repositories(repo_list, start_index=0, num_repos=100):
-    """複数リポジトリの分析を実行 - 成功数ベース版"""
-    github_token = os.getenv("GITHUB_TOKEN")
+# 失敗理由の表示名
+FAILURE_REASON_MAP = {
+    'no_commits_90days': '90日以前のコミットが存在しない',
+    'no_file_additions': '90日以前にファイル追加コミットなし',
+    'no_ai_files': 'AI作成ファイルが見つからない',
+    'step1_failed': 'ステップ1失敗',
+    'step2_failed': 'ステップ2失敗',
+    'step3_failed': 'ステップ3失敗'
+}
+
+
+def analyze_single_repository(repo_name_full, github_token, quota, backend='api', candidate_factor=None,
+                              classify=True):
+    """1リポジトリの分析（ワーカースレッドで実行）
+    
+    Returns:
+        tuple: (analyzer, result, status)
+    """
+    # RQ1Analyzerの初期化
+    print(f"リポジトリに接続中... {repo_name_full}")
+    analyzer = RQ1AnalyzerAPI(repo_name_full, github_token, backend=backend, candidate_factor=candidate_factor,
+                              classify=classify)
+    
+    # 分析実行
+    result, status = analyzer.run_full_analysis(quota=quota)
+    return analyzer, result, status
+
+
+def analyze_multiple_repositories(repo_list, start_index=0, num_repos=100, max_workers=4, backend='api',
+                                  candidate_factor=None, classify=True):
+    """複数リポジトリの分析を実行 - 成功数ベース版（並列実行）
     
-    if not github_token:
+    Args:
+        repo_list: リポジトリ情報のリスト
+        start_index: 開始位置
+        num_repos: 目標成功リポジトリ数
+        max_workers: 同時に分析するリポジトリ数（1なら逐次実行と同じ）
+        backend: コミット情報の取得方法（'api' または 'git'）
+        candidate_factor: ステップ1の打ち切り条件（Noneなら期間内の全コミットを走査）
+        classify: Falseなら分類せずラベルを'pending'のまま保存（後でclassify_pending.pyで分類）
+    """
+    token_pool = get_token_pool()
+    
+    if not token_pool.tokens:
         print("エラー: GitHub tokenが設定されていません")
-        print(".envファイルにGITHUB_TOKENを設定してください")
+        print(".envファイルにGITHUB_TOKEN（複数の場合はGITHUB_TOKENS）を設定してください")
         return
+    github_token = token_pool.tokens[0]
     
     print(f"=" * 80)
     print(f"RQ1 複数リポジトリ分析 (GitHub API版)")
     print(f"=" * 80)
     print(f"開始位置: {start_index + 1}番目のリポジトリから")
     print(f"目標分析数: {num_repos}リポジトリ（成功基準）")
-    print(f"GitHub API: OK")
+    print(f"同時実行数: {max_workers}")
+    print(f"取得方法: {backend}")
+    print(f"コミット分類: {'実行' if classify else '後回し（pending）'}")
+    print(f"GitHub API: OK（トークン{len(token_pool.tokens)}個）")
     print(f"=" * 80)
     
+    # 既存の結果CSVの分類ラベルをキャッシュに読み込む
+    results_csv = os.path.join(script_dir, "../data_list/RQ1/final_result/results_v4.csv")
+    # （results_v4は生成モードの7Bモデルがコミット全体の差分で分類したラベル、WARM_UP_SCOPEのキーに読み込む）
+    warmed = classification_cache.warm_up_from_csv([results_csv], COMMIT_DIFF)
+    print(f"分類キャッシュ: 既存結果から{warmed}コミットを読み込み")
+    
     start_time = datetime.now()
     all_results = []
     all_classifications = []
     failed_repos = []
+    discarded_repos = []
+    
+    # 成功数の管理（保存はロック内で1件ずつ行う）
+    quota = SuccessQuota(num_repos)
     
     # 成功したリポジトリがnum_repos個になるまで続ける
     idx = start_index
-    while len(all_results) < num_repos and idx < len(repo_list):
-        repo_info = repo_list[idx]
-        repo_name_full = f"{repo_info['owner']}/{repo_info['repository_name']}"
-        
-        print(f"\n{'='*80}")
-        print(f"[試行: {idx+1}] [成功: {len(all_results)}/{num_repos}] {repo_name_full}")
-        print(f"スター数: {repo_info['stars']:,}")
-        print(f"{'='*80}")
-        
-        try:
-            # RQ1Analyzerの初期化
-            print("リポジトリに接続中...")
-            analyzer = RQ1AnalyzerAPI(repo_name_full, github_token)
-            
-            # 分析実行
-            result, status = analyzer.run_full_analysis()
-            
-            if result is not None:
-                all_results.append({
-                    'repo': repo_name_full,
-                    'stars': repo_info['stars'],
-                    'analyzer': analyzer,
-                    'data': result
-                })
-                all_classifications.append(result['df_classified'])
-                print(f"\n✓✓✓ [成功: {len(all_results)}/{num_repos}] {repo_name_full} 分析成功 ✓✓✓")
+    running = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while True:
+            # 空きワーカーに次のリポジトリを投入（目標到達後は投入しない）
+            while len(running) < max_workers and idx < len(repo_list) and not quota.reached():
+                repo_info = repo_list[idx]
+                repo_name_full = f"{repo_info['owner']}/{repo_info['repository_name']}"
                 
-            else:
-                # 失敗理由を詳細に記録
-                reason_map = {
-                    'no_commits_90days': '90日以前のコミットが存在しない',
-                    'no_file_additions': '90日以前にファイル追加コミットなし',
-                    'no_ai_files': 'AI作成ファイルが見つからない',
-                    'step1_failed': 'ステップ1失敗',
-                    'step2_failed': 'ステップ2失敗',
-                    'step3_failed': 'ステップ3失敗'
-                }
-                reason = reason_map.get(status, status)
+                print(f"\n{'='*80}")
+                print(f"[試行: {idx+1}] [成功: {len(all_results)}/{num_repos}] {repo_name_full}")
+                print(f"スター数: {repo_info['stars']:,}")
+                print(f"{'='*80}")
                 
-                failed_repos.append({
-                    'repo': repo_name_full,
-                    'stars': repo_info['stars'],
-                    'reason': reason
-                })
-                print(f"\n✗✗✗ {repo_name_full} 分析失敗: {reason} ✗✗✗")
-                print(f"→ 次のリポジトリに進みます... (残り成功必要数: {num_repos - len(all_results)})")
+                future = executor.submit(analyze_single_repository, repo_name_full, github_token, quota, backend,
+                                         candidate_factor, classify)
+                running[future] = (idx, repo_info, repo_name_full)
+                idx += 1
+            
+            if not running:
+                break
+            
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                repo_idx, repo_info, repo_name_full = running.pop(future)
                 
-        except Exception as e:
-            failed_repos.append({
-                'repo': repo_name_full,
-                'stars': repo_info['stars'],
-                'reason': f'{type(e).__name__}: {str(e)}'
-            })
-            print(f"\n✗✗✗ {repo_name_full} エラー発生 ✗✗✗")
-            print(f"エラー詳細: {type(e).__name__}: {str(e)}")
-            print(f"→ 次のリポジトリに進みます... (残り成功必要数: {num_repos - len(all_results)})")
-        
-        idx += 1
+                try:
+                    analyzer, result, status = future.result()
+                    
+                    if result is not None:
+                        all_results.append({
+                            'index': repo_idx,
+                            'repo': repo_name_full,
+                            'stars': repo_info['stars'],
+                            'analyzer': analyzer,
+                            'data': result
+                        })
+                        all_classifications.append(result['df_classified'])
+                        print(f"\n✓✓✓ [成功: {len(all_results)}/{num_repos}] {repo_name_full} 分析成功 ✓✓✓")
+                    
+                    elif status == 'target_reached':
+                        # 目標到達後に完了したリポジトリは失敗扱いにしない
+                        discarded_repos.append(repo_name_full)
+                    
+                    else:
+                        # 失敗理由を詳細に記録
+                        reason = FAILURE_REASON_MAP.get(status, status)
+                        
+                        failed_repos.append({
+                            'repo': repo_name_full,
+                            'stars': repo_info['stars'],
+                            'reason': reason
+                        })
+                        print(f"\n✗✗✗ {repo_name_full} 分析失敗: {reason} ✗✗✗")
+                        print(f"→ 次のリポジトリに進みます... (残り成功必要数: {num_repos - len(all_results)})")
+                        
+                except Exception as e:
+                    failed_repos.append({
+                        'repo': repo_name_full,
+                        'stars': repo_info['stars'],
+                        'reason': f'{type(e).__name__}: {str(e)}'
+                    })
+                    print(f"\n✗✗✗ {repo_name_full} エラー発生 ✗✗✗")
+                    print(f"エラー詳細: {type(e).__name__}: {str(e)}")
+                    print(f"→ 次のリポジトリに進みます... (残り成功必要数: {num_repos - len(all_results)})")
+    
+    # リストの順序に並べ直す（完了順は実行ごとに異なるため）
+    all_results.sort(key=lambda r: r['index'])
     
     # 結果サマリー
     print(f"\n{'='*80}")
@@ -934,6 +1083,8 @@ def analyze_multiple_repositories(repo_list, start_index=0, num_repos=100):
     print(f"成功: {len(all_results)}件（目標: {num_repos}件）")
     print(f"失敗: {len(failed_repos)}件")
     print(f"試行総数: {idx}件")
+    if discarded_repos:
+        print(f"目標到達後に完了（未保存）: {len(discarded_repos)}件")
     
     if len(all_results) < num_repos:
         print(f"\n⚠ 警告: 目標の{num_repos}件に達しませんでした（リポジトリリスト不足）")
@@ -943,6 +1094,10 @@ def analyze_multiple_repositories(repo_list, start_index=0, num_repos=100):
         for failed in failed_repos:
             print(f"  - {failed['repo']}: {failed['reason']}")
     
+    if all_results:
+        print(f"\n{all_results[0]['analyzer'].http_cache.summary()}")
+    print("\n".join(token_pool.summary()))
+    
     total_time = datetime.now() - start_time
     print(f"\n{'='*80}")
     print(f"総処理時間: {total_time}")
@@ -951,6 +1106,11 @@ def analyze_multiple_repositories(repo_list, start_index=0, num_repos=100):
 
 def main():
     """メイン実行"""
+    parser = argparse.ArgumentParser(description="RQ1 複数リポジトリ分析")
+    parser.add_argument('--no-classify', action='store_true',
+                        help="コミット分類を行わずラベルを'pending'のまま保存する（モデルを読み込まない）")
+    args = parser.parse_args()
+    
     # CSVからリポジトリリスト読み込み
     script_dir = os.path.dirname(os.path.abspath(__file__))
     csv_path = os.path.join(script_dir, "../dataset/repository_list.csv")
@@ -966,12 +1126,23 @@ def main():
     # 分析対象リポジトリ数
     num_repos = 100
     
+    # 同時に分析するリポジトリ数
+    max_workers = 4
+    
+    # コミット情報の取得方法（'api': GitHub REST API, 'git': ローカルのblobless clone）
+    backend = 'api'
+    
+    # ステップ1の打ち切り条件（例: 5 ならAI/Humanそれぞれ目標数の5倍の候補が見つかった時点で走査終了）
+    # Noneなら2025/1/1～2025/7/31の全コミットを走査する
+    candidate_factor = None
+    
     print(f"総リポジトリ数: {len(repo_list)}件")
     print(f"開始位置: {start_repo + 1}番目")
     print(f"分析対象: {num_repos}件")
     
     # 複数リポジトリ分析実行
-    analyze_multiple_repositories(repo_list, start_repo, num_repos)
+    analyze_multiple_repositories(repo_list, start_repo, num_repos, max_workers, backend, candidate_factor,
+                                  classify=not args.no_classify)
 
 
 if __name__ == "__main__":
@@ -4,40 +4,68 @@ results_v5.csvのファイルに対して2025/11/11以降のコミットを取
 """
 
 import os
+import argparse
 import pandas as pd
 from datetime import datetime
-import time
 from github import Github
 from dotenv import load_dotenv
 from tqdm import tqdm
-from transformers import pipeline
 
 # componentsフォルダからインポート
 import sys
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 from components.AI_check import ai_check
+from components.ccs_prompt import MODEL_ID
+from components.lazy_classifier import LazyClassifier
+from components.classification_cache import ClassificationCache, COMMIT_DIFF, FILE_PATCH
 from components.check_network import retry_with_network_check
+from components.http_cache import install_http_cache
+from components.token_pool import get_token_pool
+from components.commit_store import CommitDetailStore
+from components.checkpoint_journal import CheckpointJournal
+from components.results_store import ResultsStore
 
 # .envファイル読み込み
 script_dir = os.path.dirname(os.path.abspath(__file__))
 dotenv_path = os.path.join(script_dir, '..', '.env')
 load_dotenv(dotenv_path)
 
-# コミット分類用モデル初期化
-pipe = pipeline("text-generation", model="0x404/ccs-code-llama-7b", device_map="auto")
-tokenizer = pipe.tokenizer
+# コミット分類用モデル（キャッシュにない分類が初めて必要になった時点で読み込む）
+# 分類サービス・推論バックエンド・ワーカープロセス数は.envで設定（LazyClassifier.from_env）
+# 分類結果のキャッシュ（モデルID・sha・差分のハッシュで一致したものは再分類しない）
+classification_cache = ClassificationCache(
+    os.path.join(script_dir, '../data_list/classification_cache/classifications.sqlite'), MODEL_ID)
+# 分類方法は.envのCLASSIFIER_MODEで設定（既定: generate、'score'はベンチマークで一致率を確認してから使う）
+classifier = LazyClassifier.from_env(classification_cache)
+
+# 分類を後回しにした行のラベル（classify_pending.pyで分類する）
+PENDING_LABEL = 'pending'
 
 
 class CommitExpansion:
-    def __init__(self, github_token):
-        """初期化"""
+    def __init__(self, github_token, classify=True):
+        """初期化
+
+        classify: Falseなら分類キャッシュにないコミットのラベルを'pending'のまま保存する（モデルを読み込まない）
+        """
         self.github_token = github_token
+        self.classify = classify
+        # GitHub APIレスポンスのキャッシュ（ETagによる条件付きリクエスト）
+        # トークンはプールから残り回数の多いものを選び、間隔はレート制限に合わせて調整
+        self.token_pool = get_token_pool()
+        self.http_cache = install_http_cache(os.path.join(script_dir, '../data_list/http_cache/github_api.sqlite'),
+                                             token_pool=self.token_pool)
         self.g = Github(github_token)
         
+        # リポジトリごとのコミット詳細キャッシュ
+        self.commit_stores = {}
+        
         # 入出力パス
         project_root = os.path.join(script_dir, '../..')
         self.input_csv = os.path.join(project_root, 'results/EASE-results/results_v5.csv')
         self.output_csv = os.path.join(project_root, 'results/EASE-results/csv/results_v7_released_commits_restriction.csv')
+        # リポジトリごとに分割したParquetのストア（分析スクリプトはこちらを優先して読む）
+        self.results_store = ResultsStore.named('results_v7_released_commits_restriction')
         
         # 出力ディレクトリ作成
         os.makedirs(os.path.dirname(self.output_csv), exist_ok=True)
@@ -47,38 +75,27 @@ class CommitExpansion:
     
     def prepare_prompt(self, commit_message: str, git_diff: str, context_window: int = 1024):
         """コミット分類用プロンプト作成"""
-        prompt_head = "<s>[INST] <<SYS>>\nYou are a commit classifier based on commit message and code diff.Please classify the given commit into one of the ten categories: docs, perf, style, refactor, feat, fix, test, ci, build, and chore. The definitions of each category are as follows:\n**feat**: Code changes aim to introduce new features to the codebase, encompassing both internal and user-oriented features.\n**fix**: Code changes aim to fix bugs and faults within the codebase.\n**perf**: Code changes aim to improve performance, such as enhancing execution speed or reducing memory consumption.\n**style**: Code changes aim to improve readability without affecting the meaning of the code. This type encompasses aspects like variable naming, indentation, and addressing linting or code analysis warnings.\n**refactor**: Code changes aim to restructure the program without changing its behavior, aiming to improve maintainability. To avoid confusion and overlap, we propose the constraint that this category does not include changes classified as ``perf'' or ``style''. Examples include enhancing modularity, refining exception handling, improving scalability, conducting code cleanup, and removing deprecated code.\n**docs**: Code changes that modify documentation or text, such as correcting typos, modifying comments, or updating documentation.\n**test**: Code changes that modify test files, including the addition or updating of tests.\n**ci**: Code changes to CI (Continuous Integration) configuration files and scripts, such as configuring or updating CI/CD scripts, e.g., ``.travis.yml'' and ``.github/workflows''.\n**build**: Code changes affecting the build system (e.g., Maven, Gradle, Cargo). Change examples include updating dependencies, configuring build configurations, and adding scripts.\n**chore**: Code changes for other miscellaneous tasks that do not neatly fit into any of the above categories.\n<</SYS>>\n\n"
-        prompt_head_encoded = tokenizer.encode(prompt_head, add_special_tokens=False)
-
-        prompt_message = f"- given commit message:\n{commit_message}\n"
-        prompt_message_encoded = tokenizer.encode(prompt_message, max_length=64, truncation=True, add_special_tokens=False)
+        return classifier.prepare_prompt(commit_message, git_diff, context_window)
 
-        prompt_diff = f"- given commit diff: \n{git_diff}\n"
-        remaining_length = (context_window - len(prompt_head_encoded) - len(prompt_message_encoded) - 6)
-        prompt_diff_encoded = tokenizer.encode(prompt_diff, max_length=remaining_length, truncation=True, add_special_tokens=False)
-
-        prompt_end = tokenizer.encode(" [/INST]", add_special_tokens=False)
-        return tokenizer.decode(prompt_head_encoded + prompt_message_encoded + prompt_diff_encoded + prompt_end)
-
-    def classify_commit(self, commit_message: str, git_diff: str, context_window: int = 1024):
-        """コミット分類"""
-        if not pipe or not tokenizer:
-            return "model_not_available"
-
-        try:
-            prompt = self.prepare_prompt(commit_message, git_diff, context_window)
-            result = pipe(prompt, max_new_tokens=10, pad_token_id=pipe.tokenizer.eos_token_id)
-            label = result[0]["generated_text"].split()[-1]
-            return label
-        except Exception as e:
-            print(f"分類エラー: {e}")
-            return "classification_error"
+    def classify_commit(self, commit_message: str, git_diff: str, context_window: int = 1024, commit_sha=None,
+                        file_path=None):
+        """コミット分類（commit_shaを指定した場合は分類キャッシュを確認、git_diffはfile_pathのpatch）"""
+        if not self.classify:
+            return classifier.lookup(commit_sha, git_diff, file_path) or PENDING_LABEL
+        return classifier.classify(commit_message, git_diff, context_window, commit_sha=commit_sha,
+                                   file_path=file_path)
     
     @retry_with_network_check
     def get_repo(self, repo_name):
         """リポジトリ取得"""
         return self.g.get_repo(repo_name)
     
+    def get_commit_store(self, repo):
+        """リポジトリのコミット詳細キャッシュを取得（なければ作成）"""
+        if repo.full_name not in self.commit_stores:
+            self.commit_stores[repo.full_name] = CommitDetailStore(repo)
+        return self.commit_stores[repo.full_name]
+    
     @retry_with_network_check
     def get_new_commits(self, repo, file_path):
         """2025/11/1以降のコミット取得"""
@@ -96,11 +113,7 @@ class CommitExpansion:
     @retry_with_network_check
     def get_commit_patch(self, repo, commit_sha, file_path):
         """特定ファイルのpatch取得"""
-        commit = repo.get_commit(commit_sha)
-        for file in commit.files:
-            if file.filename == file_path:
-                return file.patch or "", file.changes
-        return "", 0
+        return self.get_commit_store(repo).get_file_patch(commit_sha, file_path)
     
     def process_commit(self, repo, commit, file_path, file_info):
         """コミット情報処理"""
@@ -109,7 +122,8 @@ class CommitExpansion:
             commit_sha = commit.sha
             author_name = commit.commit.author.name or "Unknown"
             commit_date = commit.commit.author.date.isoformat()
-            message = commit.commit.message
+            record = self.get_commit_store(repo).get(commit_sha)
+            message = record['message']
             
             # コミット作成者（author + committer）
             all_authors = [author_name]
@@ -122,13 +136,13 @@ class CommitExpansion:
             is_ai, commit_created_by = ai_check(all_authors)
             
             # コミット全体の変更行数
-            commit_changed_lines = sum(file.changes for file in commit.files)
+            commit_changed_lines = sum(file['changes'] for file in record['files'].values())
             
             # ファイル固有の変更行数取得
             patch, file_specific_changed_lines = self.get_commit_patch(repo, commit_sha, file_path)
             
             # コミット分類
-            commit_classification = self.classify_commit(message, patch)
+            commit_classification = self.classify_commit(message, patch, commit_sha=commit_sha, file_path=file_path)
             
             # データ作成
             commit_data = {
@@ -142,7 +156,6 @@ class CommitExpansion:
                 'file_specific_changed_lines': file_specific_changed_lines
             }
             
-            time.sleep(0.05)  # API rate limit対策
             return commit_data
             
         except Exception as e:
@@ -159,6 +172,13 @@ class CommitExpansion:
         df_v5 = pd.read_csv(self.input_csv)
         print(f"入力データ: {len(df_v5)}行")
         
+        # 既存の結果CSVの分類ラベルをキャッシュに読み込む
+        # （生成モードの7Bモデルのラベル、WARM_UP_SCOPEのキーに読み込む。
+        #  results_v5はコミット全体の差分、results_v7はファイルごとのpatchで分類したラベル）
+        warmed = classification_cache.warm_up_from_csv([self.input_csv], COMMIT_DIFF)
+        warmed += classification_cache.warm_up_from_csv([self.output_csv], FILE_PATCH)
+        print(f"分類キャッシュ: 既存結果から{warmed}コミットを読み込み")
+        
         # リポジトリ×ファイル単位でグループ化（CSV上の順序を保持）
         grouped = df_v5.groupby(['repository_name', 'file_name'], sort=False)
         # 元のCSVの順序でグループをソート
@@ -167,21 +187,24 @@ class CommitExpansion:
         total_files = len(sorted_groups)
         print(f"処理対象: {total_files}ファイル")
         
-        # 出力用データフレーム初期化
-        if os.path.exists(self.output_csv):
-            df_output = pd.read_csv(self.output_csv)
-            print(f"既存の出力ファイルを読み込み: {len(df_output)}行")
-            # 処理済みファイルを特定
-            processed = set(df_output.groupby(['repository_name', 'file_name']).groups.keys())
-            print(f"処理済み: {len(processed)}ファイル")
-        else:
-            df_output = pd.DataFrame()
-            processed = set()
+        # ファイルごとの結果を追記するジャーナル（処理済みファイルはインデックスだけから分かる）
+        journal_exists = os.path.exists(self.output_csv + '.journal.csv')
+        journal = CheckpointJournal(self.output_csv, df_v5.columns, ['repository_name', 'file_name'])
+        if not journal_exists and os.path.exists(self.output_csv):
+            # ジャーナル導入前の出力ファイルから再開する場合は1回だけ取り込む
+            df_existing = pd.read_csv(self.output_csv)
+            for key, file_rows in df_existing.groupby(['repository_name', 'file_name'], sort=False):
+                journal.append(key, file_rows)
+            print(f"既存の出力ファイルを取り込み: {len(df_existing)}行")
+        print(f"処理済み: {len(journal)}ファイル")
+        
+        # 今回の実行で結果が変わったリポジトリ（Parquetのストアはこのパーティションだけ書き直す）
+        updated_repos = set()
         
         # 各ファイルを処理（CSV上の順序で）
         for (repo_name, file_name), group in tqdm(sorted_groups, desc="ファイル処理"):
             # 処理済みならスキップ
-            if (repo_name, file_name) in processed:
+            if (repo_name, file_name) in journal:
                 continue
             
             print(f"\n処理中: {repo_name} / {file_name}")
@@ -224,32 +247,55 @@ class CommitExpansion:
                     # 日付順にソート
                     file_data = file_data.sort_values('commit_date')
                 
-                # 6. 出力データに追加
-                df_output = pd.concat([df_output, file_data], ignore_index=True)
-                
-                # 7. 即座に保存（動作1と4のタイミング）
-                df_output.to_csv(self.output_csv, index=False, encoding='utf-8-sig')
+                # 6. ジャーナルに追記して処理済みにする（このファイルの行のみ書き込む）
+                journal.append((repo_name, file_name), file_data)
+                updated_repos.add(repo_name)
                 
             except Exception as e:
                 print(f"  エラー（ファイル処理）: {e}")
                 continue
         
+        # 7. 出力CSVを1回だけ書き出し、変わったリポジトリのパーティションを書き直す
+        df_output = journal.consolidate()
+        total_rows = len(df_output)
+        # 中断した実行で追記されたリポジトリも、ストアの行数が出力と異なれば書き直す
+        output_counts = df_output['repository_name'].value_counts()
+        stored_counts = {}
+        if self.results_store.exists():
+            stored_counts = self.results_store.read(columns=[])['repository_name'].value_counts().to_dict()
+        updated_repos |= {repo for repo, count in output_counts.items() if stored_counts.get(repo) != count}
+        self.results_store.write(df_output[df_output['repository_name'].isin(updated_repos)])
+        
         print("\n" + "="*80)
         print("処理完了")
         print(f"出力: {self.output_csv}")
-        print(f"総行数: {len(df_output)}行")
+        print(f"Parquet: {self.results_store.store_dir}（{len(updated_repos)}リポジトリを更新）")
+        print(f"総行数: {total_rows}行")
+        print(self.http_cache.summary())
+        print(classification_cache.summary())
+        if classifier.rules is not None:
+            print(classifier.rules.summary())
+        print("\n".join(self.token_pool.summary()))
+        api_calls = sum(store.api_calls for store in self.commit_stores.values())
+        saved_calls = sum(store.saved_calls for store in self.commit_stores.values())
+        print(f"コミット詳細キャッシュ: API呼び出し={api_calls}回, 省略={saved_calls}回")
         print("="*80)
 
 
 def main():
     """メイン実行"""
-    github_token = os.getenv("GITHUB_TOKEN")
+    parser = argparse.ArgumentParser(description="コミットデータ拡張")
+    parser.add_argument('--no-classify', action='store_true',
+                        help="コミット分類を行わずラベルを'pending'のまま保存する（モデルを読み込まない）")
+    args = parser.parse_args()
+    
+    token_pool = get_token_pool()
     
-    if not github_token:
+    if not token_pool.tokens:
         print("エラー: GITHUB_TOKENが設定されていません")
         return
     
-    expander = CommitExpansion(github_token)
+    expander = CommitExpansion(token_pool.tokens[0], classify=not args.no_classify)
     expander.run()
 
 
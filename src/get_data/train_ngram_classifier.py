@@ -0,0 +1,88 @@
+"""
+軽量分類器（components/ngram_classifier.py）の学習と7Bモデルとの一致率の確認
+
+results_v5.csv / results_v7_released_commits_restriction.csv の commit_classification（7Bモデルの分類結果）を
+教師ラベルとして学習する。コミットメッセージとpatchは benchmark/labelled_sample.py で取得・保存したものを使う
+（ベンチマーク用のサンプルのコミットは除く）。
+コミット単位で学習用と評価用に分け、評価用での一致率と1件あたりの分類時間を表示して重みを保存する。
+学習した重みは CLASSIFIER_BACKEND=ngram で get-AI-files.py / get_commits_expansion.py / classify_pending.py から使える。
+"""
+
+import os
+import random
+import sys
+import time
+from collections import Counter
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from components.ccs_prompt import LABELS
+from components.ngram_classifier import NgramClassifier, DEFAULT_MODEL_PATH
+from benchmark.labelled_sample import load_labelled_sample
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+
+
+def split_by_commit(samples, test_ratio, seed):
+    """同じコミットが学習用と評価用の両方に入らないように分割"""
+    shas = sorted({sample['commit_hash'] for sample in samples})
+    random.Random(seed).shuffle(shas)
+    test_shas = set(shas[:int(len(shas) * test_ratio)])
+    train = [sample for sample in samples if sample['commit_hash'] not in test_shas]
+    test = [sample for sample in samples if sample['commit_hash'] in test_shas]
+    return train, test
+
+
+def main():
+    """メイン実行"""
+    project_root = os.path.join(script_dir, '../..')
+    # 教師データ（CSVパス, 取得したサンプルの保存先）
+    # （ベンチマーク用のサンプル benchmark/labelled_sample.py のDEFAULT_SAMPLEとは別のファイルに保存する）
+    sources = [
+        (os.path.join(project_root, 'results/EASE-results/csv/results_v5.csv'),
+         os.path.join(script_dir, '../data_list/ngram_classifier/train_sample_v5.json')),
+        (os.path.join(project_root, 'results/EASE-results/csv/results_v7_released_commits_restriction.csv'),
+         os.path.join(script_dir, '../data_list/ngram_classifier/train_sample_v7.json')),
+    ]
+    # CSVごとのサンプル数・評価用の割合・乱数シード・エポック数
+    num_samples = 5000
+    test_ratio = 0.2
+    seed = 0
+    epochs = 5
+
+    # ベンチマーク（benchmark/classifier_benchmark.py）で評価するコミットは学習に使わない
+    benchmark_shas = {sample['commit_hash'] for sample in load_labelled_sample()}
+
+    samples = []
+    for csv_path, sample_path in sources:
+        samples.extend(load_labelled_sample(num_samples, seed, csv_path=csv_path, sample_path=sample_path,
+                                            exclude_shas=benchmark_shas))
+    train, test = split_by_commit(samples, test_ratio, seed)
+    print(f"学習用: {len(train)}件, 評価用: {len(test)}件")
+
+    # patchにはヘッダ（diff --git）がないため、パスの特徴量にはファイル名を渡す（classify_pending.pyと同じ）
+    model = NgramClassifier().fit([(s['message'], s['patch']) for s in train], [s['label'] for s in train],
+                                  epochs=epochs, seed=seed, paths=[[s['file_name']] for s in train])
+
+    start = time.perf_counter()
+    predicted = model.classify_batch([(s['message'], s['patch']) for s in test],
+                                     paths=[[s['file_name']] for s in test])
+    elapsed = time.perf_counter() - start
+
+    expected = [s['label'] for s in test]
+    total = Counter(expected)
+    agreed = Counter(e for e, p in zip(expected, predicted) if e == p)
+    print("\n" + "=" * 60)
+    print(f"7Bモデルとの一致率: {sum(agreed.values()) / max(len(test), 1) * 100:.1f}%（評価用 {len(test)}件）")
+    print(f"分類時間: {elapsed / max(len(test), 1) * 1e6:.0f}マイクロ秒/件（{len(test) / elapsed:.0f}件/秒）")
+    print("\nラベル別（7Bのラベル: 件数, 一致率）")
+    for label in LABELS:
+        if total[label]:
+            print(f"  {label:<10} {total[label]:>5}件 {agreed[label] / total[label] * 100:>6.1f}%")
+    print("=" * 60)
+
+    model.save(DEFAULT_MODEL_PATH, train_shas={s['commit_hash'] for s in train})
+    print(f"重み保存: {DEFAULT_MODEL_PATH}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+CheckpointJournal（components/checkpoint_journal.py）の再開と、追記途中で停止した場合の復旧の確認
+
+    python -m pytest src/tests
+"""
+
+import os
+import sys
+
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from components.checkpoint_journal import CheckpointJournal
+
+COLUMNS = ['repository_name', 'file_name', 'commit_hash']
+KEYS = ['repository_name', 'file_name']
+
+
+def rows(repo, file_name, *shas):
+    return pd.DataFrame([{'repository_name': repo, 'file_name': file_name, 'commit_hash': sha} for sha in shas])
+
+
+def open_journal(tmp_path):
+    return CheckpointJournal(str(tmp_path / 'results.csv'), COLUMNS, KEYS)
+
+
+def test_resume_and_consolidate(tmp_path):
+    journal = open_journal(tmp_path)
+    journal.append(('a/x', 'app.py'), rows('a/x', 'app.py', '1', '2'))
+    # 行のない処理単位も処理済みとして記録する
+    journal.append(('a/x', 'empty.py'), rows('a/x', 'empty.py'))
+
+    journal = open_journal(tmp_path)
+    assert ('a/x', 'app.py') in journal and ('a/x', 'empty.py') in journal
+    assert ('b/y', 'lib.py') not in journal
+    journal.append(('b/y', 'lib.py'), rows('b/y', 'lib.py', '3'))
+
+    df = journal.consolidate()
+    assert list(df['commit_hash'].astype(str)) == ['1', '2', '3']
+    assert list(pd.read_csv(str(tmp_path / 'results.csv'), encoding='utf-8-sig')['commit_hash']) == [1, 2, 3]
+
+
+def test_torn_journal_append_is_truncated(tmp_path):
+    journal = open_journal(tmp_path)
+    journal.append(('a/x', 'app.py'), rows('a/x', 'app.py', '1'))
+    committed = os.path.getsize(journal.journal_path)
+
+    # ジャーナルへの追記の途中で停止した状態（インデックスには記録されていない）
+    with open(journal.journal_path, 'ab') as f:
+        f.write(b'b/y,lib.py,')
+
+    journal = open_journal(tmp_path)
+    assert os.path.getsize(journal.journal_path) == committed
+    assert len(journal) == 1 and ('b/y', 'lib.py') not in journal
+
+
+def test_torn_index_line_is_dropped(tmp_path):
+    journal = open_journal(tmp_path)
+    journal.append(('a/x', 'app.py'), rows('a/x', 'app.py', '1'))
+    committed = os.path.getsize(journal.journal_path)
+
+    # ジャーナルは書けたが、インデックスの行が途中で切れた状態
+    with open(journal.journal_path, 'ab') as f:
+        f.write(b'b/y,lib.py,2\n')
+    with open(journal.index_path, 'ab') as f:
+        f.write(b'{"key": ["b/y"')
+
+    journal = open_journal(tmp_path)
+    assert os.path.getsize(journal.journal_path) == committed
+    assert len(journal) == 1
+    journal.append(('b/y', 'lib.py'), rows('b/y', 'lib.py', '2'))
+    assert len(open_journal(tmp_path)) == 2
+
+
+def test_missing_index_is_rebuilt_without_last_unit(tmp_path):
+    journal = open_journal(tmp_path)
+    journal.append(('a/x', 'app.py'), rows('a/x', 'app.py', '1', '2'))
+    journal.append(('b/y', 'lib.py'), rows('b/y', 'lib.py', '3'))
+    os.remove(journal.index_path)
+
+    # 最後の処理単位は途中までの可能性があるため、その行は除いて再処理する
+    journal = open_journal(tmp_path)
+    assert ('a/x', 'app.py') in journal and ('b/y', 'lib.py') not in journal
+    assert list(pd.read_csv(journal.journal_path, dtype=str)['commit_hash']) == ['1', '2']
+    assert len(open_journal(tmp_path)) == 1
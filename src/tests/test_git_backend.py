@@ -0,0 +1,195 @@
+"""
+LocalGitBackend（components/git_backend.py）がGitHub APIの経路と同じ形のレコードを返すことの確認
+
+一時ディレクトリに小さなgitリポジトリ（5コミット、追加・変更・リネーム・削除を含む）を作って使う。
+GitHub APIの経路のレコードは、同じ内容のPyGithub風オブジェクトから commit_to_record / commit_to_log で作る。
+
+    python -m pytest src/tests
+"""
+
+import os
+import subprocess
+import sys
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from components.git_backend import LocalGitBackend, decode_head
+from components.commit_store import commit_to_record
+from components.file_history import commit_to_log
+
+# (メッセージ, author, committer, author日時, 変更内容)
+# 変更内容は ('write', パス, 内容) / ('mv', 元, 先) / ('rm', パス)
+COMMITS = [
+    ("Add app and notes", "Alice", "Copilot", "2025-01-10T09:00:00+00:00",
+     [('write', 'app.py', "print('a')\nprint('b')\n"), ('write', 'notes.txt', "one\ntwo\nthree\n")]),
+    ("Fix app", "Bob", "Bob", "2025-02-01T12:30:00+00:00",
+     [('write', 'app.py', "print('a')\nprint('c')\nprint('d')\n")]),
+    ("Rename notes", "Alice", "Alice", "2025-03-05T08:15:00+00:00",
+     [('mv', 'notes.txt', 'docs/notes.txt'), ('write', 'docs/notes.txt', "one\ntwo\nthree\nfour\n")]),
+    ("Update app", "Carol", "Bob", "2025-04-20T18:45:00+00:00",
+     [('write', 'app.py', "print('d')\n")]),
+    ("Move notes into util", "Bob", "Bob", "2025-05-02T07:00:00+00:00",
+     [('rm', 'docs/notes.txt'), ('write', 'lib/util.py', "NOTES = 4\n\n\ndef f():\n    return NOTES\n")]),
+]
+
+
+def run_git(repo_dir, *args, env=None):
+    return subprocess.run(['git', '-C', repo_dir, *args], capture_output=True, text=True, check=True,
+                          env=env).stdout
+
+
+@pytest.fixture(scope='module')
+def fixture_repo(tmp_path_factory):
+    """COMMITSのgitリポジトリを作成
+
+    Returns:
+        tuple: (リポジトリのパス, コミットのshaのリスト（古い順）)
+    """
+    repo_dir = str(tmp_path_factory.mktemp('repo'))
+    run_git(repo_dir, 'init', '--quiet')
+    shas = []
+    for message, author, committer, date, changes in COMMITS:
+        for change in changes:
+            if change[0] == 'write':
+                path = os.path.join(repo_dir, change[1])
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, 'w', encoding='utf-8') as f:
+                    f.write(change[2])
+                run_git(repo_dir, 'add', change[1])
+            elif change[0] == 'rm':
+                run_git(repo_dir, 'rm', '--quiet', change[1])
+            else:
+                os.makedirs(os.path.join(repo_dir, os.path.dirname(change[2])), exist_ok=True)
+                run_git(repo_dir, 'mv', change[1], change[2])
+        env = dict(os.environ,
+                   GIT_AUTHOR_NAME=author, GIT_AUTHOR_EMAIL=f"{author.lower()}@example.com", GIT_AUTHOR_DATE=date,
+                   GIT_COMMITTER_NAME=committer, GIT_COMMITTER_EMAIL=f"{committer.lower()}@example.com",
+                   GIT_COMMITTER_DATE=date)
+        run_git(repo_dir, 'commit', '--quiet', '-m', message, env=env)
+        shas.append(run_git(repo_dir, 'rev-parse', 'HEAD').strip())
+    return repo_dir, shas
+
+
+def github_commit(sha, message, author, committer, date, files=(), parents=()):
+    """PyGithubのCommitと同じ属性を持つオブジェクト（commit_to_record / commit_to_logの入力）"""
+    git_commit = SimpleNamespace(
+        message=message,
+        author=SimpleNamespace(name=author, email=f"{author.lower()}@example.com",
+                               date=datetime.fromisoformat(date).astimezone(timezone.utc)),
+        committer=SimpleNamespace(name=committer))
+    files = [SimpleNamespace(filename=name, **attrs) for name, attrs in files]
+    return SimpleNamespace(
+        sha=sha, commit=git_commit, files=files, parents=[SimpleNamespace(sha=parent) for parent in parents],
+        stats=SimpleNamespace(additions=sum(f.additions for f in files), deletions=sum(f.deletions for f in files)))
+
+
+def test_file_commits_match_github_logs(fixture_repo):
+    repo_dir, shas = fixture_repo
+    logs = LocalGitBackend(repo_dir).get_file_commits('app.py')
+
+    # 新しい順（app.pyを変更したコミットのみ）
+    expected = [commit_to_log(github_commit(sha, *commit[:4])) for sha, commit in zip(shas, COMMITS)
+                if any(change[1] == 'app.py' for change in commit[4])][::-1]
+    assert logs == expected
+    assert logs[-1]['all_authors'] == ['Alice', 'Copilot']
+
+
+def test_file_creation_info(fixture_repo):
+    repo_dir, shas = fixture_repo
+    info = LocalGitBackend(repo_dir).get_file_creation_info('app.py')
+
+    assert info == {
+        'author_name': 'Alice',
+        'all_authors': ['Alice', 'Copilot'],
+        'all_creator_names': ['Alice', 'Copilot'],
+        'creation_date': '2025-01-10T09:00:00+00:00',
+        'commit_count': 3
+    }
+
+
+def test_commit_details_match_github_record(fixture_repo):
+    repo_dir, shas = fixture_repo
+    backend = LocalGitBackend(repo_dir)
+
+    patch = "@@ -1,2 +1,3 @@\n print('a')\n-print('b')\n+print('c')\n+print('d')"
+    expected = commit_to_record(github_commit(
+        shas[1], "Fix app", "Bob", "Bob", COMMITS[1][3], parents=[shas[0]],
+        files=[('app.py', {'status': 'modified', 'patch': patch, 'changes': 3, 'additions': 2, 'deletions': 1})]))
+    message, diff = backend.fetch_message_and_diff(shas[1])
+    assert message == expected['message']
+    assert diff.startswith('diff --git a/app.py b/app.py') and patch in diff
+    assert backend.get_parents(shas[1]) == expected['parents']
+    assert backend.get_changed_paths(shas[1]) == list(expected['files'])
+    assert backend.get_commit_changed_lines(shas[1]) == expected['additions'] + expected['deletions']
+
+
+def test_rename_and_root_commit(fixture_repo):
+    repo_dir, shas = fixture_repo
+    backend = LocalGitBackend(repo_dir)
+
+    # リネームは新しいパスのみ（APIと同じ）、変更行数はリネーム後の追加1行のみ
+    assert backend.get_changed_paths(shas[2]) == ['docs/notes.txt']
+    assert backend.get_commit_changed_lines(shas[2]) == 1
+
+    assert backend.get_parents(shas[0]) == []
+    assert backend.fetch_message_and_diff(shas[0]) == ("Add app and notes", "")
+    assert backend.get_changed_paths(shas[0]) == ['app.py', 'notes.txt']
+    assert backend.get_commit_changed_lines(shas[0]) == 5
+
+
+def test_diff_byte_budget(fixture_repo):
+    repo_dir, shas = fixture_repo
+    backend = LocalGitBackend(repo_dir)
+
+    _, diff = backend.fetch_message_and_diff(shas[1])
+    _, head = backend.fetch_message_and_diff(shas[1], max_bytes=20)
+    assert len(head.encode('utf-8')) <= 20 and diff.startswith(head)
+
+
+def test_commits_with_file_additions_match_git_log(fixture_repo):
+    repo_dir, shas = fixture_repo
+    backend = LocalGitBackend(repo_dir)
+    since = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    until = datetime(2025, 12, 31, tzinfo=timezone.utc)
+
+    commits, total = backend.get_all_commits_with_file_additions(since, until)
+
+    # git logで追加されたファイルのみ（リネーム・削除・変更は含まない）
+    output = run_git(repo_dir, 'log', '--diff-filter=A', '--name-only', '--format=%x00%H %aI', 'HEAD')
+    expected = []
+    for chunk in output.split('\0')[1:]:
+        header, *paths = [line for line in chunk.splitlines() if line]
+        sha, date = header.split()
+        expected.append((sha, datetime.fromisoformat(date).astimezone(timezone.utc).isoformat(), paths))
+    assert [(c['hash'], c['date'], c['added_files']) for c in commits] == expected
+    assert expected == [(shas[4], '2025-05-02T07:00:00+00:00', ['lib/util.py']),
+                        (shas[0], '2025-01-10T09:00:00+00:00', ['app.py', 'notes.txt'])]
+    assert total == int(run_git(repo_dir, 'rev-list', '--count', 'HEAD')) == len(COMMITS)
+
+    # 期間外のコミットは含まない
+    commits, total = backend.get_all_commits_with_file_additions(datetime(2025, 2, 1), until)
+    assert [c['hash'] for c in commits] == [shas[4]]
+    assert total == 4
+
+
+def test_file_line_count_matches_git_show(fixture_repo):
+    repo_dir, shas = fixture_repo
+    backend = LocalGitBackend(repo_dir)
+
+    for sha, path, lines in [(shas[0], 'app.py', 2), (shas[1], 'app.py', 3), (shas[3], 'app.py', 1),
+                             (shas[2], 'docs/notes.txt', 4), (shas[4], 'lib/util.py', 5)]:
+        assert backend.get_file_line_count(path, sha) == lines
+        assert lines == len(run_git(repo_dir, 'show', f'{sha}:{path}').splitlines())
+
+
+def test_decode_head_stays_within_max_bytes():
+    # 途中で切れた文字・不正なバイト（置換文字は3バイト）があってもmax_bytesを超えない
+    text = "あいう"
+    for data in [text.encode('utf-8')[:7], b'\xff\xfe' + text.encode('utf-8')]:
+        for max_bytes in range(len(data) + 1):
+            head = decode_head(data[:max_bytes], max_bytes)
+            assert len(head.encode('utf-8')) <= max_bytes
+    assert decode_head(text.encode('utf-8')[:7], 7) == "あい"
@@ -0,0 +1,128 @@
+"""
+HttpCache（components/http_cache.py）の不変URLの判定・304の再検証・サイズ上限による削除の確認
+
+    python -m pytest src/tests
+"""
+
+import itertools
+import os
+import sys
+
+import pytest
+
+pytest.importorskip('github')
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from components import http_cache
+from components.http_cache import HttpCache, is_immutable_url, make_connection_class
+
+SHA = 'a' * 40
+OTHER_SHA = 'b' * 40
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """time.time()を呼ぶたびに1秒進める（最終アクセスの順序を確定させる）"""
+    ticks = itertools.count(1000)
+    monkeypatch.setattr(http_cache.time, 'time', lambda: float(next(ticks)))
+
+
+@pytest.mark.parametrize('url, expected', [
+    (f'/repos/o/r/commits/{SHA}', True),
+    (f'/repos/o/r/commits/{SHA}?per_page=100', True),
+    (f'/repos/o/r/git/trees/{SHA}', True),
+    (f'/repos/o/r/contents/src/app.py?ref={SHA}', True),
+    (f'/repos/o/r/contents/src/app.py?per_page=1&ref={SHA}', True),
+    (f'/repos/o/r/compare/{SHA}...{OTHER_SHA}', True),
+    ('/repos/o/r/commits/main', False),
+    ('/repos/o/r/commits?path=app.py', False),
+    (f'/repos/o/r/commits/{SHA}/extra', False),
+    ('/repos/o/r/contents/src/app.py?ref=main', False),
+    (f'/repos/o/r/contents/src/app.py?ref={SHA}x', False),
+    (f'/repos/o/r/compare/main...{SHA}', False),
+])
+def test_immutable_urls(url, expected):
+    assert is_immutable_url(url) == expected
+
+
+def test_put_requires_validator_unless_immutable(tmp_path):
+    cache = HttpCache(str(tmp_path / 'cache.sqlite'))
+    cache.put('/repos/o/r', {'Content-Type': 'application/json'}, '{}')
+    cache.put('/repos/o/r/commits', {'ETag': '"v1"', 'X-RateLimit-Remaining': '10'}, '[]')
+    cache.put(f'/repos/o/r/commits/{SHA}', {}, '{"sha": 1}')
+
+    assert cache.get('/repos/o/r') is None
+    entry = cache.get('/repos/o/r/commits')
+    assert entry['etag'] == '"v1"' and 'x-ratelimit-remaining' not in entry['headers']
+    assert cache.get(f'/repos/o/r/commits/{SHA}')['immutable']
+
+
+def test_eviction_removes_least_recently_used(tmp_path, clock):
+    cache = HttpCache(str(tmp_path / 'cache.sqlite'), max_bytes=10)
+    cache.put('/a', {'ETag': 'a'}, 'aaaa')
+    cache.put('/b', {'ETag': 'b'}, 'bbbb')
+    # /aを参照すると/bの方が古くなる（最終アクセスはまだ書き込まれていない）
+    assert cache.get('/a') is not None
+    cache.put('/c', {'ETag': 'c'}, 'cccc')
+
+    assert cache.get('/b') is None
+    assert cache.get('/a') is not None and cache.get('/c') is not None
+    assert cache.stats['evicted'] == 1
+    assert cache.total_size == 8
+
+    # 集計したサイズは開き直しても同じ
+    cache.close()
+    assert HttpCache(str(tmp_path / 'cache.sqlite'), max_bytes=10).total_size == 8
+
+
+class FakeResponse:
+    def __init__(self, status, headers, text=''):
+        self.status = status
+        self.headers = headers
+        self.text = text
+
+    def getheaders(self):
+        return list(self.headers.items())
+
+    def read(self):
+        return self.text
+
+
+class FakeConnection:
+    """PyGithubの接続クラスの代わり（送信したヘッダを記録し、用意したレスポンスを返す）"""
+    responses = []
+    sent = []
+
+    def __init__(self, verb, url, headers=None):
+        self.verb = verb
+        self.url = url
+        self.headers = headers or {}
+
+    def getresponse(self):
+        FakeConnection.sent.append(dict(self.headers))
+        return FakeConnection.responses.pop(0)
+
+
+def test_304_returns_cached_body_with_fresh_rate_limit_headers(tmp_path):
+    cache = HttpCache(str(tmp_path / 'cache.sqlite'))
+    connection_class = make_connection_class(FakeConnection, cache)
+    FakeConnection.sent = []
+    FakeConnection.responses = [
+        FakeResponse(200, {'ETag': '"v1"', 'X-RateLimit-Remaining': '99'}, '[1]'),
+        FakeResponse(304, {'ETag': '"v1"', 'X-RateLimit-Remaining': '98'}),
+        FakeResponse(200, {}, '{}'),
+    ]
+
+    first = connection_class('GET', '/repos/o/r/commits').getresponse()
+    assert first.read() == '[1]'
+
+    second = connection_class('GET', '/repos/o/r/commits').getresponse()
+    assert FakeConnection.sent[1]['If-None-Match'] == '"v1"'
+    assert (second.status, second.read()) == (200, '[1]')
+    assert dict(second.getheaders())['x-ratelimit-remaining'] == '98'
+
+    # 不変なURLは2回目以降リクエストしない
+    connection_class('GET', f'/repos/o/r/commits/{SHA}').getresponse()
+    assert connection_class('GET', f'/repos/o/r/commits/{SHA}').getresponse().read() == '{}'
+    assert len(FakeConnection.sent) == 3
+    assert cache.stats['revalidated'] == 1 and cache.stats['hits'] == 1
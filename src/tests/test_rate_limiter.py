@@ -0,0 +1,93 @@
+"""
+RateLimitThrottler（components/rate_limiter.py）のリクエスト間隔と403/429の扱いの確認
+
+time.time / time.sleepは差し替え、実際には待たない。
+
+    python -m pytest src/tests
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from components import rate_limiter
+from components.rate_limiter import RateLimitThrottler, SECONDARY_LIMIT_WAIT
+
+NOW = 1_000_000.0
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """固定の現在時刻（sleepした分だけ進む）"""
+    state = {'now': NOW, 'slept': []}
+
+    def sleep(seconds):
+        state['slept'].append(seconds)
+        state['now'] += seconds
+
+    monkeypatch.setattr(rate_limiter.time, 'time', lambda: state['now'])
+    monkeypatch.setattr(rate_limiter.time, 'sleep', sleep)
+    return state
+
+
+def limit_headers(remaining, reset_in):
+    return {'X-RateLimit-Remaining': str(remaining), 'X-RateLimit-Reset': str(int(NOW + reset_in))}
+
+
+def test_requests_are_spread_until_reset(clock):
+    throttler = RateLimitThrottler()
+    throttler.observe(200, limit_headers(10, 100))
+
+    for _ in range(3):
+        throttler.wait()
+    # 残り10回をリセットまでの100秒に割り振る（1回目は待たない、2回目は10秒後、3回目はその100/9秒後）
+    assert clock['slept'] == [pytest.approx(10.0), pytest.approx(100 / 9)]
+    assert throttler.remaining == 7
+    assert throttler.total_wait == pytest.approx(10.0 + 100 / 9)
+
+
+def test_exhausted_budget_waits_for_reset(clock):
+    throttler = RateLimitThrottler(reserve=2)
+    throttler.observe(200, limit_headers(2, 50))
+
+    throttler.wait()
+    assert clock['slept'] == [pytest.approx(51)]
+
+
+def test_retry_after_blocks(clock):
+    throttler = RateLimitThrottler()
+    throttler.observe(403, {'Retry-After': '30'})
+    throttler.wait()
+    assert clock['slept'] == [pytest.approx(30)]
+
+
+def test_primary_limit_403_waits_for_reset(clock):
+    throttler = RateLimitThrottler()
+    throttler.observe(403, limit_headers(0, 120), '{"message": "API rate limit exceeded"}')
+    assert throttler.blocked_until == NOW + 121
+
+
+@pytest.mark.parametrize('status, body', [
+    (403, '{"message": "You have exceeded a secondary rate limit. Please wait a few minutes"}'),
+    (403, b'{"message": "You have exceeded a secondary rate limit"}'),
+    (429, None),
+])
+def test_secondary_limit_backs_off(clock, status, body):
+    throttler = RateLimitThrottler()
+    throttler.observe(status, limit_headers(4000, 3000), body)
+    assert throttler.blocked_until == NOW + SECONDARY_LIMIT_WAIT
+
+
+@pytest.mark.parametrize('body', [
+    '{"message": "Resource not accessible by integration"}',
+    '{"message": "Repository access blocked"}',
+    None,
+])
+def test_other_403_does_not_block(clock, body):
+    throttler = RateLimitThrottler()
+    throttler.observe(403, limit_headers(4000, 3000), body)
+    assert throttler.blocked_until == 0
+    throttler.wait()
+    assert clock['slept'] == []
@@ -0,0 +1,115 @@
+"""
+AppendOnlyCsvSink（components/result_sink.py）の重複除去と、追記途中で停止した場合の復旧の確認
+
+    python -m pytest src/tests
+"""
+
+import json
+import os
+import sys
+
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from components.result_sink import AppendOnlyCsvSink, read_index
+
+COLUMNS = ['repository_name', 'commit_hash', 'label']
+KEYS = ['repository_name', 'commit_hash']
+
+
+def row(repo, sha, label='fix'):
+    return {'repository_name': repo, 'commit_hash': sha, 'label': label}
+
+
+def read_rows(csv_path):
+    return pd.read_csv(csv_path, encoding='utf-8-sig', dtype=str).to_dict('records')
+
+
+def start_append(csv_path, data, written):
+    """AppendOnlyCsvSink.appendの途中で停止した状態を作る（予定サイズを記録し、dataのwrittenバイトまで書く）"""
+    with open(csv_path + '.idx', 'a', encoding='utf-8') as f:
+        f.write(json.dumps({'intent': os.path.getsize(csv_path) + len(data)}) + '\n')
+    with open(csv_path, 'ab') as f:
+        f.write(data[:written])
+
+
+def test_append_skips_duplicate_keys(tmp_path):
+    csv_path = str(tmp_path / 'results.csv')
+    sink = AppendOnlyCsvSink(csv_path, COLUMNS, KEYS)
+
+    assert sink.append([row('a/x', '1'), row('a/x', '2'), row('a/x', '1', 'test')]) == 2
+    assert sink.append([row('a/x', '2'), row('b/y', '1')]) == 1
+
+    # 開き直してもインデックスから既存のキーを読み込む
+    sink = AppendOnlyCsvSink(csv_path, COLUMNS, KEYS)
+    assert len(sink) == 3
+    assert sink.append([row('b/y', '1')]) == 0
+    assert [(r['repository_name'], r['commit_hash'], r['label']) for r in read_rows(csv_path)] == \
+        [('a/x', '1', 'fix'), ('a/x', '2', 'fix'), ('b/y', '1', 'fix')]
+
+
+def test_torn_csv_append_is_truncated(tmp_path):
+    csv_path = str(tmp_path / 'results.csv')
+    sink = AppendOnlyCsvSink(csv_path, COLUMNS, KEYS)
+    sink.append([row('a/x', '1')])
+    committed = os.path.getsize(csv_path)
+
+    # CSVへの追記の途中で停止した状態
+    start_append(csv_path, b'a/x,2,fix\n', 8)
+
+    sink = AppendOnlyCsvSink(csv_path, COLUMNS, KEYS)
+    assert os.path.getsize(csv_path) == committed
+    assert len(sink) == 1
+    # 未確定だった行は再度追記できる
+    assert sink.append([row('a/x', '2')]) == 1
+    assert [r['commit_hash'] for r in read_rows(csv_path)] == ['1', '2']
+
+
+def test_torn_index_line_is_dropped(tmp_path):
+    csv_path = str(tmp_path / 'results.csv')
+    sink = AppendOnlyCsvSink(csv_path, COLUMNS, KEYS)
+    sink.append([row('a/x', '1')])
+    committed = os.path.getsize(csv_path)
+
+    # 2回目の追記でCSVは書けたが、インデックスの確定エントリが途中で切れた状態
+    start_append(csv_path, b'a/x,2,fix\n', 10)
+    entries = len(read_index(csv_path + '.idx'))
+    with open(csv_path + '.idx', 'ab') as f:
+        f.write(b'{"size": 9')
+
+    sink = AppendOnlyCsvSink(csv_path, COLUMNS, KEYS)
+    assert len(read_index(csv_path + '.idx')) == entries
+    assert os.path.getsize(csv_path) == committed
+    assert sink.append([row('a/x', '2'), row('a/x', '3')]) == 2
+
+    sink = AppendOnlyCsvSink(csv_path, COLUMNS, KEYS)
+    assert len(sink) == 3
+    assert [r['commit_hash'] for r in read_rows(csv_path)] == ['1', '2', '3']
+
+
+def test_index_is_rebuilt_when_csv_was_rewritten(tmp_path):
+    csv_path = str(tmp_path / 'results.csv')
+    sink = AppendOnlyCsvSink(csv_path, COLUMNS, KEYS)
+    sink.append([row('a/x', '1')])
+
+    # 他のスクリプトがCSVを書き換えた場合（記録したサイズ・末尾と一致しない）
+    pd.DataFrame([row('a/x', '1'), row('c/z', '9')]).to_csv(csv_path, index=False, encoding='utf-8-sig')
+
+    sink = AppendOnlyCsvSink(csv_path, COLUMNS, KEYS)
+    assert len(sink) == 2
+    assert sink.append([row('c/z', '9'), row('c/z', '10')]) == 1
+    assert len(AppendOnlyCsvSink(csv_path, COLUMNS, KEYS)) == 3
+
+
+def test_external_append_is_kept(tmp_path):
+    csv_path = str(tmp_path / 'results.csv')
+    sink = AppendOnlyCsvSink(csv_path, COLUMNS, KEYS)
+    sink.append([row('a/x', '1')])
+
+    # 確定した内容の後ろに他のスクリプトが追記した場合（予定サイズの記録がない）は切り詰めない
+    with open(csv_path, 'ab') as f:
+        f.write(b'a/x,2,docs\n')
+
+    sink = AppendOnlyCsvSink(csv_path, COLUMNS, KEYS)
+    assert len(sink) == 2
+    assert [r['label'] for r in read_rows(csv_path)] == ['fix', 'docs']
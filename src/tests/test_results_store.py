@@ -0,0 +1,107 @@
+"""
+ResultsStore（components/results_store.py）のパーティションの書き直しと、CSVへのフォールバックの確認
+
+    python -m pytest src/tests
+
+Parquetの読み書きの確認はpyarrowがない環境ではスキップする。
+"""
+
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from components import results_store
+from components.results_store import ResultsStore, load_results, normalize_types, to_plain_types
+
+NAME = 'results_test'
+
+
+def rows(repo, *shas, line_count=10, classification='fix'):
+    return pd.DataFrame([{
+        'repository_name': repo,
+        'file_name': 'src/app.py',
+        'file_created_by': 'AI',
+        'file_line_count': line_count,
+        'file_creation_date': '2025-05-01T12:00:00+00:00',
+        'commit_hash': sha,
+        'commit_date': '2025-05-02T08:30:00+00:00',
+        'commit_classification': classification,
+    } for sha in shas])
+
+
+def write_csv(tmp_path, df):
+    csv_path = tmp_path / f"{NAME}.csv"
+    df.to_csv(csv_path, index=False)
+    return csv_path
+
+
+@pytest.fixture
+def results_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(results_store, 'RESULTS_DIR', str(tmp_path))
+    (tmp_path / 'csv').mkdir()
+    return tmp_path
+
+
+def test_plain_types_match_read_csv(tmp_path):
+    df = pd.concat([rows('a/x', 'c1', 'c2'), rows('b/y', 'c3')], ignore_index=True)
+    df.loc[2, 'commit_classification'] = None
+    raw = pd.read_csv(write_csv(tmp_path, df))
+
+    pd.testing.assert_frame_equal(to_plain_types(normalize_types(raw)), raw)
+
+
+def test_plain_types_keep_missing_integers_as_float(tmp_path):
+    df = rows('a/x', 'c1', 'c2')
+    df['file_line_count'] = [10, None]
+    raw = pd.read_csv(write_csv(tmp_path, df))
+
+    plain = to_plain_types(normalize_types(raw))
+    assert plain['file_line_count'].dtype == 'float64'
+    pd.testing.assert_frame_equal(plain, raw)
+
+
+def test_load_results_falls_back_to_csv(results_dir):
+    rows_df = pd.concat([rows('a/x', 'c1', 'c2'), rows('b/y', 'c3')], ignore_index=True)
+    rows_df.to_csv(results_dir / 'csv' / f"{NAME}.csv", index=False)
+
+    df = load_results(NAME, columns=['commit_hash'], repositories=['a/x'])
+    assert list(df.columns) == ['repository_name', 'commit_hash']
+    assert list(df['commit_hash']) == ['c1', 'c2']
+
+    df = load_results(NAME, columns=['file_line_count', 'commit_date'])
+    assert isinstance(df['commit_date'].dtype, pd.DatetimeTZDtype)
+    assert isinstance(df['file_line_count'].dtype, pd.Int64Dtype)
+
+    plain = load_results(NAME, categorical=False)
+    pd.testing.assert_frame_equal(plain, pd.read_csv(results_dir / 'csv' / f"{NAME}.csv"))
+
+
+def test_partition_rewrite_and_drop(results_dir):
+    pytest.importorskip('pyarrow')
+    store = ResultsStore.named(NAME)
+    assert not store.exists()
+
+    store.write(pd.concat([rows('a/x', 'c1', 'c2'), rows('owner/repo name', 'c3')], ignore_index=True))
+    assert store.repositories() == ['a/x', 'owner/repo name']
+
+    # 書き込んだリポジトリのパーティションだけ置き換わる
+    store.write(rows('a/x', 'c4', line_count=20))
+    df = store.read(categorical=False).sort_values('commit_hash')
+    assert list(df['commit_hash']) == ['c3', 'c4']
+    assert list(df['file_line_count']) == [10, 20]
+    assert df['file_line_count'].dtype == 'int64'
+
+    df = store.read(columns=['commit_hash'], repositories=['owner/repo name'])
+    assert list(df['commit_hash'].astype(str)) == ['c3']
+
+    assert store.drop_repository('a/x')
+    assert not store.drop_repository('a/x')
+    assert store.repositories() == ['owner/repo name']
+
+    # ストアがあればCSVより優先する
+    write_csv(results_dir / 'csv', rows('csv/only', 'c9'))
+    df = load_results(NAME, categorical=False)
+    assert list(df['repository_name']) == ['owner/repo name']